@@ -0,0 +1,80 @@
+"""
+Embedding cost per retained token of each chunking strategy.
+
+Chunks longer than the embedding model's max sequence length are
+truncated by the model, so the tokens past the limit are paid for in
+tokenization but never reach the embedding. This benchmark chunks the
+same documents with every strategy, embeds the chunks, and reports how
+many tokens survive and what each retained token costs.
+
+Usage:
+    python benchmarks/chunking.py input_files [--repeat 3]
+"""
+import sys
+import time
+import argparse
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT_DIR))
+sys.path.insert(0, str(ROOT_DIR / "src"))
+
+import numpy as np
+from read_file import FileProcessor, EMBEDDING_MODEL, EMBEDDING_MAX_TOKENS
+from src.agent.tools.chunk_store import ChunkStore
+from src.agent.tools.embedder.batching import encode_in_batches
+from src.agent.tools.file_processor.token_chunker import TokenChunker, SPECIAL_TOKENS
+from src.agent.tools.model_registry import get_model_registry
+
+
+def chunk_all(texts: list[str], strategy: str, tokenizer) -> list[str]:
+    if strategy == "paragraphs":
+        processor = FileProcessor(Path("benchmark.txt"))
+        return [chunk for text in texts for chunk in processor.chunk_text(text)]
+    if strategy == "characters":
+        return [chunk for text in texts for chunk in ChunkStore.from_text(text.strip(), 2500, 200)]
+    chunker = TokenChunker(tokenizer, EMBEDDING_MAX_TOKENS)
+    return [chunk for text in texts for chunk in chunker.chunk(text)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("input_folder", type=Path)
+    parser.add_argument("--repeat", type=int, default=3, help="Embedding runs per strategy (best is kept)")
+    args = parser.parse_args()
+
+    files = sorted(list(args.input_folder.glob("*.txt")) + list(args.input_folder.glob("*.pdf")))
+    texts = []
+    for path in files:
+        try:
+            texts.append(FileProcessor(path).read_file())
+        except Exception as e:
+            print(f"Skipping {path.name}: {e}")
+    registry = get_model_registry()
+    model = registry.sentence_transformer(EMBEDDING_MODEL)
+    tokenizer = registry.tokenizer(EMBEDDING_MODEL)
+    counter = TokenChunker(tokenizer, EMBEDDING_MAX_TOKENS)
+    limit = EMBEDDING_MAX_TOKENS - SPECIAL_TOKENS
+
+    print(f"{len(texts)} files, {sum(len(text) for text in texts)} characters, model limit {EMBEDDING_MAX_TOKENS} tokens\n")
+    print(f"{'strategy':<12}{'chunks':>8}{'tokens':>10}{'retained':>10}{'truncated':>11}{'embed s':>9}{'us/token':>10}")
+    for strategy in ("paragraphs", "characters", "tokens"):
+        chunks = [chunk for chunk in chunk_all(texts, strategy, tokenizer) if chunk.strip()]
+        counts = counter.count_tokens(chunks)
+        retained = int(np.minimum(counts, limit).sum())
+        total = int(counts.sum())
+
+        best = float("inf")
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            encode_in_batches(model, chunks)
+            best = min(best, time.perf_counter() - start)
+
+        print(
+            f"{strategy:<12}{len(chunks):>8}{total:>10}{retained:>10}"
+            f"{1 - retained / max(total, 1):>10.1%}{best:>9.2f}{best / max(retained, 1) * 1e6:>10.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""
+Recall, memory and scoring time of quantized embeddings against float32.
+
+Embeddings are synthetic: unit vectors drawn around a few hundred topic
+centers, so many chunks have close similarities, as in real documents.
+Each query is a noisy copy of a random chunk. For every precision, the
+top-k chunks by cosine similarity are compared to the float32 top-k
+(recall@k), and the largest change of a similarity is reported.
+
+Usage:
+    python benchmarks/quantization.py [--chunks 50000] [--dim 384] [--queries 200] [--k 10]
+"""
+import sys
+import time
+import argparse
+import numpy as np
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT_DIR))
+
+from src.agent.tools.quantization import QUANTIZATIONS, QuantizedEmbeddings
+
+
+def make_embeddings(chunks: int, dim: int, topics: int, rng: np.random.Generator) -> np.ndarray:
+    centers = rng.standard_normal((topics, dim)).astype(np.float32)
+    embeddings = centers[rng.integers(0, topics, chunks)] + 0.6 * rng.standard_normal((chunks, dim)).astype(np.float32)
+    return embeddings / np.linalg.norm(embeddings, axis=1, keepdims=True)
+
+
+def top_k(scores: np.ndarray, k: int) -> set:
+    return set(np.argpartition(-scores, k)[:k].tolist())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--chunks", type=int, default=50000)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--topics", type=int, default=200)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    embeddings = make_embeddings(args.chunks, args.dim, args.topics, rng)
+    queries = embeddings[rng.integers(0, args.chunks, args.queries)]
+    queries = queries + 0.3 * rng.standard_normal(queries.shape).astype(np.float32)
+
+    reference = QuantizedEmbeddings.quantize(embeddings, "float32")
+    reference_scores = [reference.cosine(query) for query in queries]
+    print(f"{args.chunks} chunks x {args.dim} dims, {args.queries} queries, k={args.k}")
+    print(f"{'precision':>10} {'MB':>8} {'recall@k':>9} {'max drift':>10} {'ms/query':>9}")
+    for quantization in QUANTIZATIONS:
+        matrix = QuantizedEmbeddings.quantize(embeddings, quantization)
+        recall, drift = 0.0, 0.0
+        start = time.perf_counter()
+        scores = [matrix.cosine(query) for query in queries]
+        elapsed = time.perf_counter() - start
+        for expected, found in zip(reference_scores, scores):
+            recall += len(top_k(expected, args.k) & top_k(found, args.k)) / args.k
+            drift = max(drift, float(np.abs(expected - found).max()))
+        print(f"{quantization:>10} {matrix.nbytes / 2**20:>8.1f} {recall / args.queries:>9.4f} "
+              f"{drift:>10.5f} {elapsed / args.queries * 1000:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""
+Time to find the cut-off section of large documents.
+
+Compares the per-pattern search over a lowercased copy of the text, which
+FileProcessor._clean_text used before, with the single-pass
+SectionScanner on the whole text, on a stream of pages and on a memory
+map of the file. The document is synthetic, with its "References"
+heading at the very end, so every approach has to scan all of it.
+
+Usage:
+    python benchmarks/sections.py [--size-mb 200] [--page-kb 4] [--repeat 3]
+"""
+import re
+import sys
+import mmap
+import time
+import random
+import argparse
+import tempfile
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT_DIR))
+
+from src.agent.tools.file_processor.sections import UNWANTED_SECTIONS
+from src.agent.tools.file_processor.streaming import stop_at_section
+
+PER_PATTERN = [
+    r'references?\s*\n',
+    r'bibliography\s*\n',
+    r'appendix\s+[a-z]?\s*\n',
+    r'appendices\s*\n',
+    r'index\s*\n',
+    r'acknowledgments?\s*\n',
+    r'works? cited\s*\n',
+]
+WORDS = (
+    "the model learns a representation of the input data and we report results "
+    "on several benchmarks showing that the proposed method improves performance"
+).split()
+
+
+def make_document(size_mb: int) -> str:
+    rng = random.Random(0)
+    lines, size = [], 0
+    while size < size_mb * 1_000_000:
+        line = " ".join(rng.choices(WORDS, k=rng.randint(4, 16)))
+        lines.append(line)
+        size += len(line) + 1
+    return "\n".join(lines) + "\n\nReferences\n[1] Smith, J. (2020).\n"
+
+
+def per_pattern_search(text: str) -> int:
+    text_lower = text.lower()
+    positions = [match.start() for match in (re.search(p, text_lower) for p in PER_PATTERN) if match]
+    return min(positions, default=len(text))
+
+
+def scanner_first(text: str) -> int:
+    return UNWANTED_SECTIONS.first(text).start
+
+
+def scanner_stream(pages: list[str]) -> int:
+    return sum(len(piece) for piece in stop_at_section(pages))
+
+
+def scanner_mmap(path: Path) -> int:
+    with path.open("rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        return UNWANTED_SECTIONS.first(mapped).start
+
+
+def best_of(repeat: int, function, *args) -> tuple[float, int]:
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function(*args)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--size-mb", type=int, default=200, help="Size of the synthetic document")
+    parser.add_argument("--page-kb", type=int, default=4, help="Size of the pages of the streamed document")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per approach (best is kept)")
+    args = parser.parse_args()
+
+    text = make_document(args.size_mb)
+    page_size = args.page_kb * 1000
+    pages = [text[i:i + page_size] for i in range(0, len(text), page_size)]
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "document.txt"
+        path.write_bytes(text.encode("utf-8"))
+
+        print(f"{len(text) / 1e6:.0f} MB, {len(pages)} pages of {args.page_kb} kB\n")
+        print(f"{'approach':<26}{'seconds':>9}{'MB/s':>9}{'cut at':>12}")
+        for label, function, arg in [
+            ("lowercase + 7 searches", per_pattern_search, text),
+            ("scanner, whole text", scanner_first, text),
+            ("scanner, streamed pages", scanner_stream, pages),
+            ("scanner, memory map", scanner_mmap, path),
+        ]:
+            seconds, cut = best_of(args.repeat, function, arg)
+            print(f"{label:<26}{seconds:>9.2f}{len(text) / 1e6 / seconds:>9.0f}{cut:>12}")
+
+
+if __name__ == "__main__":
+    main()
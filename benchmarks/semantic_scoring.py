@@ -0,0 +1,76 @@
+"""
+Time of semantic scoring: a per-chunk loop against a SemanticIndex.
+
+The loop scores one chunk at a time and recomputes both norms for every
+chunk, as SemanticSearcher once did. The index computes the chunk norms
+once, without copying the chunks, then scores a query with one matrix-vector product, or a batch of
+queries with one matrix-matrix product, and picks the top k with
+argpartition. Building the index for every query, instead of once per
+document, is timed too. Embeddings and queries are random vectors.
+
+Usage:
+    python benchmarks/semantic_scoring.py [--chunks 50000] [--dim 384] [--queries 64] [--k 10]
+"""
+import sys
+import time
+import argparse
+import numpy as np
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT_DIR))
+
+from src.agent.tools.semantic_index import SemanticIndex
+
+LOOP_QUERIES = 3 # The loop takes seconds per query
+
+
+def loop_scores(embeddings: np.ndarray, query: np.ndarray) -> np.ndarray:
+    scores = []
+    for embedding in embeddings:
+        query_vector = np.array(query)
+        scores.append(np.dot(embedding, query_vector) / (np.linalg.norm(embedding) * np.linalg.norm(query_vector)))
+    return np.array(scores)
+
+
+def timed(function, repeat: int) -> float:
+    """Milliseconds per call."""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        function()
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--chunks", type=int, default=50000)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--queries", type=int, default=64)
+    parser.add_argument("--k", type=int, default=10)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    embeddings = rng.standard_normal((args.chunks, args.dim)).astype(np.float32)
+    queries = rng.standard_normal((args.queries, args.dim)).astype(np.float32)
+
+    start = time.perf_counter()
+    index = SemanticIndex(embeddings)
+    build = (time.perf_counter() - start) * 1000
+    np.testing.assert_allclose(index.scores(queries[0]), loop_scores(embeddings, queries[0]), atol=1e-4)
+
+    loop = timed(lambda: [loop_scores(embeddings, query) for query in queries[:LOOP_QUERIES]], 1) / LOOP_QUERIES
+    rebuilt = timed(lambda: [SemanticIndex(embeddings).top_k(query, args.k) for query in queries[:8]], 1) / 8
+    single = timed(lambda: [index.top_k(query, args.k) for query in queries], 1) / args.queries
+    batch = timed(lambda: index.top_k(queries, args.k), 3) / args.queries
+
+    print(f"{args.chunks} chunks x {args.dim} dims, k={args.k}")
+    print(f"{'index build (once)':>24} {build:>10.2f} ms, "
+          f"{index.inverse_norms.nbytes / 2**20:.2f} MB over the {embeddings.nbytes / 2**20:.0f} MB of embeddings")
+    print(f"{'per-chunk loop':>24} {loop:>10.2f} ms/query")
+    print(f"{'index built per query':>24} {rebuilt:>10.2f} ms/query")
+    print(f"{'matrix-vector + top k':>24} {single:>10.2f} ms/query")
+    print(f"{'matrix-matrix + top k':>24} {batch:>10.2f} ms/query ({args.queries} queries per product)")
+
+
+if __name__ == "__main__":
+    main()
@@ -32,6 +32,12 @@ class EmbeddingError(ToolError):
     """
     pass
 
+class DeduplicationError(ToolError):
+    """
+    Removing duplicate chunks failed.
+    """
+    pass
+
 class RetrievalError(ToolError):
     """
     Retrieval/ search failed
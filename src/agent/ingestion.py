@@ -0,0 +1,141 @@
+"""
+Discovery of the input files of a run, for folders holding many files in
+nested subfolders.
+"""
+import os
+import heapq
+from pathlib import Path
+from dataclasses import dataclass
+from typing import Iterable, Iterator, Optional
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from src.agent.tools.file_processor.readers import supported_extensions
+from src.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+SCAN_WORKERS = 16 # Threads listing folders and reading file stats
+STAT_BATCH = 256 # Files stat'ed per task
+ORDER_WINDOW = 4096 # Files buffered to order the stream by size
+
+
+@dataclass(frozen=True)
+class WorkItem:
+    """
+    A file to process, with the stat taken when it was discovered.
+
+    """
+    path: Path
+    size: int
+    mtime_ns: int
+
+    @property
+    def extension(self) -> str:
+        return self.path.suffix.lower()
+
+
+def _list_folder(folder: Path, extensions: frozenset) -> tuple[Path, list[Path], list[os.DirEntry]]:
+    """The folder, its subfolders and its files with a supported extension, skipping hidden entries."""
+    folders, files = [], []
+    try:
+        with os.scandir(folder) as entries:
+            for entry in entries:
+                if entry.name.startswith("."):
+                    continue
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        folders.append(folder / entry.name)
+                    elif os.path.splitext(entry.name)[1].lower() in extensions and entry.is_file():
+                        files.append(entry)
+                except OSError:
+                    continue
+    except OSError as e:
+        logger.warning(f"Skipping unreadable folder {folder}: {e}")
+    return folder, folders, files
+
+
+def _stat_files(folder: Path, entries: list[os.DirEntry]) -> list[WorkItem]:
+    # Joining names to the folder's Path is much cheaper than parsing every full path
+    items = []
+    for entry in entries:
+        try:
+            stat = entry.stat()
+        except OSError as e:
+            logger.warning(f"Skipping {entry.path}: {e}")
+            continue
+        items.append(WorkItem(folder / entry.name, stat.st_size, stat.st_mtime_ns))
+    return items
+
+
+def _excluded_folders(root: Path, exclude: Iterable[Path]) -> frozenset:
+    """Folders of exclude below root, as the paths the walk reaches them by."""
+    resolved_root = root.resolve()
+    folders = set()
+    for path in exclude:
+        try:
+            relative = Path(path).resolve().relative_to(resolved_root)
+        except ValueError:
+            continue # Outside root, never walked
+        if relative.parts:
+            folders.add(root / relative)
+    return frozenset(folders)
+
+
+def scan_files(root: Path, extensions: Optional[Iterable[str]] = None,
+               workers: int = SCAN_WORKERS, exclude: Iterable[Path] = ()) -> Iterator[WorkItem]:
+    """
+    Yield every file under root whose extension is supported, as soon as it
+    is found and in no particular order.
+
+    The tree is walked once: each folder is listed by a task of a thread
+    pool, which submits its subfolders as new tasks, and the files found
+    are stat'ed by further tasks in batches of STAT_BATCH. Listing and
+    stat calls mostly wait on the file system, so on network shares many
+    of them are in flight at once. Symbolic links to folders are not
+    followed, so the walk always terminates. Folders in exclude, such as an
+    output folder inside root, are not entered.
+    """
+    extensions = frozenset(ext.lower() for ext in (extensions or supported_extensions()))
+    excluded = _excluded_folders(Path(root), exclude)
+    pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="scan")
+    try:
+        pending = {pool.submit(_list_folder, Path(root), extensions)}
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                result = future.result()
+                if isinstance(result, list): # Stat'ed files
+                    yield from result
+                    continue
+                folder, folders, files = result
+                for subfolder in folders:
+                    if subfolder in excluded:
+                        continue
+                    pending.add(pool.submit(_list_folder, subfolder, extensions))
+                for start in range(0, len(files), STAT_BATCH):
+                    pending.add(pool.submit(_stat_files, folder, files[start:start + STAT_BATCH]))
+    finally:
+        # Stop listing folders nobody will consume if the caller stops early
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+def iter_work_items(root: Path, extensions: Optional[Iterable[str]] = None,
+                    largest_first: bool = True, window: int = ORDER_WINDOW,
+                    workers: int = SCAN_WORKERS, exclude: Iterable[Path] = ()) -> Iterator[WorkItem]:
+    """
+    Stream the files under root ordered by size, while the tree is still being walked.
+
+    Up to window discovered files are kept in a heap and the largest (or
+    smallest) is yielded whenever the heap is full, so processing starts
+    after window files instead of after the whole walk. Folders with fewer
+    files than window come out fully sorted, ties broken by path. Largest
+    first keeps the long documents from being the last ones running.
+    Folders in exclude are skipped, as by scan_files.
+    """
+    heap = []
+    sign = -1 if largest_first else 1
+    for item in scan_files(root, extensions, workers, exclude):
+        heapq.heappush(heap, (sign * item.size, str(item.path), item))
+        if len(heap) > window:
+            yield heapq.heappop(heap)[2]
+    while heap:
+        yield heapq.heappop(heap)[2]
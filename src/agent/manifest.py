@@ -0,0 +1,243 @@
+"""
+Manifest of processed files for resumable, incremental batch runs.
+"""
+import os
+import json
+import sqlite3
+import hashlib
+import threading
+from pathlib import Path
+from datetime import datetime
+from typing import Literal, NamedTuple, Optional
+from pydantic import BaseModel, Field
+from src.agent.state import WorkflowState
+from src.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+
+def file_content_hash(file_path: Path, block_size: int = 1 << 20) -> str:
+    """SHA-256 of a file's content."""
+    digest = hashlib.sha256()
+    with Path(file_path).open("rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class FileVersion(NamedTuple):
+    """Content hash of a file, with the size and modification time it had when hashed."""
+    content_hash: str
+    size: int
+    mtime_ns: int
+
+
+def file_version(file_path: Path) -> FileVersion:
+    """
+    Hash, size and modification time of a file. The file is stat'ed before
+    it is read, so a file changed while being hashed looks modified later.
+    """
+    stat = Path(file_path).stat()
+    return FileVersion(file_content_hash(file_path), stat.st_size, stat.st_mtime_ns)
+
+
+def config_fingerprint(**settings) -> str:
+    """Stable hash of the settings that affect a file's result."""
+    encoded = json.dumps(settings, sort_keys=True, default=str)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()[:16]
+
+
+def _atomic_write(path: Path, text: str) -> None:
+    """Write text so readers never see a partially written file."""
+    tmp_path = path.with_suffix(path.suffix + ".tmp")
+    tmp_path.write_text(text, encoding="utf-8")
+    os.replace(tmp_path, path)
+
+
+class ManifestEntry(BaseModel):
+    """
+    What is known about one input file from previous runs.
+    """
+    content_hash: str = Field(..., description="SHA-256 of the file content")
+    size: int = Field(..., description="File size in bytes when hashed")
+    mtime_ns: int = Field(..., description="Modification time when hashed")
+    config_fingerprint: str = Field(..., description="Fingerprint of the settings used")
+    status: Literal["success", "failed"] = Field(..., description="Result of the last attempt")
+    error: Optional[str] = Field(None, description="Error message if failed")
+    output_file: Optional[str] = Field(None, description="Where the summary was saved")
+    processed_at: datetime = Field(default_factory=datetime.now)
+
+
+class RunManifest:
+    """
+    Records the content hash, settings fingerprint and result of every
+    processed file in output_folder, so later runs only process files
+    that are new, changed, failed, or were produced with other settings.
+
+    Entries live in a SQLite table and are looked up one row at a time,
+    so memory does not grow with the number of files. Recorded entries
+    are buffered and written in one transaction every checkpoint_every
+    files, together with the WorkflowState counters, so a crash loses at
+    most that many results and each checkpoint only writes what changed.
+    Checkpoints write outside the lock taken by record().
+    """
+    FILENAME = "manifest.sqlite3"
+    STATE_FILENAME = "workflow_state.json"
+
+    def __init__(self, output_folder: Path, fingerprint: str, checkpoint_every: int = 10):
+        self.path = Path(output_folder) / self.FILENAME
+        self.state_path = Path(output_folder) / self.STATE_FILENAME
+        self.fingerprint = fingerprint
+        self.checkpoint_every = checkpoint_every
+        self.state = WorkflowState()
+        self._pending: dict[str, ManifestEntry] = {} # Recorded, not yet written
+        self._hashes: dict[str, FileVersion] = {} # Hashed, not yet recorded
+        self._unsaved = 0
+        self._lock = threading.Lock() # Guards state and the dicts above
+        self._db_lock = threading.Lock() # Serializes use of the connection
+        self._conn = self._open()
+
+    def _open(self) -> sqlite3.Connection:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            return self._connect()
+        except sqlite3.DatabaseError as e:
+            logger.warning(f"Ignoring unreadable manifest {self.path}: {e}")
+            for path in (self.path, Path(f"{self.path}-wal"), Path(f"{self.path}-shm")):
+                path.unlink(missing_ok=True)
+            return self._connect()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(str(self.path), timeout=30, check_same_thread=False)
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS files ("
+                " key TEXT PRIMARY KEY,"
+                " entry TEXT NOT NULL)"
+            )
+            conn.commit()
+        except sqlite3.DatabaseError:
+            conn.close()
+            raise
+        return conn
+
+    @staticmethod
+    def key(file_path: Path) -> str:
+        return str(Path(file_path).resolve())
+
+    def _hash(self, file_path: Path) -> FileVersion:
+        """
+        Version of a file. Reuses the recorded hash when the size and
+        modification time are unchanged, so unchanged files are not re-read.
+        """
+        stat = Path(file_path).stat()
+        entry = self.entry(file_path)
+        if entry is not None and entry.size == stat.st_size and entry.mtime_ns == stat.st_mtime_ns:
+            return FileVersion(entry.content_hash, stat.st_size, stat.st_mtime_ns)
+        return file_version(file_path)
+
+    def content_hash(self, file_path: Path) -> str:
+        """Hash of the file content, kept for the file's next record()."""
+        version = self._hash(file_path)
+        with self._lock:
+            self._hashes[self.key(file_path)] = version
+        return version.content_hash
+
+    def entry(self, file_path: Path) -> Optional[ManifestEntry]:
+        key = self.key(file_path)
+        with self._lock:
+            entry = self._pending.get(key)
+        if entry is not None:
+            return entry
+        with self._db_lock:
+            row = self._conn.execute("SELECT entry FROM files WHERE key = ?", (key,)).fetchone()
+        return ManifestEntry.model_validate_json(row[0]) if row else None
+
+    def is_up_to_date(self, file_path: Path) -> bool:
+        """True if the file was processed successfully with the same content and settings."""
+        entry = self.entry(file_path)
+        if entry is None or entry.status != "success":
+            return False
+        if entry.config_fingerprint != self.fingerprint:
+            return False
+        if entry.output_file and not Path(entry.output_file).exists():
+            return False
+        if entry.content_hash == self._hash(file_path).content_hash:
+            return True
+        self.content_hash(file_path) # Kept for record(), since the file is processed again
+        return False
+
+    def count_file(self) -> None:
+        """Count a file of the input, whether it is processed or up to date."""
+        with self._lock:
+            self.state.total_files += 1
+
+    def record(self, file_path: Path, success: bool, error: Optional[str] = None,
+               output_file: Optional[Path] = None, version: Optional[FileVersion] = None) -> None:
+        """
+        Record the result of processing a file and checkpoint periodically.
+        version is the FileVersion of the content that was processed, taken
+        when it was read, so an edit made since is noticed by the next run.
+        Without it, the version hashed by is_up_to_date() or content_hash()
+        is used, and the file is only hashed now as a last resort. A file
+        that can no longer be read is counted but not recorded.
+        """
+        key = self.key(file_path)
+        with self._lock:
+            hashed = self._hashes.pop(key, None)
+        version = version or hashed
+        if version is None:
+            try:
+                version = self._hash(file_path)
+            except OSError as e:
+                logger.warning(f"Not recording {file_path} in the manifest: {e}")
+        entry = None
+        if version is not None:
+            entry = ManifestEntry(
+                content_hash=version.content_hash,
+                size=version.size,
+                mtime_ns=version.mtime_ns,
+                config_fingerprint=self.fingerprint,
+                status="success" if success else "failed",
+                error=error,
+                output_file=str(output_file) if output_file else None,
+            )
+        with self._lock:
+            if entry is not None:
+                self._pending[key] = entry
+            if success:
+                self.state.files_processed += 1
+            else:
+                self.state.files_failed += 1
+            self._unsaved += 1
+            due = self._unsaved >= self.checkpoint_every
+            if due:
+                self._unsaved = 0
+        if due:
+            self.checkpoint()
+
+    def checkpoint(self) -> None:
+        """Write the entries recorded since the last checkpoint and the workflow state to disk."""
+        with self._db_lock: # Checkpoints write in the order they took their snapshot
+            with self._lock:
+                pending = dict(self._pending)
+                state = self.state.model_dump_json(indent=2)
+                self._unsaved = 0
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO files (key, entry) VALUES (?, ?)",
+                [(key, entry.model_dump_json()) for key, entry in pending.items()],
+            )
+            self._conn.commit()
+            _atomic_write(self.state_path, state)
+            with self._lock:
+                for key, entry in pending.items():
+                    if self._pending.get(key) is entry: # Not recorded again meanwhile
+                        del self._pending[key]
+        logger.debug(f"Checkpointed manifest ({len(pending)} files)")
+
+    def close(self) -> None:
+        """Checkpoint and close the database."""
+        self.checkpoint()
+        with self._db_lock:
+            self._conn.close()
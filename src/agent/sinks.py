@@ -0,0 +1,201 @@
+"""
+Streaming sinks that persist each SummaryResult as soon as it is produced.
+"""
+import csv
+import threading
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Iterable, Iterator
+from src.agent.response import SummaryResult
+from src.agent.errors import ConfigurationError
+from src.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+CSV_FIELDS = list(SummaryResult.model_fields)
+
+
+class ResultSink(ABC):
+    """
+    Destination for summary results.
+
+    Results are written one at a time, so memory stays constant no
+    matter how many files are processed, and the output can be tailed
+    while the run is in progress. Sinks are safe to use from several
+    threads.
+    """
+    extension: str = ""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def write(self, result: SummaryResult) -> None:
+        """Persist one result."""
+        with self._lock:
+            self._write(result)
+            self.count += 1
+
+    @abstractmethod
+    def _write(self, result: SummaryResult) -> None:
+        pass
+
+    def close(self) -> None:
+        """Flush and release the underlying file."""
+        pass
+
+    @classmethod
+    @abstractmethod
+    def read(cls, path: Path) -> Iterator[SummaryResult]:
+        """Stream results back from a file written by this sink."""
+        pass
+
+    def __enter__(self) -> "ResultSink":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+class JsonlSink(ResultSink):
+    """One JSON object per line, flushed after every result."""
+    extension = ".jsonl"
+
+    def __init__(self, path: Path):
+        super().__init__(path)
+        self._file = self.path.open("w", encoding="utf-8")
+
+    def _write(self, result: SummaryResult) -> None:
+        self._file.write(result.model_dump_json() + "\n")
+        self._file.flush()
+
+    def close(self) -> None:
+        self._file.close()
+
+    @classmethod
+    def read(cls, path: Path) -> Iterator[SummaryResult]:
+        with Path(path).open("r", encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    yield SummaryResult.model_validate_json(line)
+
+
+class CsvSink(ResultSink):
+    """CSV with a header row, flushed after every result."""
+    extension = ".csv"
+
+    def __init__(self, path: Path):
+        super().__init__(path)
+        self._file = self.path.open("w", encoding="utf-8", newline="")
+        self._writer = csv.DictWriter(self._file, fieldnames=CSV_FIELDS)
+        self._writer.writeheader()
+
+    def _write(self, result: SummaryResult) -> None:
+        self._writer.writerow(result.model_dump(mode="json"))
+        self._file.flush()
+
+    def close(self) -> None:
+        self._file.close()
+
+    @classmethod
+    def read(cls, path: Path) -> Iterator[SummaryResult]:
+        with Path(path).open("r", encoding="utf-8", newline="") as f:
+            for row in csv.DictReader(f):
+                row["error"] = row["error"] or None
+                yield SummaryResult.model_validate(row)
+
+
+class ParquetSink(ResultSink):
+    """
+    Parquet file written in row groups of row_group_size results.
+    Requires the optional pyarrow dependency.
+    """
+    extension = ".parquet"
+
+    def __init__(self, path: Path, row_group_size: int = 1000):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError as e:
+            raise ConfigurationError(
+                "Parquet output requires pyarrow. Install it with: pip install pyarrow"
+            ) from e
+        super().__init__(path)
+        self._pa = pa
+        self.row_group_size = row_group_size
+        self._schema = pa.schema([
+            ("filename", pa.string()),
+            ("summary", pa.string()),
+            ("processed_at", pa.timestamp("us")),
+            ("success", pa.bool_()),
+            ("error", pa.string()),
+            ("chunk_used", pa.int64()),
+            ("processing_time_seconds", pa.float64()),
+        ])
+        self._writer = pq.ParquetWriter(str(self.path), self._schema)
+        self._rows: list[dict] = []
+
+    def _write(self, result: SummaryResult) -> None:
+        self._rows.append(result.model_dump())
+        if len(self._rows) >= self.row_group_size:
+            self._flush()
+
+    def _flush(self) -> None:
+        if self._rows:
+            table = self._pa.Table.from_pylist(self._rows, schema=self._schema)
+            self._writer.write_table(table)
+            self._rows = []
+
+    def close(self) -> None:
+        with self._lock:
+            self._flush()
+            self._writer.close()
+
+    @classmethod
+    def read(cls, path: Path) -> Iterator[SummaryResult]:
+        import pyarrow.parquet as pq
+        parquet_file = pq.ParquetFile(str(path))
+        for batch in parquet_file.iter_batches():
+            for row in batch.to_pylist():
+                yield SummaryResult.model_validate(row)
+
+
+SINKS: dict[str, type[ResultSink]] = {
+    "jsonl": JsonlSink,
+    "csv": CsvSink,
+    "parquet": ParquetSink,
+}
+
+
+def open_sink(kind: str, output_folder: Path, stem: str = "summaries") -> ResultSink:
+    """
+    Create a sink of the given kind in output_folder.
+    Raises:
+        ConfigurationError: If the kind is unknown or its dependency is missing.
+    """
+    sink_class = SINKS.get(kind)
+    if sink_class is None:
+        raise ConfigurationError(
+            f"Unknown result sink '{kind}'. Supported: {', '.join(SINKS)}"
+        )
+    return sink_class(Path(output_folder) / f"{stem}{sink_class.extension}")
+
+
+def export_excel(results: Iterable[SummaryResult], excel_path: Path) -> int:
+    """
+    Write successful results to an Excel file, sorted by filename.
+    Requires pandas and openpyxl, which are only imported here.
+    Returns:
+        Number of rows written.
+    """
+    import pandas as pd
+
+    rows = sorted(
+        ((result.filename, result.summary) for result in results if result.success),
+        key=lambda row: row[0],
+    )
+    if rows:
+        pd.DataFrame(rows, columns=["Filename", "Summary"]).to_excel(excel_path, index=False)
+    return len(rows)
@@ -0,0 +1,133 @@
+"""
+Compact, array-backed storage for the chunks of a document.
+"""
+import numpy as np
+from typing import Any, Iterator, Optional, Union
+
+
+class ChunkStore:
+    """
+    Chunks of a document stored as one text plus (start, end) offsets.
+
+    Overlapping chunks share the underlying text instead of each holding
+    a copy, and the boundaries live in two int64 arrays, so a document
+    costs its text plus 16 bytes per chunk. Slicing returns a view that
+    shares the text and the offset arrays, in O(1).
+
+    Pydantic fields typed as ChunkStore accept a ChunkStore as-is, without
+    re-validating every chunk, or a list of strings, which is converted.
+    """
+    __slots__ = ("_source", "starts", "ends")
+
+    def __init__(self, text: str = "", starts: Optional[np.ndarray] = None,
+                 ends: Optional[np.ndarray] = None):
+        self._source = text
+        self.starts = np.zeros(0, dtype=np.int64) if starts is None else np.asarray(starts, dtype=np.int64)
+        self.ends = np.zeros(0, dtype=np.int64) if ends is None else np.asarray(ends, dtype=np.int64)
+        if self.starts.shape != self.ends.shape:
+            raise ValueError(
+                f"starts and ends must have the same length, got {len(self.starts)} and {len(self.ends)}"
+            )
+
+    @classmethod
+    def from_text(cls, text: str, chunk_size: int, overlap: int) -> "ChunkStore":
+        """Fixed windows of chunk_size characters, every chunk_size - overlap characters."""
+        if chunk_size <= 0 or overlap < 0 or overlap >= chunk_size:
+            raise ValueError(f"Invalid chunk_size={chunk_size}, overlap={overlap}")
+        starts = np.arange(0, len(text), chunk_size - overlap, dtype=np.int64)
+        ends = np.minimum(starts + chunk_size, len(text))
+        return cls(text, starts, ends)
+
+    @classmethod
+    def from_chunks(cls, chunks: list[str]) -> "ChunkStore":
+        """Store arbitrary chunks back to back."""
+        for chunk in chunks:
+            if not isinstance(chunk, str):
+                raise TypeError(f"Chunks must be strings, got {type(chunk).__name__}")
+        lengths = np.fromiter((len(chunk) for chunk in chunks), dtype=np.int64, count=len(chunks))
+        ends = np.cumsum(lengths)
+        return cls("".join(chunks), ends - lengths, ends)
+
+    def _text(self, start: int, end: int) -> str:
+        return self._source[start:end]
+
+    def _view(self, starts: np.ndarray, ends: np.ndarray) -> "ChunkStore":
+        view = object.__new__(type(self))
+        for slot in _all_slots(type(self)):
+            setattr(view, slot, getattr(self, slot))
+        view.starts, view.ends = starts, ends
+        return view
+
+    def take(self, indices) -> "ChunkStore":
+        """Store of the chunks at the given indices, sharing the text."""
+        indices = np.asarray(indices, dtype=np.int64)
+        return self._view(self.starts[indices], self.ends[indices])
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[str, "ChunkStore"]:
+        """A chunk's text for an integer index, a view for a slice."""
+        if isinstance(index, slice):
+            return self._view(self.starts[index], self.ends[index])
+        return self._text(int(self.starts[index]), int(self.ends[index]))
+
+    def __iter__(self) -> Iterator[str]:
+        for start, end in zip(self.starts.tolist(), self.ends.tolist()):
+            yield self._text(start, end)
+
+    def __eq__(self, other: Any) -> bool:
+        if isinstance(other, (ChunkStore, list, tuple)):
+            return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({len(self)} chunks)"
+
+    @property
+    def lengths(self) -> np.ndarray:
+        """Length of every chunk."""
+        return self.ends - self.starts
+
+    @property
+    def total_characters(self) -> int:
+        """Characters across all chunks, counting overlaps once per chunk."""
+        return int(self.lengths.sum())
+
+    @property
+    def nbytes(self) -> int:
+        """Memory held by the chunk boundaries."""
+        return self.starts.nbytes + self.ends.nbytes
+
+    def tolist(self) -> list[str]:
+        """Materialize every chunk as a separate string."""
+        return list(self)
+
+    @classmethod
+    def _validate(cls, value: Any) -> "ChunkStore":
+        if isinstance(value, ChunkStore):
+            return value
+        if isinstance(value, (list, tuple)):
+            try:
+                return cls.from_chunks(list(value))
+            except TypeError as e:
+                raise ValueError(str(e)) from e
+        raise ValueError(f"Expected a ChunkStore or a list of strings, got {type(value).__name__}")
+
+    @classmethod
+    def __get_pydantic_core_schema__(cls, source_type, handler):
+        from pydantic_core import core_schema
+        return core_schema.no_info_plain_validator_function(
+            cls._validate,
+            serialization=core_schema.plain_serializer_function_ser_schema(
+                lambda store: store.tolist()
+            ),
+        )
+
+    @classmethod
+    def __get_pydantic_json_schema__(cls, core_schema, handler):
+        return {"type": "array", "items": {"type": "string"}}
+
+
+def _all_slots(klass: type) -> list[str]:
+    return [slot for base in klass.__mro__ for slot in getattr(base, "__slots__", ())]
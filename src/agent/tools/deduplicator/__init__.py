@@ -0,0 +1,4 @@
+from src.agent.tools.deduplicator.base import DeduplicatorInput, DeduplicatorOutput
+from src.agent.tools.deduplicator.deduplicator import Deduplicator
+
+__all__ = ['Deduplicator', 'DeduplicatorInput', 'DeduplicatorOutput']
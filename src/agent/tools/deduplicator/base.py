@@ -0,0 +1,44 @@
+from pydantic import Field
+from src.agent.tools.base import ToolInput, ToolOutput
+from src.agent.tools.chunk_store import ChunkStore
+
+
+class DeduplicatorInput(ToolInput):
+    """
+    Input for the Deduplicator tool.
+    """
+    chunks: ChunkStore = Field(..., description="Chunks to deduplicate, in document order")
+    max_hamming_distance: int = Field(
+        default=6,
+        ge=0,
+        le=16,
+        description="Chunks whose 64-bit SimHash differ in at most this many bits are near-duplicates"
+    )
+    strip_repeated_lines: bool = Field(
+        default=False,
+        description="Remove short lines repeated across many chunks, such as page headers and footers"
+    )
+    repeated_line_ratio: float = Field(
+        default=0.5,
+        gt=0.0,
+        le=1.0,
+        description="Fraction of chunks a line must appear in to be stripped"
+    )
+
+class DeduplicatorOutput(ToolOutput):
+
+    chunks: ChunkStore = Field(
+        default_factory=ChunkStore,
+        description="Unique chunks, in the order they first appeared"
+    )
+    source_indices: list[int] = Field(
+        default_factory=list,
+        description="For each unique chunk, its index in the input chunks"
+    )
+    duplicate_of: list[int] = Field(
+        default_factory=list,
+        description="For each input chunk, the index of the unique chunk that represents it"
+    )
+    exact_duplicates: int = Field(default=0, description="Chunks removed as exact duplicates")
+    near_duplicates: int = Field(default=0, description="Chunks removed as near-duplicates")
+    lines_stripped: int = Field(default=0, description="Repeated header/footer lines removed")
@@ -0,0 +1,102 @@
+"""
+Removes exact and near-duplicate chunks before they are embedded.
+"""
+from src.agent.tools.base import Tool
+from src.agent.errors import DeduplicationError
+from src.agent.tools.chunk_store import ChunkStore
+from src.agent.tools.deduplicator.base import DeduplicatorInput, DeduplicatorOutput
+from src.agent.tools.deduplicator.simhash import (
+    SimHashIndex, exact_fingerprint, simhash, repeated_lines, line_key
+)
+from src.logging_config import get_logger
+
+
+class Deduplicator(Tool):
+    """
+    Collapses duplicate chunks so each distinct text is embedded, scored
+    and reranked only once.
+
+    Chunks are first matched exactly on their normalized text, then by
+    SimHash: chunks whose fingerprints are within max_hamming_distance
+    bits of an earlier chunk are treated as near-duplicates of it. The
+    first occurrence is kept and every input chunk is mapped to the
+    unique chunk that represents it.
+    """
+    def __init__(self, logger=None):
+        self.logger = logger or get_logger(__name__)
+
+    @property
+    def name(self) -> str:
+        """Tool name"""
+        return "Deduplicator"
+
+    def execute(self, input_data: DeduplicatorInput) -> DeduplicatorOutput:
+        """
+        Deduplicate the chunks.
+        """
+        try:
+            chunks = input_data.chunks
+            if len(chunks) == 0:
+                raise DeduplicationError("Cannot deduplicate empty list of chunks")
+
+            lines_stripped = 0
+            if input_data.strip_repeated_lines:
+                chunks, lines_stripped = self._strip_repeated_lines(
+                    chunks, input_data.repeated_line_ratio
+                )
+
+            index = SimHashIndex(input_data.max_hamming_distance)
+            exact: dict[bytes, int] = {}
+            source_indices, duplicate_of = [], []
+            exact_duplicates = near_duplicates = 0
+
+            for i, chunk in enumerate(chunks):
+                fingerprint = exact_fingerprint(chunk)
+                unique = exact.get(fingerprint)
+                if unique is not None:
+                    exact_duplicates += 1
+                else:
+                    fingerprint_bits = simhash(chunk)
+                    unique = index.query(fingerprint_bits)
+                    if unique >= 0:
+                        near_duplicates += 1
+                    else:
+                        unique = index.add(fingerprint_bits)
+                        source_indices.append(i)
+                    exact[fingerprint] = unique
+                duplicate_of.append(unique)
+
+            self.logger.info(
+                f"Kept {len(source_indices)} of {len(chunks)} chunks "
+                f"({exact_duplicates} exact, {near_duplicates} near-duplicates removed)"
+            )
+            return DeduplicatorOutput(
+                success=True,
+                chunks=chunks.take(source_indices),
+                source_indices=source_indices,
+                duplicate_of=duplicate_of,
+                exact_duplicates=exact_duplicates,
+                near_duplicates=near_duplicates,
+                lines_stripped=lines_stripped,
+            )
+
+        except DeduplicationError as e:
+            self.logger.error(f"DeduplicationError: {str(e)}")
+            return DeduplicatorOutput(success=False, error_message=str(e))
+        except Exception as e:
+            self.logger.error(f"Unexpected error in Deduplicator: {str(e)}", exc_info=True)
+            return DeduplicatorOutput(success=False, error_message=f"Unexpected error: {str(e)}")
+
+    def _strip_repeated_lines(self, chunks: ChunkStore, min_ratio: float) -> tuple[ChunkStore, int]:
+        """Remove lines repeated across chunks (headers, footers, page numbers)."""
+        repeated = repeated_lines(chunks, min_ratio=min_ratio)
+        if not repeated:
+            return chunks, 0
+        stripped, removed = [], 0
+        for chunk in chunks:
+            lines = chunk.splitlines(keepends=True)
+            kept = [line for line in lines if line_key(line) not in repeated]
+            removed += len(lines) - len(kept)
+            stripped.append("".join(kept).strip())
+        self.logger.debug(f"Stripped {removed} repeated lines ({len(repeated)} distinct)")
+        return ChunkStore.from_chunks(stripped), removed
@@ -0,0 +1,129 @@
+"""
+Exact and SimHash fingerprints of text chunks.
+"""
+import re
+import hashlib
+import numpy as np
+from collections import Counter
+
+_WORD = re.compile(r"\w+")
+_DIGITS = re.compile(r"\d+")
+SHINGLE_SIZE = 3 # Words per shingle
+HASH_BITS = 64
+_WORD_CACHE_SIZE = 1_000_000 # Words whose hash is memoized
+
+
+def normalize(text: str) -> str:
+    """Lowercase and collapse whitespace, so formatting differences do not matter."""
+    return " ".join(text.lower().split())
+
+
+def exact_fingerprint(text: str) -> bytes:
+    """Digest of the normalized text."""
+    return hashlib.blake2b(normalize(text).encode("utf-8"), digest_size=16).digest()
+
+
+_word_hashes: dict[str, int] = {}
+_MULTIPLIERS = np.array([0x9E3779B97F4A7C15, 0xC2B2AE3D27D4EB4F, 0x165667B19E3779F9], dtype=np.uint64)
+
+
+def _word_hash(word: str) -> int:
+    value = _word_hashes.get(word)
+    if value is None:
+        value = int.from_bytes(hashlib.blake2b(word.encode("utf-8"), digest_size=8).digest(), "little")
+        if len(_word_hashes) < _WORD_CACHE_SIZE:
+            _word_hashes[word] = value
+    return value
+
+
+def _mix(x: np.ndarray) -> np.ndarray:
+    """splitmix64 finalizer, spreading every input bit over the output."""
+    x = (x ^ (x >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    x = (x ^ (x >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return x ^ (x >> np.uint64(31))
+
+
+def _shingle_hashes(text: str) -> np.ndarray:
+    """Hash of every run of SHINGLE_SIZE consecutive words."""
+    words = [_word_hash(word) for word in _WORD.findall(text.lower())]
+    words = np.array(words + [0] * (SHINGLE_SIZE - len(words)), dtype=np.uint64)
+    count = len(words) - SHINGLE_SIZE + 1
+    combined = np.zeros(count, dtype=np.uint64)
+    with np.errstate(over="ignore"):
+        for offset, multiplier in enumerate(_MULTIPLIERS):
+            combined += words[offset:offset + count] * multiplier
+        return _mix(combined)
+
+
+def simhash(text: str) -> int:
+    """
+    64-bit SimHash over word shingles. Texts that share most of their
+    shingles get fingerprints that differ in only a few bits.
+    """
+    hashes = _shingle_hashes(text)
+    bits = np.unpackbits(hashes.view(np.uint8)).reshape(len(hashes), HASH_BITS)
+    votes = bits.sum(axis=0, dtype=np.int64) * 2 - len(hashes)
+    return int.from_bytes(np.packbits(votes > 0).tobytes(), "big")
+
+
+def hamming_distance(a: int, b: int) -> int:
+    return (a ^ b).bit_count()
+
+
+class SimHashIndex:
+    """
+    Finds fingerprints within max_distance bits of a query.
+
+    Fingerprints are split into max_distance + 1 bands. Two fingerprints
+    that differ in at most max_distance bits agree exactly on at least one
+    band (pigeonhole principle), so only fingerprints sharing a band with
+    the query are compared, instead of every stored fingerprint.
+    """
+    def __init__(self, max_distance: int = 6):
+        self.max_distance = max_distance
+        self.num_bands = max_distance + 1
+        bounds = np.linspace(0, HASH_BITS, self.num_bands + 1).astype(int)
+        self._bands = list(zip(bounds[:-1].tolist(), bounds[1:].tolist()))
+        self._tables: list[dict[int, list[int]]] = [{} for _ in self._bands]
+        self._fingerprints: list[int] = []
+
+    def _band_keys(self, fingerprint: int):
+        for start, end in self._bands:
+            yield (fingerprint >> start) & ((1 << (end - start)) - 1)
+
+    def query(self, fingerprint: int) -> int:
+        """Id of a stored fingerprint within max_distance bits, or -1."""
+        for table, key in zip(self._tables, self._band_keys(fingerprint)):
+            for item in table.get(key, ()):
+                if hamming_distance(fingerprint, self._fingerprints[item]) <= self.max_distance:
+                    return item
+        return -1
+
+    def add(self, fingerprint: int) -> int:
+        """Store a fingerprint and return its id."""
+        item = len(self._fingerprints)
+        self._fingerprints.append(fingerprint)
+        for table, key in zip(self._tables, self._band_keys(fingerprint)):
+            table.setdefault(key, []).append(item)
+        return item
+
+
+def repeated_lines(chunks, min_repeats: int = 3, min_ratio: float = 0.5,
+                   max_line_length: int = 120) -> set[str]:
+    """
+    Short lines that appear in at least min_ratio of the chunks, such as
+    page headers and footers. Digits are ignored, so "Page 3" and "Page 4"
+    count as the same line.
+    """
+    counts = Counter()
+    for chunk in chunks:
+        counts.update({
+            line_key(line) for line in chunk.splitlines()
+            if line.strip() and len(line) <= max_line_length
+        })
+    threshold = max(min_repeats, min_ratio * len(chunks))
+    return {line for line, count in counts.items() if count >= threshold}
+
+
+def line_key(line: str) -> str:
+    return _DIGITS.sub("#", normalize(line))
@@ -1,13 +1,17 @@
+from typing import Optional
 from pydantic import BaseModel, Field
 from src.agent.tools.base import ToolInput, ToolOutput
+from src.agent.tools.chunk_store import ChunkStore
+from src.agent.tools.embedding_matrix import EmbeddingMatrix, empty_embeddings
+from src.agent.tools.semantic_index import SemanticIndex
 
 class EmbedderInput(ToolInput):
     """
     Input for Embedder tool.
     """
-    chunks: list[str] = Field(
+    chunks: ChunkStore = Field(
         ...,
-        description="List of text chunks to convert to embeddings"
+        description="Text chunks to convert to embeddings"
     )
     model_name: str = Field(
         default="all-MiniLM-L6-v2",
@@ -16,9 +20,14 @@ class EmbedderInput(ToolInput):
 
 class EmbedderOutput(ToolOutput):
 
-    embeddings: list[list[float]] = Field(
-        default_factory=list,
-        description="List of embedding vectors"
+    embeddings: EmbeddingMatrix = Field(
+        default_factory=empty_embeddings,
+        description="Float32 matrix of embedding vectors, one row per chunk"
+    )
+    index: Optional[SemanticIndex] = Field(
+        default=None,
+        exclude=True,
+        description="SemanticIndex of the embeddings, to pass on to the Retriever"
     )
     embedding_dim: int = Field(
         default=0,
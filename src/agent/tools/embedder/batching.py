@@ -0,0 +1,47 @@
+"""
+Batched, length-bucketed encoding of text chunks.
+"""
+import numpy as np
+
+
+def encode_in_batches(model, texts: list[str], batch_size: int = 32) -> np.ndarray:
+    """
+    Encode texts in batches of similar length.
+
+    Texts are sorted by length so each batch pads to a similar size,
+    encoded batch by batch, then written back in their original order.
+    Models with an encode_batches() method, like EmbeddingPool, get all
+    batches at once and may encode them concurrently.
+
+    Args:
+        model: Object with a SentenceTransformer-style encode() method
+        texts: Texts to encode
+        batch_size: Number of texts per forward pass
+    Returns:
+        Contiguous float32 matrix of shape (len(texts), embedding_dim)
+    """
+    if batch_size <= 0:
+        raise ValueError(f"batch_size must be positive, got {batch_size}")
+    if len(texts) == 0:
+        return np.empty((0, 0), dtype=np.float32)
+
+    lengths = np.fromiter((len(text) for text in texts), dtype=np.int64, count=len(texts))
+    order = np.argsort(-lengths, kind="stable") # Longest first
+    batches = [order[start:start + batch_size] for start in range(0, len(texts), batch_size)]
+    texts_of_batches = ([texts[i] for i in batch_indices] for batch_indices in batches)
+    if hasattr(model, "encode_batches"):
+        results = model.encode_batches(texts_of_batches)
+    else:
+        results = (
+            model.encode(batch, batch_size=len(batch), convert_to_numpy=True)
+            for batch in texts_of_batches
+        )
+    embeddings = None
+
+    for batch_indices, vectors in zip(batches, results):
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if embeddings is None:
+            embeddings = np.empty((len(texts), vectors.shape[1]), dtype=np.float32)
+        embeddings[batch_indices] = vectors
+
+    return embeddings
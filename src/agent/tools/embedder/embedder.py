@@ -1,7 +1,14 @@
 import numpy as np
+from typing import Optional
 from sentence_transformers import SentenceTransformer
 from src.config import Config
 from src.agent.tools.base import Tool
+from src.agent.tools.model_registry import ModelRegistry
+from src.agent.tools.micro_batcher import shared_model
+from src.agent.tools.embedder.embedding_cache import EmbeddingCache, encode_cached
+from src.agent.tools.embedder.pool import get_embedding_pool
+from src.agent.tools.quantization import QuantizedEmbeddings
+from src.agent.tools.semantic_index import SemanticIndex
 from src.agent.errors import ToolError
 from src.agent.tools.embedder.base import EmbedderInput, EmbedderOutput
 from src.logging_config import get_logger
@@ -13,12 +20,20 @@ class EmbeddinError(ToolError):
 class Embedder(Tool):
     """
     Converts text chunks to vector embeddings.
+    Only chunks missing from the embedding cache are encoded, in the
+    process-wide EmbeddingPool when config.embedding_workers > 0. Unless
+    config.embedding_quantization is float32, the embeddings are returned
+    as QuantizedEmbeddings at that precision, with their SemanticIndex.
     """
-    def __init__(self, config: Config, logger=None):
+    def __init__(self, config: Config, logger=None, cache: Optional[EmbeddingCache] = None):
         self.config = config
         self.model_name = config.embedding_model
+        self.model_key = EmbeddingCache.model_key(config.embedding_model, config.embedding_model_revision)
+        self.batch_size = config.embedding_batch_size
+        self.workers = config.embedding_workers
+        self.quantization = config.embedding_quantization
         self.logger = logger or get_logger(__name__)
-        self._model = None # Lazy load model
+        self.cache = cache if cache is not None else EmbeddingCache.from_config(config)
 
     @property
     def name(self) -> str:
@@ -26,15 +41,14 @@ class Embedder(Tool):
         return "Embedder"
     
     def _load_model(self) -> SentenceTransformer:
-        if self._model is None:
-            try:
-                self.logger.debug(f"Loading embedding model: {self.model_name}")
-                self._model = SentenceTransformer(self.model_name)
-            except Exception as e:
-                raise EmbeddinError(
-                    f"Failed to load model {self.model_name}: {str(e)}"
-                ) from e
-        return self._model
+        try:
+            if self.workers > 0:
+                return get_embedding_pool(self.model_name, self.workers)
+            return shared_model(ModelRegistry.SENTENCE_TRANSFORMER, self.model_name)
+        except Exception as e:
+            raise EmbeddinError(
+                f"Failed to load model {self.model_name}: {str(e)}"
+            ) from e
     
     def execute(self, input_data: EmbedderInput) -> EmbedderOutput:
         """
@@ -45,10 +59,11 @@ class Embedder(Tool):
                 raise EmbeddinError("Cannot embed empty list of chunks")
             
             self.logger.debug(f"Embedding {len(input_data.chunks)} chunks")
-            model = self._load_model()
-            embeddings = model.encode(input_data.chunks, convert_to_tensor=False)
-            embeddings_list = [embedding.tolist() for embedding in embeddings]
-            embedding_dim = len(embeddings_list[0]) if embeddings_list else 0
+            embeddings = encode_cached(self._load_model, input_data.chunks, self.cache, self.model_key,
+                                       batch_size=self.batch_size)
+            if self.quantization != "float32":
+                embeddings = QuantizedEmbeddings.quantize(embeddings, self.quantization)
+            embedding_dim = embeddings.shape[1]
 
             self.logger.info(
                 f"Successfully embedded {len(input_data.chunks)} chunks."
@@ -56,7 +71,8 @@ class Embedder(Tool):
             )
             output = EmbedderOutput(
                 success=True,
-                embeddings=embeddings_list,
+                embeddings=embeddings,
+                index=SemanticIndex(embeddings),
                 embedding_dim=embedding_dim,
                 chunks_embedded=len(input_data.chunks)
             )
@@ -0,0 +1,344 @@
+"""
+Persistent cache of chunk embeddings.
+"""
+import os
+import time
+import sqlite3
+import hashlib
+import threading
+import numpy as np
+from pathlib import Path
+from typing import Any, Callable, Optional, Sequence
+from src.config import Config
+from src.agent.tools.embedder.batching import encode_in_batches
+from src.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+LOOKUP_BATCH = 500 # Hashes per SELECT, below SQLite's parameter limit
+COMPACT_MIN_BYTES = 16 * 2**20 # Vector files smaller than this are never compacted
+
+
+class EmbeddingCache:
+    """
+    Content-addressed store of chunk embeddings.
+
+    Vectors are keyed by the model (name and revision) and a hash of the
+    chunk text, so re-embedding an unchanged chunk is a lookup. Each model
+    has one file of float32 rows that is memory-mapped for reading; a
+    SQLite index in WAL mode maps (model, chunk hash) to a row and keeps
+    the last access time. When the vectors exceed max_bytes, the least
+    recently used ones are evicted.
+
+    Rows are only appended, and a row enters the index after its data is
+    written, so readers in other threads or processes never see a partly
+    written vector. Evicted rows leave dead space; once a file is mostly
+    dead it is compacted into a new file, and readers still mapping the
+    old one keep reading valid data until they pick up the new index.
+
+    Args:
+        path: Folder holding the index and the vector files
+        max_bytes: Maximum total size of the cached vectors (0 = unlimited)
+    """
+    def __init__(self, path: Path, max_bytes: int = 0):
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+
+        self.path.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._maps: dict[str, tuple[str, np.memmap]] = {} # model -> (file, mapping)
+        self._conn = sqlite3.connect(str(self.path / "index.sqlite3"), timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS stores ("
+            " model TEXT PRIMARY KEY,"
+            " dim INTEGER NOT NULL,"
+            " file TEXT NOT NULL,"
+            " next_row INTEGER NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS vectors ("
+            " model TEXT NOT NULL,"
+            " chunk BLOB NOT NULL,"
+            " row INTEGER NOT NULL,"
+            " last_access REAL NOT NULL,"
+            " PRIMARY KEY (model, chunk)) WITHOUT ROWID"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_vectors_last_access ON vectors(last_access)")
+        self._conn.commit()
+
+    @classmethod
+    def from_config(cls, config: Config) -> Optional["EmbeddingCache"]:
+        """Build the cache described by config, or None if caching is disabled."""
+        if not config.embedding_cache_enabled:
+            return None
+        return cls(path=config.embedding_cache_path, max_bytes=config.embedding_cache_max_mb * 2**20)
+
+    @staticmethod
+    def model_key(model_name: str, revision: str = "") -> str:
+        """Identifies the model that produced the vectors."""
+        return f"{model_name}@{revision}" if revision else model_name
+
+    @staticmethod
+    def chunk_hash(text: str) -> bytes:
+        """16-byte digest of a chunk's text."""
+        return hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
+
+    def get(self, model: str, hashes: Sequence[bytes]) -> tuple[Optional[np.ndarray], np.ndarray]:
+        """
+        Look up the vectors of chunks.
+
+        Returns:
+            A float32 matrix with one row per hash (zeros for misses), or
+            None if nothing is cached for model, and a boolean mask of hits.
+        """
+        found = np.zeros(len(hashes), dtype=bool)
+        with self._lock:
+            # One read transaction, so all rows come from the same file even if another process compacts it
+            self._conn.execute("BEGIN")
+            try:
+                store = self._conn.execute(
+                    "SELECT dim, file, next_row FROM stores WHERE model = ?", (model,)
+                ).fetchone()
+                rows = {}
+                if store is not None:
+                    unique = list(dict.fromkeys(hashes))
+                    for start in range(0, len(unique), LOOKUP_BATCH):
+                        batch = unique[start:start + LOOKUP_BATCH]
+                        rows.update(self._conn.execute(
+                            f"SELECT chunk, row FROM vectors WHERE model = ? AND chunk IN "
+                            f"({','.join('?' * len(batch))})",
+                            (model, *batch),
+                        ).fetchall())
+            finally:
+                self._conn.commit()
+            if store is None:
+                self.misses += len(hashes)
+                return None, found
+
+            dim, file, next_row = store
+            vectors = np.zeros((len(hashes), dim), dtype=np.float32)
+            positions = [i for i, chunk in enumerate(hashes) if chunk in rows]
+            if positions:
+                try:
+                    matrix = self._map(model, file, dim, next_row)
+                    vectors[positions] = matrix[[rows[hashes[i]] for i in positions]]
+                    found[positions] = True
+                except (OSError, ValueError) as e:
+                    # The file was compacted away before this process mapped it
+                    logger.debug(f"Embedding cache file {file} is gone: {e}")
+                    positions = []
+
+            if positions:
+                now = time.time()
+                self._conn.executemany(
+                    "UPDATE vectors SET last_access = ? WHERE model = ? AND chunk = ?",
+                    [(now, model, chunk) for chunk in {hashes[i] for i in positions}],
+                )
+                self._conn.commit()
+            self.hits += len(positions)
+            self.misses += len(hashes) - len(positions)
+        return vectors, found
+
+    def put(self, model: str, hashes: Sequence[bytes], vectors: np.ndarray) -> None:
+        """Store the vectors of chunks and evict old entries if over the size limit."""
+        vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+        if len(hashes) == 0:
+            return
+        dim = vectors.shape[1]
+        with self._lock:
+            # Writers are serialized by the write lock, held until the rows are indexed
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                store = self._conn.execute(
+                    "SELECT dim, file, next_row FROM stores WHERE model = ?", (model,)
+                ).fetchone()
+                if store is None:
+                    store = (dim, f"{self._file_prefix(model)}-0.f32", 0)
+                    self._conn.execute("INSERT INTO stores VALUES (?, ?, ?, ?)", (model, *store))
+                store_dim, file, next_row = store
+                if store_dim != dim:
+                    raise ValueError(f"Cached vectors of {model} have {store_dim} dimensions, got {dim}")
+
+                new = {}
+                for i, chunk in enumerate(hashes):
+                    new.setdefault(chunk, i)
+                candidates = list(new)
+                for start in range(0, len(candidates), LOOKUP_BATCH):
+                    batch = candidates[start:start + LOOKUP_BATCH]
+                    for (chunk,) in self._conn.execute(
+                        f"SELECT chunk FROM vectors WHERE model = ? AND chunk IN ({','.join('?' * len(batch))})",
+                        (model, *batch),
+                    ).fetchall():
+                        new.pop(chunk, None)
+                if new:
+                    self._write_rows(file, next_row, vectors[list(new.values())])
+                    now = time.time()
+                    self._conn.executemany(
+                        "INSERT INTO vectors (model, chunk, row, last_access) VALUES (?, ?, ?, ?)",
+                        [(model, chunk, next_row + n, now) for n, chunk in enumerate(new)],
+                    )
+                    self._conn.execute(
+                        "UPDATE stores SET next_row = ? WHERE model = ?", (next_row + len(new), model)
+                    )
+                    self._evict()
+                self._conn.commit()
+            except Exception:
+                self._conn.rollback()
+                raise
+            for stale in self._compact():
+                (self.path / stale).unlink(missing_ok=True)
+
+    def stats(self) -> dict:
+        """Hit/miss counters and current size."""
+        with self._lock:
+            entries, total_bytes = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(s.dim * 4), 0) FROM vectors v JOIN stores s USING (model)"
+            ).fetchone()
+            file_bytes = sum(
+                (self.path / file).stat().st_size
+                for (file,) in self._conn.execute("SELECT file FROM stores")
+                if (self.path / file).exists()
+            )
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "entries": entries,
+            "total_bytes": total_bytes,
+            "file_bytes": file_bytes,
+        }
+
+    def clear(self) -> None:
+        with self._lock:
+            files = [file for (file,) in self._conn.execute("SELECT file FROM stores")]
+            self._conn.execute("DELETE FROM vectors")
+            self._conn.execute("DELETE FROM stores")
+            self._conn.commit()
+            self._maps.clear()
+        for file in files:
+            (self.path / file).unlink(missing_ok=True)
+
+    def close(self) -> None:
+        with self._lock:
+            self._maps.clear()
+            self._conn.close()
+
+    @staticmethod
+    def _file_prefix(model: str) -> str:
+        return hashlib.blake2b(model.encode("utf-8"), digest_size=8).hexdigest()
+
+    def _map(self, model: str, file: str, dim: int, rows: int) -> np.memmap:
+        """Read-only mapping of a vector file covering at least rows rows. Caller must hold the lock."""
+        mapped_file, matrix = self._maps.get(model, (None, None))
+        if mapped_file != file or len(matrix) < rows:
+            matrix = np.memmap(self.path / file, dtype=np.float32, mode="r", shape=(rows, dim))
+            self._maps[model] = (file, matrix)
+        return matrix
+
+    def _write_rows(self, file: str, first_row: int, vectors: np.ndarray) -> None:
+        fd = os.open(self.path / file, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            os.pwrite(fd, vectors.tobytes(), first_row * vectors.shape[1] * 4)
+        finally:
+            os.close(fd)
+
+    def _evict(self) -> None:
+        """Drop the least recently used vectors past max_bytes. Caller must hold the write transaction."""
+        if self.max_bytes <= 0:
+            return
+        dims = dict(self._conn.execute("SELECT model, dim * 4 FROM stores").fetchall())
+        total = self._conn.execute(
+            "SELECT COALESCE(SUM(s.dim * 4), 0) FROM vectors v JOIN stores s USING (model)"
+        ).fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        evicted = []
+        for model, chunk in self._conn.execute(
+            "SELECT model, chunk FROM vectors ORDER BY last_access ASC"
+        ).fetchall():
+            if total <= self.max_bytes:
+                break
+            evicted.append((model, chunk))
+            total -= dims[model]
+        self._conn.executemany("DELETE FROM vectors WHERE model = ? AND chunk = ?", evicted)
+        logger.debug(f"Evicted {len(evicted)} embedding cache entries")
+
+    @staticmethod
+    def _needs_compaction(dim: int, rows: int, live: int) -> bool:
+        """Whether more than half of a large enough file is evicted rows."""
+        return rows * dim * 4 >= COMPACT_MIN_BYTES and live * 2 < rows
+
+    def _compact(self) -> list[str]:
+        """
+        Rewrite vector files that are mostly evicted rows into new files.
+        Returns the replaced files, to delete once the new index is committed.
+        Caller must hold the lock.
+        """
+        replaced = []
+        candidates = [model for model, dim, next_row, live in self._conn.execute(
+            "SELECT s.model, s.dim, s.next_row, COUNT(v.chunk) FROM stores s"
+            " LEFT JOIN vectors v USING (model) GROUP BY s.model"
+        ).fetchall() if self._needs_compaction(dim, next_row, live)]
+        for model in candidates:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                # Checked again under the write lock, another process may have compacted it
+                dim, file, next_row = self._conn.execute(
+                    "SELECT dim, file, next_row FROM stores WHERE model = ?", (model,)
+                ).fetchone()
+                live = self._conn.execute(
+                    "SELECT chunk, row FROM vectors WHERE model = ? ORDER BY row", (model,)
+                ).fetchall()
+                if not self._needs_compaction(dim, next_row, len(live)):
+                    self._conn.rollback()
+                    continue
+                generation = int(file.rsplit("-", 1)[1].split(".")[0]) + 1
+                new_file = f"{self._file_prefix(model)}-{generation}.f32"
+                (self.path / new_file).unlink(missing_ok=True)
+                if live:
+                    old = np.memmap(self.path / file, dtype=np.float32, mode="r", shape=(next_row, dim))
+                    self._write_rows(new_file, 0, np.asarray(old[[row for _, row in live]]))
+                    del old
+                self._conn.executemany(
+                    "UPDATE vectors SET row = ? WHERE model = ? AND chunk = ?",
+                    [(n, model, chunk) for n, (chunk, _) in enumerate(live)],
+                )
+                self._conn.execute(
+                    "UPDATE stores SET file = ?, next_row = ? WHERE model = ?", (new_file, len(live), model)
+                )
+                self._conn.commit()
+            except Exception:
+                self._conn.rollback()
+                raise
+            self._maps.pop(model, None)
+            replaced.append(file)
+            logger.debug(f"Compacted embedding cache of {model} to {len(live)} rows")
+        return replaced
+
+
+def encode_cached(load_model: Callable[[], Any], texts: list[str], cache: Optional[EmbeddingCache],
+                  model_key: str, batch_size: int = 32) -> np.ndarray:
+    """
+    encode_in_batches that only encodes the texts missing from cache and
+    stores them. Cached and new vectors are returned in the order of texts.
+    The model is only loaded, through load_model, if something is missing.
+    """
+    if cache is None or len(texts) == 0:
+        return encode_in_batches(load_model(), texts, batch_size=batch_size)
+    hashes = [EmbeddingCache.chunk_hash(text) for text in texts]
+    embeddings, found = cache.get(model_key, hashes)
+    misses = np.flatnonzero(~found)
+    if len(misses) == 0:
+        return embeddings
+    encoded = encode_in_batches(load_model(), [texts[i] for i in misses], batch_size=batch_size)
+    try:
+        cache.put(model_key, [hashes[i] for i in misses], encoded)
+    except (sqlite3.Error, OSError) as e:
+        # The vectors are still good, only the next run has to encode them again
+        logger.warning(f"Could not store embeddings in the cache: {e}")
+    if embeddings is None or len(misses) == len(texts):
+        return encoded
+    embeddings[misses] = encoded
+    return embeddings
@@ -0,0 +1,157 @@
+"""
+Process pool that encodes batches of texts with one model copy per worker.
+"""
+import os
+import atexit
+import threading
+import numpy as np
+import multiprocessing
+from collections import deque
+from typing import Callable, Iterable, Iterator, Optional
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from src.agent.tools.model_registry import _load_sentence_transformer
+from src.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+BATCHES_PER_WORKER = 2 # Batches in flight per worker, so workers never wait for the next one
+
+_worker_model = None
+
+
+def available_cores() -> list[int]:
+    """Cores this process may run on."""
+    if hasattr(os, "sched_getaffinity"):
+        return sorted(os.sched_getaffinity(0))
+    return list(range(os.cpu_count() or 1))
+
+
+def split_cores(cores: list[int], workers: int) -> list[list[int]]:
+    """Split cores into `workers` contiguous groups of nearly equal size."""
+    if workers > len(cores):
+        # More workers than cores: workers share cores round-robin
+        return [[cores[i % len(cores)]] for i in range(workers)]
+    return [group.tolist() for group in np.array_split(np.array(cores), workers)]
+
+
+def _init_worker(model_name: str, loader: Callable, core_groups) -> None:
+    """Pin the worker to its cores and load its copy of the model."""
+    global _worker_model
+    cores = core_groups.get()
+    if hasattr(os, "sched_setaffinity"):
+        os.sched_setaffinity(0, cores)
+    try:
+        import torch
+        torch.set_num_threads(len(cores))
+    except ImportError:
+        pass
+    _worker_model = loader(model_name)
+
+
+def _encode_batch(texts: list[str]) -> np.ndarray:
+    return np.asarray(
+        _worker_model.encode(texts, batch_size=len(texts), convert_to_numpy=True),
+        dtype=np.float32,
+    )
+
+
+class EmbeddingPool:
+    """
+    Encodes batches of texts in worker processes, each holding its own
+    copy of the model and pinned to its own group of cores.
+
+    A single process runs one forward pass at a time, and torch's
+    intra-op threads scale poorly on small batches. With the cores split
+    between workers, several batches are encoded at once, so throughput
+    grows with the number of cores. Workers are started with "spawn",
+    since torch does not survive fork, and load the model on start.
+
+    The pool can stand in for a SentenceTransformer in encode_in_batches,
+    which hands it all batches at once through encode_batches.
+
+    Args:
+        model_name: SentenceTransformer model loaded by every worker
+        workers: Number of worker processes
+        loader: Picklable function loading a model by name
+        cores: Cores to split between the workers (default: all available)
+    """
+    def __init__(self, model_name: str, workers: int, loader: Callable = _load_sentence_transformer,
+                 cores: Optional[list[int]] = None):
+        if workers <= 0:
+            raise ValueError(f"workers must be positive, got {workers}")
+        self.model_name = model_name
+        self.workers = workers
+        self.core_groups = split_cores(cores or available_cores(), workers)
+        context = multiprocessing.get_context("spawn")
+        core_queue = context.Queue()
+        for group in self.core_groups:
+            core_queue.put(group)
+        self._pool = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=context,
+            initializer=_init_worker,
+            initargs=(model_name, loader, core_queue),
+        )
+        self.closed = False
+        logger.info(f"Embedding pool for {model_name}: {workers} workers on cores {self.core_groups}")
+
+    def encode_batches(self, batches: Iterable[list[str]]) -> Iterator[np.ndarray]:
+        """
+        Encode batches concurrently and yield their float32 embeddings in
+        order. At most BATCHES_PER_WORKER batches per worker are queued.
+        """
+        in_flight = deque()
+        try:
+            for batch in batches:
+                if len(in_flight) >= self.workers * BATCHES_PER_WORKER:
+                    yield in_flight.popleft().result()
+                in_flight.append(self._pool.submit(_encode_batch, list(batch)))
+            while in_flight:
+                yield in_flight.popleft().result()
+        except BrokenProcessPool:
+            self.close()
+            raise
+        finally:
+            for future in in_flight:
+                future.cancel()
+
+    def encode(self, sentences, batch_size: int = 32, convert_to_numpy: bool = True, **kwargs) -> np.ndarray:
+        """SentenceTransformer-style encode of a text or a list of texts."""
+        if isinstance(sentences, str):
+            return self.encode([sentences], batch_size=batch_size)[0]
+        sentences = list(sentences)
+        batches = [sentences[start:start + batch_size] for start in range(0, len(sentences), batch_size)]
+        if not batches:
+            return np.empty((0, 0), dtype=np.float32)
+        return np.concatenate(list(self.encode_batches(batches)))
+
+    def close(self, wait: bool = False) -> None:
+        self.closed = True
+        self._pool.shutdown(wait=wait, cancel_futures=True)
+
+
+_pools: dict[tuple[str, int], EmbeddingPool] = {}
+_pools_lock = threading.Lock()
+
+
+def get_embedding_pool(model_name: str, workers: int) -> EmbeddingPool:
+    """
+    The process-wide pool of model_name with `workers` workers, started
+    on first use and restarted if a worker died.
+    """
+    key = (model_name, workers)
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None or pool.closed:
+            pool = _pools[key] = EmbeddingPool(model_name, workers)
+        return pool
+
+
+@atexit.register
+def _close_pools() -> None:
+    with _pools_lock:
+        for pool in _pools.values():
+            # Waiting lets workers that are still starting exit cleanly
+            pool.close(wait=True)
+        _pools.clear()
@@ -0,0 +1,68 @@
+"""
+Embeddings passed between tools as one contiguous float32 matrix.
+"""
+import numpy as np
+from typing import Any, Annotated, Union
+from src.agent.tools.quantization import QuantizedEmbeddings
+
+
+def as_embedding_matrix(value: Any) -> Union[np.ndarray, QuantizedEmbeddings]:
+    """
+    value as a C-contiguous float32 matrix of shape (num_chunks, embedding_dim).
+    Arrays that already have this layout are returned as-is, without a copy,
+    and so are QuantizedEmbeddings.
+
+    Raises:
+        ValueError: If value is not a 2-D array or a list of equal-length vectors.
+    """
+    if isinstance(value, QuantizedEmbeddings):
+        return value
+    if isinstance(value, np.ndarray):
+        array = value
+    elif isinstance(value, (list, tuple)):
+        if len(value) == 0:
+            return empty_embeddings()
+        try:
+            array = np.array(value, dtype=np.float32)
+        except (ValueError, TypeError) as e:
+            raise ValueError(f"Embeddings must be equal-length numeric vectors: {e}") from e
+    else:
+        raise ValueError(f"Expected an ndarray or a list of vectors, got {type(value).__name__}")
+    if array.ndim != 2:
+        raise ValueError(f"Embeddings must be a 2-D matrix, got shape {array.shape}")
+    return np.ascontiguousarray(array, dtype=np.float32)
+
+
+def empty_embeddings() -> np.ndarray:
+    return np.zeros((0, 0), dtype=np.float32)
+
+
+def _to_lists(matrix: Union[np.ndarray, QuantizedEmbeddings]) -> list[list[float]]:
+    if isinstance(matrix, QuantizedEmbeddings):
+        matrix = matrix.dequantize()
+    return matrix.tolist()
+
+
+class _EmbeddingMatrixSchema:
+    """
+    Pydantic schema of EmbeddingMatrix: validation keeps ndarrays as they
+    are (after as_embedding_matrix) instead of checking every float, and
+    the matrix is only turned into nested lists when dumped to JSON.
+    """
+    @classmethod
+    def __get_pydantic_core_schema__(cls, source_type, handler):
+        from pydantic_core import core_schema
+        return core_schema.no_info_plain_validator_function(
+            as_embedding_matrix,
+            serialization=core_schema.plain_serializer_function_ser_schema(
+                _to_lists, when_used="json"
+            ),
+        )
+
+    @classmethod
+    def __get_pydantic_json_schema__(cls, core_schema, handler):
+        return {"type": "array", "items": {"type": "array", "items": {"type": "number"}}}
+
+
+# Field type of embedding matrices in tool inputs and outputs
+EmbeddingMatrix = Annotated[Union[np.ndarray, QuantizedEmbeddings], _EmbeddingMatrixSchema]
@@ -1,6 +1,9 @@
 from pathlib import Path
+from typing import Literal
 from pydantic import Field
 from src.agent.tools.base import ToolInput, ToolOutput
+from src.agent.tools.chunk_store import ChunkStore
+from src.agent.tools.file_processor.readers import supported_extensions
 
 
 class FileProcessorInput(ToolInput):
@@ -12,13 +15,18 @@ class FileProcessorInput(ToolInput):
         default=200,
         description="Character overlap between consecutive chunks for context."
     )
+    chunk_strategy: Literal["characters", "tokens"] = Field(
+        default="characters",
+        description="'characters': fixed windows of chunk_size characters. "
+                    "'tokens': whole sentences packed up to the embedding model's "
+                    "max sequence length (chunk_size and chunk_overlap are ignored)."
+    )
 
     def validate_file(self) -> bool:
         return Path(self.file_path).exists() 
     
     def validate_file_type(self) -> bool:
-        ext = Path(self.file_path).suffix.lower()
-        return ext in ['.pdf', '.txt']
+        return Path(self.file_path).suffix.lower() in supported_extensions()
     
 class FileProcessorOutput(ToolOutput):
 
@@ -26,9 +34,9 @@ class FileProcessorOutput(ToolOutput):
         default="",
         description="Name of the processed file"
     )
-    chunks: list[str] = Field(
-        default_factory=list,
-        description="List of text chunks extracted from the file"
+    chunks: ChunkStore = Field(
+        default_factory=ChunkStore,
+        description="Text chunks extracted from the file"
     )
     chunk_count: int = Field(
         default=0,
@@ -1,11 +1,22 @@
 """
 Extracts and chunks text from PDF/TXT files.
 """
-import re
 from pathlib import Path
+from typing import Iterator, Optional
+from contextlib import closing
 from src.agent.tools.base import Tool
 from src.agent.errors import FileProcessingError
 from src.agent.tools.file_processor.base import FileProcessorInput, FileProcessorOutput
+from src.agent.tools.file_processor.streaming import iter_pdf_pages, stop_at_section
+from src.agent.tools.file_processor.readers import reader_for, supported_extensions
+from src.agent.tools.file_processor.text_cache import TextCache
+from src.agent.manifest import file_content_hash
+from src.agent.tools.file_processor.sections import SectionScanner
+from src.agent.tools.file_processor.parallel import iter_pdf_pages_parallel, pdf_page_count
+from src.agent.tools.file_processor.mmap_store import MappedChunkStore
+from src.agent.tools.file_processor.token_chunker import TokenChunker
+from src.agent.tools.chunk_store import ChunkStore
+from src.agent.tools.model_registry import get_model_registry
 from src.logging_config import get_logger
 
 
@@ -13,9 +24,14 @@ class FileProcessor(Tool):
     """
     Reads files and extracts/chunks test
     """
-    def __init__(self, config, logger=None):
+    def __init__(self, config, logger=None, text_cache: Optional[TextCache] = None):
         self.config = config
         self.logger = logger or get_logger(__name__)
+        self.text_cache = text_cache if text_cache is not None else TextCache.from_config(config)
+        # Text is cut at the first heading of one of these sections
+        self.sections = (
+            SectionScanner.for_names(list(config.cutoff_sections)) if config.cutoff_sections else None
+        )
 
     @property
     def name(self) -> str:
@@ -40,30 +56,37 @@ class FileProcessor(Tool):
             
             if not input_data.validate_file_type():
                 raise FileProcessingError(
-                    f"Unsupported file type: {input_data.file_path}"
-                    "Supported types: .pdf, .txt"
+                    f"Unsupported file type: {input_data.file_path}. "
+                    f"Supported types: {', '.join(sorted(supported_extensions()))}"
                     )
             logger.info(f"Reading file: {input_data.file_path}")
-            raw_text = self._read_file(input_data.file_path)
-            logger.debug(f"Read {len(raw_text)} characters from file.")
-
-            logger.debug("Cleaning text ...")
-            cleaned_text = self._clean_text(raw_text)
-            logger.debug(f"Cleaned text: {len(cleaned_text)} characters")
-
             logger.debug(
-              f"Chunking text with size={input_data.chunk_size}, "
+              f"Chunking text by {input_data.chunk_strategy} with size={input_data.chunk_size}, "
               f"overlap={input_data.chunk_overlap}"
             )
-            chunks = self._chunk_text(
-                cleaned_text,
-                input_data.chunk_size,
-                input_data.chunk_overlap
-            )
+            if input_data.chunk_strategy == "characters" and self._use_mmap(input_data.file_path):
+                # Large text files are chunked by offset in a memory map and
+                # only decoded when a chunk is read
+                chunks = MappedChunkStore(
+                    input_data.file_path,
+                    input_data.chunk_size,
+                    input_data.chunk_overlap,
+                    self.sections
+                )
+            else:
+                text = self._extract_text(input_data.file_path)
+                if input_data.chunk_strategy == "tokens":
+                    chunks = self._token_chunks(text)
+                else:
+                    chunks = self._chunk_store(
+                        text,
+                        input_data.chunk_size,
+                        input_data.chunk_overlap
+                    )
             logger.info(f"Created {len(chunks)} chunks")
 
             # Calculate some statistics
-            total_chars = sum(len(chunk) for chunk in chunks)
+            total_chars = chunks.total_characters
             file_size = Path(input_data.file_path).stat().st_size
 
             # Build the output
@@ -96,8 +119,37 @@ class FileProcessor(Tool):
                 filename=input_data.file_path
             )
 
+    def _extract_text(self, file_path: str) -> str:
+        """
+        Cleaned text of a file, from the text cache when it was extracted before.
+        Plain text files are cheap to read again and are not cached.
+        """
+        cacheable = self.text_cache is not None and Path(file_path).suffix.lower() != '.txt'
+        if cacheable:
+            content_hash = file_content_hash(file_path)
+            extractor = f"{Path(file_path).suffix.lower()}:{','.join(self.config.cutoff_sections)}"
+            text = self.text_cache.get(content_hash, extractor)
+            if text is not None:
+                self.logger.debug(f"Using cached text of {file_path}")
+                return text
+
+        # Pages are extracted lazily and extraction stops at the first
+        # unwanted section, so e.g. references are never read
+        with closing(self._iter_pages(file_path)) as pages:
+            if self.sections is not None:
+                pages = stop_at_section(pages, self.sections)
+            text = "".join(pages).strip()
+
+        if cacheable:
+            self.text_cache.put(content_hash, extractor, text)
+        return text
+
     def _read_file(self, file_path: str) -> str:
         """Read PDF and TXT"""
+        return "".join(self._iter_pages(file_path))
+
+    def _iter_pages(self, file_path: str) -> Iterator[str]:
+        """Yield the text of a PDF page by page, or of other formats piece by piece."""
         try:
             path = Path(file_path)
             if not path.exists():
@@ -105,57 +157,53 @@ class FileProcessor(Tool):
             
             ext = path.suffix.lower()
             if ext == '.pdf':
-                try:
-                    from PyPDF2 import PdfReader
-                except ImportError:
-                    raise FileProcessingError("PyPDF2 not installed.")
-                reader = PdfReader(file_path)
-                text = ""
-                for page in reader.pages:
-                    text += page.extract_text()
-                return text
-            elif ext == '.txt':
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    return f.read()
+                # Each page starts a new line, so headings at the top of a page are found
+                for page in self._iter_pdf_pages(path):
+                    yield page + "\n"
+            elif reader_for(path) is not None:
+                yield from reader_for(path).iter_pages(path)
 
             else: # Unsupported format.
-                raise FileProcessingError(f"Unsupported file format: {ext}. Supported format are .pdf, .txt")                   
+                raise FileProcessingError(
+                    f"Unsupported file format: {ext}. "
+                    f"Supported format are {', '.join(sorted(supported_extensions()))}"
+                )
         except FileProcessingError:
             raise
 
         except Exception as e:
             raise FileProcessingError(f"Failed to read file {file_path}: {str(e)}") from e
     
+    def _use_mmap(self, file_path: str) -> bool:
+        """Whether a file is a text file large enough to be memory-mapped."""
+        path = Path(file_path)
+        min_bytes = self.config.txt_mmap_min_mb * 1024 * 1024
+        return path.suffix.lower() == '.txt' and path.stat().st_size >= min_bytes
+
+    def _iter_pdf_pages(self, path: Path) -> Iterator[str]:
+        """
+        Extract large PDFs in parallel over page ranges, and small ones
+        serially, where starting worker processes would cost more than it saves.
+        """
+        workers = self.config.pdf_extract_workers
+        if workers > 1:
+            num_pages = pdf_page_count(path)
+            if num_pages >= self.config.pdf_parallel_min_pages:
+                self.logger.debug(f"Extracting {num_pages} pages with {workers} processes")
+                yield from iter_pdf_pages_parallel(path, workers, num_pages)
+                return
+        yield from iter_pdf_pages(path)
+
     def _clean_text(self, text: str) -> str:
         """
         Removes unwanted sections
         Such as references, bibliography, etc..."""
-        text_lower = text.lower()
-
-        unwanted_sections = [
-            r'references?\s*\n',         
-            r'bibliography\s*\n',       
-            r'appendix\s+[a-z]?\s*\n', 
-            r'appendices\s*\n',        
-            r'index\s*\n',             
-            r'acknowledgments?\s*\n',  
-            r'works? cited\s*\n',
-        ]
-
-        earliest_match = None
-        earliest_position = len(text)
-
-        for pattern in unwanted_sections:
-            match = re.search(pattern, text_lower)
-            if match:
-                if match.start() < earliest_position:
-                    earliest_position = match.start()
-                    earliest_match = match
+        boundary = self.sections.first(text) if self.sections is not None else None
 
         # If a section was found, keep only text before it
-        if earliest_match:
-            text = text[:earliest_match.start()]
-            self.logger.debug(f"Removed text after: {earliest_match.group()}")
+        if boundary:
+            self.logger.debug(f"Removed text after: {text[boundary.start:boundary.end]}")
+            text = text[:boundary.start]
 
         return text.strip()
 
@@ -164,6 +212,13 @@ class FileProcessor(Tool):
         Split text into overlapping chunks
         Chunks overlap to provide context for semantic search.
         """
+        return self._chunk_store(text, chunk_size, overlap).tolist()
+
+    def _chunk_store(self, text: str, chunk_size: int, overlap: int) -> ChunkStore:
+        """
+        Overlapping chunks of text as offsets into a single copy of it.
+        Each chunk starts (chunk_size - overlap) characters after the previous one.
+        """
         if chunk_size <= 0:
             raise FileProcessingError(f"Chunk_size must be a positive number, got {chunk_size}")
         
@@ -172,20 +227,20 @@ class FileProcessor(Tool):
         
         if not text:
             raise FileProcessingError("Cannot chunk empty text")
-        
-        chunks = []
-        start = 0
-
-        while start < len(text):
-            end = min(start + chunk_size, len(text))
-
-            chunk = text[start:end]
-            chunks.append(chunk)
-
-            # Move start position by (chunk_size - overlap)
-            # THis creates the overlap for context
-            step = chunk_size - overlap
-            start += step
-        return chunks
 
+        return ChunkStore.from_text(text, chunk_size, overlap)
 
+    def _token_chunks(self, text: str) -> ChunkStore:
+        """
+        Whole sentences packed up to the embedding model's max sequence length,
+        counted with the model's own tokenizer.
+        """
+        if not text:
+            raise FileProcessingError("Cannot chunk empty text")
+        try:
+            tokenizer = get_model_registry().tokenizer(self.config.embedding_model)
+        except Exception as e:
+            raise FileProcessingError(
+                f"Could not load tokenizer of {self.config.embedding_model}: {str(e)}"
+            ) from e
+        return TokenChunker(tokenizer, self.config.embedding_max_tokens).chunk(text)
@@ -0,0 +1,103 @@
+"""
+Offset-based chunks of a memory-mapped text file.
+"""
+import re
+import mmap
+import numpy as np
+from pathlib import Path
+from typing import Optional
+from src.agent.errors import FileProcessingError
+from src.agent.tools.chunk_store import ChunkStore
+from src.agent.tools.file_processor.sections import UNWANTED_SECTIONS, SectionScanner
+
+_NON_SPACE = re.compile(rb"\S")
+_STRIP_BLOCK = 1 << 12 # Bytes inspected at a time when stripping trailing whitespace
+
+
+def _align_to_characters(data: np.ndarray, offsets: np.ndarray, end: int) -> np.ndarray:
+    """Move offsets that fall inside a UTF-8 sequence back to the start of its character."""
+    offsets = offsets.copy()
+    for _ in range(3): # UTF-8 characters have at most 3 continuation bytes
+        inside = offsets < end
+        inside[inside] = (data[offsets[inside]] & 0xC0) == 0x80
+        if not inside.any():
+            break
+        offsets[inside] -= 1
+    return offsets
+
+
+class MappedChunkStore(ChunkStore):
+    """
+    ChunkStore of a UTF-8 text file, whose (start, end) offsets are byte
+    offsets into a read-only memory map of the file.
+
+    The file is never loaded into a Python string: the cut-off section is
+    searched directly in the mapping and a chunk is only decoded when it
+    is accessed, so memory use is independent of the file
+    size apart from the offset arrays and the pages the OS keeps cached.
+
+    chunk_size and overlap are counted in bytes, which equals characters
+    for ASCII text. Offsets are moved back to character boundaries, so
+    chunks never split a multi-byte character.
+
+    Slices share the mapping, so they can only be read while the store is
+    open. The mapping is released by close() or when the store is garbage
+    collected.
+    """
+    __slots__ = ("path",)
+
+    def __init__(self, file_path: Path, chunk_size: int, overlap: int,
+                 scanner: Optional[SectionScanner] = UNWANTED_SECTIONS):
+        if chunk_size <= 0:
+            raise FileProcessingError(f"Chunk_size must be a positive number, got {chunk_size}")
+        if overlap < 0 or overlap >= chunk_size:
+            raise FileProcessingError(f"overlap must be positive and inferior to chunk_size")
+
+        self.path = Path(file_path)
+        self._source = None
+        with self.path.open("rb") as f:
+            if self.path.stat().st_size == 0:
+                raise FileProcessingError("Cannot chunk empty text")
+            self._source = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        begin, end = self._content_bounds(scanner)
+        if begin >= end:
+            self.close()
+            raise FileProcessingError("Cannot chunk empty text")
+
+        starts = np.arange(begin, end, chunk_size - overlap, dtype=np.int64)
+        ends = np.minimum(starts + chunk_size, end)
+        data = np.frombuffer(self._source, dtype=np.uint8)
+        self.starts = _align_to_characters(data, starts, end)
+        self.ends = _align_to_characters(data, ends, end)
+        del data # Release the buffer export so the mapping can be closed
+
+    def _content_bounds(self, scanner: Optional[SectionScanner]) -> tuple[int, int]:
+        """Byte range left after cutting at the first unwanted section and stripping whitespace."""
+        boundary = scanner.first(self._source) if scanner is not None else None
+        end = boundary.start if boundary else len(self._source)
+
+        first = _NON_SPACE.search(self._source, 0, end)
+        begin = first.start() if first else end
+        while end > begin:
+            block = self._source[max(begin, end - _STRIP_BLOCK):end]
+            stripped = block.rstrip()
+            end -= len(block) - len(stripped)
+            if stripped:
+                break
+        return begin, end
+
+    def _text(self, start: int, end: int) -> str:
+        return self._source[start:end].decode("utf-8")
+
+    def close(self) -> None:
+        """Unmap the file."""
+        if self._source is not None:
+            self._source.close()
+            self._source = None
+
+    def __enter__(self) -> "MappedChunkStore":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
@@ -0,0 +1,59 @@
+"""
+Extraction of large PDFs with page ranges spread over a process pool.
+"""
+import math
+from pathlib import Path
+from typing import Iterator
+from concurrent.futures import ProcessPoolExecutor
+from src.agent.errors import FileProcessingError
+
+SHARDS_PER_WORKER = 4 # More shards than workers, so work after a cut-off can be cancelled
+
+
+def _pdf_reader(file_path: Path):
+    try:
+        from PyPDF2 import PdfReader
+    except ImportError:
+        raise FileProcessingError("PyPDF2 not installed.")
+    return PdfReader(str(file_path))
+
+
+def pdf_page_count(file_path: Path) -> int:
+    """Number of pages in a PDF, without extracting any text."""
+    return len(_pdf_reader(file_path).pages)
+
+
+def extract_page_range(file_path: Path, start: int, end: int) -> list[str]:
+    """
+    Extract the text of pages [start, end). Runs in a worker process, which
+    opens the PDF itself so only the path and the page texts are pickled.
+    """
+    reader = _pdf_reader(file_path)
+    return [reader.pages[i].extract_text() or "" for i in range(start, end)]
+
+
+def page_ranges(num_pages: int, workers: int) -> list[tuple[int, int]]:
+    """Split num_pages into consecutive ranges, SHARDS_PER_WORKER per worker."""
+    shard_size = max(1, math.ceil(num_pages / (workers * SHARDS_PER_WORKER)))
+    return [(start, min(start + shard_size, num_pages)) for start in range(0, num_pages, shard_size)]
+
+
+def iter_pdf_pages_parallel(file_path: Path, workers: int, num_pages: int) -> Iterator[str]:
+    """
+    Yield the text of each page of a PDF in page order, extracting page
+    ranges in up to `workers` processes.
+
+    Ranges are yielded as soon as they and all ranges before them are
+    done. When the consumer stops early (e.g. at the references), the
+    ranges that have not started yet are cancelled.
+    """
+    pool = ProcessPoolExecutor(max_workers=workers)
+    try:
+        futures = [
+            pool.submit(extract_page_range, file_path, start, end)
+            for start, end in page_ranges(num_pages, workers)
+        ]
+        for future in futures:
+            yield from future.result()
+    finally:
+        pool.shutdown(wait=True, cancel_futures=True)
@@ -0,0 +1,173 @@
+"""
+Registry of format readers, which turn a file into a stream of text pieces.
+"""
+import re
+import importlib.util
+from abc import ABC, abstractmethod
+from pathlib import Path
+from html.parser import HTMLParser
+from typing import Iterator, Optional
+from src.agent.errors import FileProcessingError
+from src.agent.tools.file_processor.streaming import iter_pdf_pages, iter_text_blocks
+
+LINES_PER_PIECE = 1024 # Lines of Markdown yielded at a time
+
+
+class FormatReader(ABC):
+    """
+    Reads the text of one family of file formats.
+
+    Readers yield the text piece by piece (pages, blocks or paragraphs),
+    so callers can stop reading early, e.g. at the references section.
+    Readers whose library is an optional dependency report whether it is
+    installed through `available`.
+    """
+    extensions: tuple[str, ...] = ()
+
+    @property
+    def available(self) -> bool:
+        """Whether the libraries this reader needs are installed."""
+        return True
+
+    @abstractmethod
+    def iter_pages(self, file_path: Path) -> Iterator[str]:
+        """Yield the text of the file piece by piece."""
+        pass
+
+
+class TextReader(FormatReader):
+    extensions = (".txt",)
+
+    def iter_pages(self, file_path: Path) -> Iterator[str]:
+        yield from iter_text_blocks(file_path)
+
+
+class PdfPageReader(FormatReader):
+    """Pages of a PDF, each ending with a line break."""
+    extensions = (".pdf",)
+
+    @property
+    def available(self) -> bool:
+        return importlib.util.find_spec("PyPDF2") is not None
+
+    def iter_pages(self, file_path: Path) -> Iterator[str]:
+        for page in iter_pdf_pages(file_path):
+            yield page + "\n"
+
+
+class MarkdownReader(FormatReader):
+    """Markdown with heading markers, emphasis, links and code fences removed."""
+    extensions = (".md", ".markdown")
+
+    _HEADING = re.compile(r"^[ \t]{0,3}#{1,6}[ \t]+(.*?)[ \t#]*$")
+    _QUOTE = re.compile(r"^[ \t]{0,3}>[ \t]?")
+    _LINK = re.compile(r"!?\[([^\]]*)\]\([^)]*\)")
+    _MARKUP = re.compile(r"\*\*|__|`")
+    _FENCE = re.compile(r"^[ \t]{0,3}(```|~~~)")
+
+    def iter_pages(self, file_path: Path) -> Iterator[str]:
+        with Path(file_path).open("r", encoding="utf-8") as f:
+            lines = []
+            for line in f:
+                if self._FENCE.match(line):
+                    continue
+                line = self._QUOTE.sub("", line)
+                line = self._HEADING.sub(r"\1", line.rstrip("\n")) + "\n"
+                lines.append(self._MARKUP.sub("", self._LINK.sub(r"\1", line)))
+                if len(lines) >= LINES_PER_PIECE:
+                    yield "".join(lines)
+                    lines = []
+            if lines:
+                yield "".join(lines)
+
+
+class _HtmlText(HTMLParser):
+    """Collects the visible text of an HTML document, one line per block element."""
+    BLOCKS = {
+        "p", "div", "br", "li", "tr", "h1", "h2", "h3", "h4", "h5", "h6",
+        "section", "article", "header", "footer", "blockquote", "pre", "table", "title",
+    }
+    HIDDEN = {"script", "style", "noscript", "template", "svg"}
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.parts: list[str] = []
+        self._hidden = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in self.HIDDEN:
+            self._hidden += 1
+        elif tag in self.BLOCKS:
+            self.parts.append("\n")
+
+    def handle_endtag(self, tag):
+        if tag in self.HIDDEN:
+            self._hidden = max(self._hidden - 1, 0)
+        elif tag in self.BLOCKS:
+            self.parts.append("\n")
+
+    def handle_data(self, data):
+        if not self._hidden:
+            self.parts.append(data)
+
+    def take(self) -> str:
+        text = "".join(self.parts)
+        self.parts = []
+        return text
+
+
+class HtmlReader(FormatReader):
+    """Visible text of an HTML page, parsed incrementally with the standard library."""
+    extensions = (".html", ".htm")
+
+    def iter_pages(self, file_path: Path) -> Iterator[str]:
+        parser = _HtmlText()
+        for block in iter_text_blocks(file_path):
+            parser.feed(block)
+            text = parser.take()
+            if text:
+                yield text
+        parser.close()
+        text = parser.take()
+        if text:
+            yield text
+
+
+class DocxReader(FormatReader):
+    """Paragraphs of a Word document. Needs the optional python-docx package."""
+    extensions = (".docx",)
+
+    @property
+    def available(self) -> bool:
+        return importlib.util.find_spec("docx") is not None
+
+    def iter_pages(self, file_path: Path) -> Iterator[str]:
+        try:
+            import docx
+        except ImportError:
+            raise FileProcessingError("python-docx not installed.")
+        for paragraph in docx.Document(str(file_path)).paragraphs:
+            yield paragraph.text + "\n"
+
+
+READERS: dict[str, FormatReader] = {}
+
+
+def register_reader(reader: FormatReader) -> None:
+    """Use reader for its extensions, replacing any reader registered before."""
+    for extension in reader.extensions:
+        READERS[extension.lower()] = reader
+
+
+def reader_for(file_path) -> Optional[FormatReader]:
+    """Reader of a file's format, or None if the format is not supported."""
+    return READERS.get(Path(file_path).suffix.lower())
+
+
+def supported_extensions() -> set[str]:
+    """Extensions of the formats whose reader is available."""
+    return {extension for extension, reader in READERS.items() if reader.available}
+
+
+for _reader in (TextReader(), PdfPageReader(), MarkdownReader(), HtmlReader(), DocxReader()):
+    register_reader(_reader)
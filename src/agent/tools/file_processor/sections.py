@@ -0,0 +1,170 @@
+"""
+Detection of section headings, such as "References" or "Appendix A", in a
+single pass over a document or over a stream of pages.
+"""
+import re
+from dataclasses import dataclass
+from typing import Optional, Union
+
+Text = Union[str, bytes, bytearray, memoryview]
+
+# Headings of sections that carry no content worth summarizing, by section name.
+# Patterns are matched case-insensitively against a whole line.
+SECTION_HEADINGS = {
+    "references": r"references?",
+    "bibliography": r"bibliography",
+    "appendix": r"appendix(?:[ \t]+[a-z])?",
+    "appendices": r"appendices",
+    "index": r"index",
+    "acknowledgments": r"acknowledge?ments?",
+    "works_cited": r"works?[ \t]+cited",
+}
+LOOKBACK = 64 # Characters kept between pieces so headings split across pages are still found
+_BLANKS = re.compile(r"[ \t]*")
+
+
+@dataclass(frozen=True)
+class SectionBoundary:
+    """A section heading found in a text: [start, end) are the offsets of the heading."""
+    name: str
+    start: int
+    end: int
+
+
+class SectionScanner:
+    """
+    Finds every section heading of a text in one pass.
+
+    All headings are compiled into a single regex that only tries the
+    alternatives right after a line break, so the regex engine skips
+    between line breaks with its fast literal scan. Matching is
+    case-insensitive through the pattern itself, so no lowercased copy of
+    the text is made. A heading must be alone on its line, apart from
+    surrounding blanks: "References" starts a section, but "see the
+    references" does not.
+
+    Works on str and on bytes-like objects, including memory maps, whose
+    offsets are then byte offsets. Byte patterns only match ASCII headings.
+
+    Args:
+        sections: Regex of the heading of each section, by section name.
+                  Names must be valid Python identifiers and patterns
+                  must not contain capturing groups.
+    """
+    def __init__(self, sections: dict[str, str]):
+        if not sections:
+            raise ValueError("At least one section heading is required")
+        self.sections = dict(sections)
+        headings = "|".join(f"(?P<{name}>{pattern})" for name, pattern in self.sections.items())
+        line = r"[ \t]*(?i:" + headings + r")(?=[ \t]*(?:\r?\n|\Z))"
+        self._patterns = {
+            str: (re.compile("\n" + line), re.compile(line)),
+            bytes: (re.compile(b"\n" + line.encode("ascii")), re.compile(line.encode("ascii"))),
+        }
+
+    @classmethod
+    def for_names(cls, names: list[str]) -> "SectionScanner":
+        """Scanner for some of the sections of SECTION_HEADINGS."""
+        unknown = set(names) - set(SECTION_HEADINGS)
+        if unknown:
+            raise ValueError(f"Unknown sections: {', '.join(sorted(unknown))}")
+        return cls({name: SECTION_HEADINGS[name] for name in names})
+
+    def _compiled(self, text: Text) -> tuple[re.Pattern, re.Pattern]:
+        return self._patterns[str if isinstance(text, str) else bytes]
+
+    @staticmethod
+    def _boundary(match: re.Match) -> SectionBoundary:
+        name = match.lastgroup
+        return SectionBoundary(name, match.start(name), match.end(name))
+
+    def scan(self, text: Text, pos: int = 0) -> list[SectionBoundary]:
+        """
+        Every section heading in text from pos on, in order. pos is taken
+        to be the start of a line.
+        """
+        after_break, at_start = self._compiled(text)
+        boundaries = []
+        match = at_start.match(text, pos)
+        if match:
+            boundaries.append(self._boundary(match))
+        boundaries.extend(self._boundary(match) for match in after_break.finditer(text, pos))
+        return boundaries
+
+    def first(self, text: Text, pos: int = 0) -> Optional[SectionBoundary]:
+        """The first section heading in text from pos on, or None."""
+        after_break, at_start = self._compiled(text)
+        match = at_start.match(text, pos) or after_break.search(text, pos)
+        return self._boundary(match) if match else None
+
+    def split(self, text: str) -> list[tuple[str, str]]:
+        """
+        (name, text) of each section, in order. Text before the first
+        heading is returned under the name "" if it is not empty.
+        """
+        boundaries = self.scan(text)
+        starts = [boundary.start for boundary in boundaries]
+        sections = [("", text[:starts[0] if starts else len(text)])]
+        for boundary, end in zip(boundaries, starts[1:] + [len(text)]):
+            sections.append((boundary.name, text[boundary.start:end]))
+        return sections if sections[0][1] else sections[1:]
+
+    def remove(self, text: str, names: set[str]) -> str:
+        """text without the sections in names, each running up to the next heading."""
+        return "".join(section for name, section in self.split(text) if name not in names)
+
+    def stream(self, lookback: int = LOOKBACK) -> "SectionStream":
+        """Scanner state for a text fed piece by piece."""
+        return SectionStream(self, lookback)
+
+
+class SectionStream:
+    """
+    Finds the section headings of a text fed piece by piece, such as the
+    pages of a PDF as they are extracted, reporting offsets in the whole
+    text.
+
+    Only the last lookback characters are kept between pieces, so each
+    character is scanned about once and a heading split across two
+    pieces is still found, for headings up to lookback characters long.
+    """
+    def __init__(self, scanner: SectionScanner, lookback: int = LOOKBACK):
+        self.scanner = scanner
+        self.lookback = lookback
+        self._held = "\n" # The text starts a line
+        self._base = -1 # Offset of _held[0] in the text
+        self.scanned = 0 # No heading starts before this offset, apart from those already reported
+
+    def feed(self, piece: str) -> list[SectionBoundary]:
+        """Add the next piece of text and return the headings now known to be complete."""
+        text = self._held + piece
+        keep = max(len(text) - self.lookback, 0) # Start of the text held back for the next piece
+        boundaries = []
+        after_break, _ = self.scanner._compiled(text)
+        for match in after_break.finditer(text):
+            if _BLANKS.fullmatch(text, match.end()):
+                # Nothing follows the heading yet, so the next piece may extend it
+                keep = min(keep, match.start())
+                break
+            boundaries.append(self._offset(match))
+            keep = max(keep, match.end())
+        self._held = text[keep:]
+        self._base += keep
+        self.scanned = max(self._base, 0)
+        return boundaries
+
+    def close(self) -> list[SectionBoundary]:
+        """Headings in the text held back from the last piece."""
+        after_break, _ = self.scanner._compiled(self._held)
+        boundaries = [self._offset(match) for match in after_break.finditer(self._held)]
+        self._base += len(self._held)
+        self._held = ""
+        self.scanned = max(self._base, 0)
+        return boundaries
+
+    def _offset(self, match: re.Match) -> SectionBoundary:
+        boundary = SectionScanner._boundary(match)
+        return SectionBoundary(boundary.name, self._base + boundary.start, self._base + boundary.end)
+
+
+UNWANTED_SECTIONS = SectionScanner(SECTION_HEADINGS)
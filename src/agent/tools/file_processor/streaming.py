@@ -0,0 +1,66 @@
+"""
+Generator-based extraction: pages are read and trimmed at the first
+unwanted section as a stream, so pages past it are never extracted.
+"""
+from pathlib import Path
+from typing import Iterable, Iterator
+from src.agent.errors import FileProcessingError
+from src.agent.tools.file_processor.sections import UNWANTED_SECTIONS, LOOKBACK, SectionScanner
+
+def iter_pdf_pages(file_path: Path) -> Iterator[str]:
+    """
+    Yield the text of each page of a PDF, extracting pages only as they are consumed.
+    """
+    try:
+        from PyPDF2 import PdfReader
+    except ImportError:
+        raise FileProcessingError("PyPDF2 not installed.")
+    with Path(file_path).open("rb") as f:
+        reader = PdfReader(f)
+        for page in reader.pages:
+            yield page.extract_text() or ""
+
+
+def iter_text_blocks(file_path: Path, block_size: int = 1 << 16) -> Iterator[str]:
+    """
+    Yield a UTF-8 text file in blocks of block_size characters.
+    """
+    with Path(file_path).open("r", encoding="utf-8") as f:
+        for block in iter(lambda: f.read(block_size), ""):
+            yield block
+
+
+def stop_at_section(pieces: Iterable[str],
+                    scanner: SectionScanner = UNWANTED_SECTIONS,
+                    lookback: int = LOOKBACK) -> Iterator[str]:
+    """
+    Pass text through until the first section heading found by scanner, then stop.
+
+    The input is not consumed past the piece containing the heading, so
+    the pages after e.g. "References" are never extracted. Text is only
+    held back while a heading could still start in it, so a heading split
+    across two pieces is cut at the same position as in the joined text
+    (for headings up to lookback characters long).
+    """
+    stream = scanner.stream(lookback)
+    pending = "" # Text fed to the stream from offset done onwards
+    done = 0
+    for piece in pieces:
+        if not piece:
+            continue
+        pending += piece
+        boundaries = stream.feed(piece)
+        if boundaries:
+            if boundaries[0].start > done:
+                yield pending[:boundaries[0].start - done]
+            return
+        if stream.scanned > done:
+            yield pending[:stream.scanned - done]
+            pending = pending[stream.scanned - done:]
+            done = stream.scanned
+    boundaries = stream.close()
+    if boundaries:
+        pending = pending[:boundaries[0].start - done]
+    if pending:
+        yield pending
+
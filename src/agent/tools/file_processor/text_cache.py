@@ -0,0 +1,152 @@
+"""
+Persistent cache of extracted document text.
+"""
+import zlib
+import time
+import sqlite3
+import hashlib
+import threading
+from pathlib import Path
+from typing import Optional
+from src.config import Config
+from src.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+EXTRACTOR_VERSION = 1 # Bump when extraction or cleaning changes, to invalidate cached text
+
+
+class TextCache:
+    """
+    SQLite-backed cache of cleaned text extracted from documents.
+
+    Entries are keyed by the SHA-256 of the file content, the extractor
+    (which reader and cleaning settings produced the text) and
+    EXTRACTOR_VERSION, so changing chunk sizes or the embedding model
+    reuses the text, while a changed file or extraction logic is a miss.
+    Text is stored zlib-compressed. When the stored text exceeds
+    max_bytes (compressed), the least recently used entries are evicted.
+
+    The database is opened in WAL mode, so several worker processes can
+    share it.
+
+    Args:
+        path: SQLite database file
+        max_bytes: Maximum total size of the compressed text (0 = unlimited)
+    """
+    def __init__(self, path: Path, max_bytes: int = 0):
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS texts ("
+            " key TEXT PRIMARY KEY,"
+            " text BLOB NOT NULL,"
+            " size INTEGER NOT NULL,"
+            " last_access REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_texts_last_access ON texts(last_access)")
+        self._conn.commit()
+
+    @classmethod
+    def from_config(cls, config: Config) -> Optional["TextCache"]:
+        """Build the cache described by config, or None if caching is disabled."""
+        if not config.text_cache_enabled:
+            return None
+        return cls(path=config.text_cache_path, max_bytes=config.text_cache_max_mb * 2**20)
+
+    @staticmethod
+    def make_key(content_hash: str, extractor: str) -> str:
+        """Fingerprint of a file's content and of how its text was extracted."""
+        fingerprint = f"{EXTRACTOR_VERSION}\0{extractor}\0{content_hash}"
+        return hashlib.sha256(fingerprint.encode("utf-8")).hexdigest()
+
+    def get(self, content_hash: str, extractor: str) -> Optional[str]:
+        """Return the cached text, or None on a miss."""
+        key = self.make_key(content_hash, extractor)
+        with self._lock:
+            row = self._conn.execute("SELECT text FROM texts WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self._conn.execute("UPDATE texts SET last_access = ? WHERE key = ?", (time.time(), key))
+            self._conn.commit()
+            self.hits += 1
+        return zlib.decompress(row[0]).decode("utf-8")
+
+    def put(self, content_hash: str, extractor: str, text: str) -> None:
+        """Store a text and evict old entries if over the size limit."""
+        key = self.make_key(content_hash, extractor)
+        compressed = zlib.compress(text.encode("utf-8"))
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO texts (key, text, size, last_access) VALUES (?, ?, ?, ?)",
+                (key, compressed, len(compressed), time.time()),
+            )
+            self._evict()
+            self._conn.commit()
+
+    def stats(self) -> dict:
+        """Hit/miss counters and current size."""
+        with self._lock:
+            entries, total_bytes = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM texts"
+            ).fetchone()
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "entries": entries,
+            "total_bytes": total_bytes,
+        }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM texts")
+            self._conn.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def _evict(self) -> None:
+        """Drop the least recently used entries past max_bytes. Caller must hold the lock."""
+        if self.max_bytes <= 0:
+            return
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM texts").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        evicted = 0
+        for key, size in self._conn.execute(
+            "SELECT key, size FROM texts ORDER BY last_access ASC"
+        ).fetchall():
+            if total <= self.max_bytes:
+                break
+            self._conn.execute("DELETE FROM texts WHERE key = ?", (key,))
+            total -= size
+            evicted += 1
+        logger.debug(f"Evicted {evicted} text cache entries")
+
+
+_shared: dict[Path, TextCache] = {}
+_shared_lock = threading.Lock()
+
+
+def shared_text_cache(path: Path, max_bytes: int = 0) -> TextCache:
+    """
+    The TextCache of path for this process, opened on first use. Lets
+    worker processes that only receive the path reuse one connection.
+    The max_bytes given last applies.
+    """
+    path = Path(path)
+    with _shared_lock:
+        cache = _shared.get(path)
+        if cache is None:
+            cache = _shared[path] = TextCache(path, max_bytes)
+        cache.max_bytes = max_bytes
+        return cache
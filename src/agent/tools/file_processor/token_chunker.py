@@ -0,0 +1,127 @@
+"""
+Sentence-aligned chunks sized in tokens of the embedding model.
+"""
+import re
+import numpy as np
+from typing import Any
+from src.agent.tools.chunk_store import ChunkStore
+
+SENTENCE_BREAK = re.compile(r"(?<=[.!?])\s+|\n\s*\n") # Sentence ends and blank lines
+SPECIAL_TOKENS = 2 # [CLS] and [SEP] added by the embedding model
+_NO_LIMIT = 10**9 # Tokenizers without a max length report a huge model_max_length
+
+
+def sentence_spans(text: str) -> list[tuple[int, int]]:
+    """(start, end) offsets of the sentences in text, without surrounding whitespace."""
+    spans = []
+    start = 0
+    for match in SENTENCE_BREAK.finditer(text):
+        spans.append((start, match.start()))
+        start = match.end()
+    spans.append((start, len(text)))
+
+    trimmed = []
+    for start, end in spans:
+        sentence = text[start:end]
+        stripped = sentence.strip()
+        if stripped:
+            offset = start + len(sentence) - len(sentence.lstrip())
+            trimmed.append((offset, offset + len(stripped)))
+    return trimmed
+
+
+def model_max_tokens(tokenizer: Any, default: int) -> int:
+    """
+    Maximum sequence length of a tokenizer's model, from its
+    model_max_length, or default when it declares none.
+    """
+    max_length = getattr(tokenizer, "model_max_length", None)
+    if not isinstance(max_length, int) or not SPECIAL_TOKENS < max_length < _NO_LIMIT:
+        return default
+    return max_length
+
+
+class TokenChunker:
+    """
+    Packs whole sentences into chunks of at most max_tokens model tokens.
+
+    Sentences are tokenized in batches with the embedding model's own
+    tokenizer, so chunks fill the model's input without being silently
+    truncated. A sentence longer than the limit is split at token
+    boundaries. Chunks are contiguous spans of the text and are returned
+    as a ChunkStore over it.
+
+    Args:
+        tokenizer: Hugging Face tokenizer of the embedding model
+        max_tokens: Maximum sequence length of the embedding model,
+                    including its special tokens
+        batch_size: Sentences tokenized per call
+    """
+    def __init__(self, tokenizer: Any, max_tokens: int = 256, batch_size: int = 1024):
+        if max_tokens <= SPECIAL_TOKENS:
+            raise ValueError(f"max_tokens must be greater than {SPECIAL_TOKENS}, got {max_tokens}")
+        self.tokenizer = tokenizer
+        self.max_tokens = max_tokens
+        self.batch_size = batch_size
+
+    @property
+    def budget(self) -> int:
+        """Content tokens per chunk."""
+        return self.max_tokens - SPECIAL_TOKENS
+
+    def count_tokens(self, texts: list[str]) -> np.ndarray:
+        """Number of tokens in each text, without special tokens."""
+        counts = np.zeros(len(texts), dtype=np.int64)
+        for start in range(0, len(texts), self.batch_size):
+            encoded = self.tokenizer(texts[start:start + self.batch_size], add_special_tokens=False)
+            counts[start:start + self.batch_size] = [len(ids) for ids in encoded["input_ids"]]
+        return counts
+
+    def chunk(self, text: str) -> ChunkStore:
+        """Split text into sentence-aligned chunks that fit the model."""
+        spans = sentence_spans(text)
+        if not spans:
+            return ChunkStore(text)
+        counts = self.count_tokens([text[start:end] for start, end in spans])
+
+        units = []
+        for (start, end), count in zip(spans, counts.tolist()):
+            if count > self.budget:
+                units.extend(self._split_sentence(text, start, end, count))
+            else:
+                units.append((start, end, count))
+
+        starts, ends = [], []
+        chunk_start, chunk_end, chunk_tokens = units[0]
+        for start, end, count in units[1:]:
+            if chunk_tokens + count > self.budget:
+                starts.append(chunk_start)
+                ends.append(chunk_end)
+                chunk_start, chunk_tokens = start, 0
+            chunk_end = end
+            chunk_tokens += count
+        starts.append(chunk_start)
+        ends.append(chunk_end)
+        return ChunkStore(text, np.array(starts), np.array(ends))
+
+    def _split_sentence(self, text: str, start: int, end: int, count: int) -> list[tuple[int, int, int]]:
+        """Split an over-long sentence into pieces of at most budget tokens."""
+        sentence = text[start:end]
+        try:
+            offsets = self.tokenizer(
+                sentence, add_special_tokens=False, return_offsets_mapping=True
+            )["offset_mapping"]
+        except (NotImplementedError, KeyError, TypeError):
+            offsets = None
+
+        pieces = []
+        if offsets:
+            for first in range(0, len(offsets), self.budget):
+                last = min(first + self.budget, len(offsets)) - 1
+                pieces.append((start + offsets[first][0], start + offsets[last][1], last - first + 1))
+        else:
+            # Slow tokenizers have no offsets: cut at proportional character positions
+            num_pieces = -(-count // self.budget)
+            bounds = np.linspace(start, end, num_pieces + 1).astype(int)
+            pieces = [(a, b, self.budget) for a, b in zip(bounds[:-1], bounds[1:])]
+        return pieces
@@ -0,0 +1,248 @@
+"""
+Cross-request micro-batching in front of the shared models.
+"""
+import time
+import threading
+import numpy as np
+from collections import deque
+from dataclasses import dataclass, field
+from concurrent.futures import Future
+from typing import Any, Callable, Sequence
+from src.config import Config
+from src.agent.tools.model_registry import ModelRegistry, get_model_registry
+from src.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+
+@dataclass
+class _Request:
+    items: list
+    future: Future = field(default_factory=Future)
+    arrived: float = field(default_factory=time.monotonic)
+
+
+class MicroBatcher:
+    """
+    Merges the small requests of concurrent callers into larger batches.
+
+    Requests are queued and a single thread collects them for up to
+    max_wait_ms after the oldest one arrived, or until max_batch_size
+    items are waiting, then runs run_batch once on all their items and
+    hands each caller the slice of results for its own items. A request
+    larger than max_batch_size runs as a batch of its own.
+
+    Batching trades at most max_wait_ms of latency for far fewer, larger
+    forward passes when many documents or queries are in flight. The
+    queue depth and a histogram of batch sizes are kept for stats().
+
+    Args:
+        run_batch: Function returning one result per item of a list
+        max_batch_size: Items per batch, beyond which requests wait for the next batch
+        max_wait_ms: Longest time the oldest request waits for others
+        name: Name used in logs and stats
+    """
+    def __init__(self, run_batch: Callable[[list], Sequence], max_batch_size: int = 64,
+                 max_wait_ms: float = 5.0, name: str = "batcher"):
+        if max_batch_size <= 0:
+            raise ValueError(f"max_batch_size must be positive, got {max_batch_size}")
+        self.run_batch = run_batch
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.name = name
+
+        self._queue: deque[_Request] = deque()
+        self._queued_items = 0
+        self._condition = threading.Condition()
+        self._closed = False
+        self._requests = 0
+        self._batches = 0
+        self._items = 0
+        self._max_queue_depth = 0
+        self._batch_sizes: dict[int, int] = {}
+        self._thread = threading.Thread(target=self._run, name=f"micro-batcher-{name}", daemon=True)
+        self._thread.start()
+
+    def submit(self, items: Sequence) -> Future:
+        """Queue items; the future resolves to their results, in order."""
+        request = _Request(list(items))
+        if not request.items:
+            request.future.set_result([])
+            return request.future
+        with self._condition:
+            if self._closed:
+                raise RuntimeError(f"Micro-batcher {self.name} is closed")
+            self._queue.append(request)
+            self._queued_items += len(request.items)
+            self._requests += 1
+            self._max_queue_depth = max(self._max_queue_depth, len(self._queue))
+            self._condition.notify()
+        return request.future
+
+    def __call__(self, items: Sequence) -> list:
+        """Results of items, once the batch they joined has run."""
+        return self.submit(items).result()
+
+    def stats(self) -> dict:
+        """
+        Request and batch counters, the current and largest queue depth (in
+        requests), and batch sizes counted in power-of-two buckets.
+        """
+        with self._condition:
+            return {
+                "requests": self._requests,
+                "batches": self._batches,
+                "items": self._items,
+                "mean_batch_size": self._items / self._batches if self._batches else 0.0,
+                "queue_depth": len(self._queue),
+                "max_queue_depth": self._max_queue_depth,
+                "batch_sizes": dict(sorted(self._batch_sizes.items())),
+            }
+
+    def close(self) -> None:
+        """Run the batches still queued and stop the thread."""
+        with self._condition:
+            self._closed = True
+            self._condition.notify()
+        self._thread.join()
+
+    def _next_batch(self) -> list[_Request]:
+        """Wait for the next batch of requests, or return [] once closed and drained."""
+        with self._condition:
+            while not self._queue:
+                if self._closed:
+                    return []
+                self._condition.wait()
+            deadline = self._queue[0].arrived + self.max_wait
+            while self._queued_items < self.max_batch_size and not self._closed:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._condition.wait(remaining)
+
+            batch = [self._queue.popleft()]
+            size = len(batch[0].items)
+            while self._queue and size + len(self._queue[0].items) <= self.max_batch_size:
+                request = self._queue.popleft()
+                batch.append(request)
+                size += len(request.items)
+            self._queued_items -= size
+            self._batches += 1
+            self._items += size
+            bucket = 1 << (size - 1).bit_length()
+            self._batch_sizes[bucket] = self._batch_sizes.get(bucket, 0) + 1
+            return batch
+
+    def _run(self) -> None:
+        while True:
+            batch = self._next_batch()
+            if not batch:
+                return
+            items = [item for request in batch for item in request.items]
+            try:
+                results = self.run_batch(items)
+                if len(results) != len(items):
+                    raise ValueError(f"{self.name} returned {len(results)} results for {len(items)} items")
+            except Exception as e:
+                logger.error(f"Micro-batch of {len(items)} items failed in {self.name}: {e}")
+                for request in batch:
+                    request.future.set_exception(e)
+                continue
+            start = 0
+            for request in batch:
+                request.future.set_result(results[start:start + len(request.items)])
+                start += len(request.items)
+
+
+class BatchedModel:
+    """
+    Stands in for a shared SentenceTransformer (encode) or CrossEncoder
+    (predict), sending every call through the model's MicroBatcher. The
+    model itself is taken from the registry for each batch, so registry
+    evictions still apply.
+
+    Calls with more than max_batch_size items are split into requests of
+    max_batch_size, so forward passes stay bounded and a large caller does
+    not hold up small ones. Batches merge the requests of many callers, so
+    keyword arguments that would change the results of some of them
+    (normalize_embeddings, convert_to_tensor=True, ...) raise TypeError;
+    load the model from the registry to use them.
+    """
+    IGNORED_KWARGS = {"batch_size", "show_progress_bar"} # Batching decides, and batches have no caller
+    DEFAULT_KWARGS = {"convert_to_numpy": True, "convert_to_tensor": False}
+
+    def __init__(self, kind: str, model_name: str, max_batch_size: int, max_wait_ms: float):
+        self.kind = kind
+        self.model_name = model_name
+        self.max_batch_size = max_batch_size
+        self.batcher = MicroBatcher(self._run_batch, max_batch_size, max_wait_ms, name=f"{kind}:{model_name}")
+
+    def encode(self, sentences, **kwargs) -> np.ndarray:
+        """SentenceTransformer.encode of a text or a list of texts, as float32 numpy."""
+        self._check_kwargs(kwargs)
+        if isinstance(sentences, str):
+            return self.encode([sentences])[0]
+        results = self._submit(list(sentences))
+        if len(results) == 0:
+            return np.empty((0, 0), dtype=np.float32)
+        return np.asarray(results, dtype=np.float32)
+
+    def predict(self, pairs, **kwargs) -> np.ndarray:
+        """CrossEncoder.predict of a list of (query, text) pairs."""
+        self._check_kwargs(kwargs)
+        return np.asarray(self._submit(list(pairs)))
+
+    def _check_kwargs(self, kwargs: dict) -> None:
+        for key, value in kwargs.items():
+            if key in self.IGNORED_KWARGS:
+                continue
+            if key in self.DEFAULT_KWARGS and value == self.DEFAULT_KWARGS[key]:
+                continue
+            raise TypeError(f"Micro-batched {self.batcher.name} does not support {key}={value!r}")
+
+    def _submit(self, items: list) -> np.ndarray:
+        """Results of items, submitted in requests of at most max_batch_size."""
+        futures = [
+            self.batcher.submit(items[start:start + self.max_batch_size])
+            for start in range(0, len(items), self.max_batch_size)
+        ]
+        if not futures:
+            return np.empty(0)
+        return np.concatenate([np.asarray(future.result()) for future in futures])
+
+    def _run_batch(self, items: list) -> np.ndarray:
+        model = get_model_registry().get(self.kind, self.model_name)
+        if self.kind == ModelRegistry.CROSS_ENCODER:
+            return np.asarray(model.predict(items, batch_size=len(items)))
+        return np.asarray(model.encode(items, batch_size=len(items), convert_to_numpy=True), dtype=np.float32)
+
+
+_batched: dict[tuple[str, str], BatchedModel] = {}
+_batched_lock = threading.Lock()
+
+
+def shared_model(kind: str, model_name: str) -> Any:
+    """
+    The registry's model of a kind, behind its process-wide MicroBatcher
+    unless Config.micro_batch_enabled is off.
+
+    Raises:
+        ModelLoadError: If the model cannot be loaded.
+    """
+    model = get_model_registry().get(kind, model_name) # Loads now, so load errors surface here
+    if not Config.micro_batch_enabled:
+        return model
+    key = (kind, model_name)
+    with _batched_lock:
+        batched = _batched.get(key)
+        if batched is None:
+            batched = _batched[key] = BatchedModel(
+                kind, model_name, Config.micro_batch_max_size, Config.micro_batch_max_wait_ms
+            )
+        return batched
+
+
+def micro_batch_stats() -> dict[str, dict]:
+    """stats() of every shared MicroBatcher, by name."""
+    with _batched_lock:
+        return {batched.batcher.name: batched.batcher.stats() for batched in _batched.values()}
@@ -0,0 +1,295 @@
+"""
+Process-wide registry of shared SentenceTransformer / CrossEncoder models and tokenizers.
+"""
+import json
+import time
+import threading
+from pathlib import Path
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Optional
+from src.config import Config
+from src.agent.errors import ToolError
+from src.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+
+class ModelLoadError(ToolError):
+    """Raised when a model cannot be loaded."""
+    pass
+
+
+def _load_sentence_transformer(model_name: str):
+    from sentence_transformers import SentenceTransformer
+    return SentenceTransformer(model_name)
+
+
+def _load_cross_encoder(model_name: str):
+    from sentence_transformers import CrossEncoder
+    return CrossEncoder(model_name)
+
+
+def _load_tokenizer(model_name: str):
+    """
+    Tokenizer of a model. For SentenceTransformer models, model_max_length
+    is capped at the model's max_seq_length, the length it actually embeds.
+    """
+    from transformers import AutoTokenizer
+    repo = model_name
+    try:
+        tokenizer = AutoTokenizer.from_pretrained(repo)
+    except OSError:
+        if "/" in model_name:
+            raise
+        # SentenceTransformer resolves bare names to the sentence-transformers organization
+        repo = f"sentence-transformers/{model_name}"
+        tokenizer = AutoTokenizer.from_pretrained(repo)
+    max_seq_length = _sentence_transformer_max_length(repo)
+    if max_seq_length:
+        tokenizer.model_max_length = min(tokenizer.model_max_length, max_seq_length)
+    return tokenizer
+
+
+def _sentence_transformer_max_length(repo: str) -> Optional[int]:
+    """max_seq_length from the sentence_bert_config.json of a model, if it has one."""
+    try:
+        path = Path(repo) / "sentence_bert_config.json"
+        if not path.is_file():
+            from huggingface_hub import hf_hub_download
+            path = Path(hf_hub_download(repo, "sentence_bert_config.json"))
+        return int(json.loads(path.read_text(encoding="utf-8"))["max_seq_length"])
+    except Exception:
+        return None
+
+
+def estimate_model_memory(model: Any) -> int:
+    """
+    Estimate the memory held by a model's parameters and buffers.
+    Returns:
+        Size in bytes, or 0 if the model does not expose torch tensors.
+    """
+    torch_module = getattr(model, "model", model) # CrossEncoder wraps the torch module
+    try:
+        tensors = list(torch_module.parameters()) + list(torch_module.buffers())
+    except (AttributeError, TypeError):
+        return 0
+    return sum(t.numel() * t.element_size() for t in tensors)
+
+
+@dataclass
+class ModelEntry:
+    """A loaded model and its bookkeeping."""
+    kind: str
+    name: str
+    model: Any
+    memory_bytes: int
+    loaded_at: float
+    last_used: float
+    uses: int = 0
+
+
+class ModelRegistry:
+    """
+    Thread-safe cache of loaded models shared by every tool in the process.
+
+    Models are loaded lazily on first request and handed out as shared
+    instances. When the number of models or their total memory exceeds
+    the configured limits, the least recently used model is evicted.
+    Models unused for longer than idle_seconds are evicted as well.
+
+    Args:
+        max_models: Maximum number of models kept loaded (0 = unlimited)
+        max_memory_bytes: Maximum total model memory (0 = unlimited)
+        idle_seconds: Evict models unused for this long (0 = never)
+    """
+    SENTENCE_TRANSFORMER = "sentence_transformer"
+    CROSS_ENCODER = "cross_encoder"
+    TOKENIZER = "tokenizer"
+
+    def __init__(self,
+                 max_models: int = 4,
+                 max_memory_bytes: int = 0,
+                 idle_seconds: float = 0.0,
+                 ):
+        self.max_models = max_models
+        self.max_memory_bytes = max_memory_bytes
+        self.idle_seconds = idle_seconds
+        self._loaders: dict[str, Callable[[str], Any]] = {
+            self.SENTENCE_TRANSFORMER: _load_sentence_transformer,
+            self.CROSS_ENCODER: _load_cross_encoder,
+            self.TOKENIZER: _load_tokenizer,
+        }
+        self._entries: "OrderedDict[tuple[str, str], ModelEntry]" = OrderedDict()
+        self._load_locks: dict[tuple[str, str], threading.Lock] = {}
+        self._lock = threading.Lock()
+
+    def register_loader(self, kind: str, loader: Callable[[str], Any]) -> None:
+        """Register the function used to load models of a given kind."""
+        with self._lock:
+            self._loaders[kind] = loader
+
+    def get(self, kind: str, model_name: str) -> Any:
+        """
+        Return the shared instance of a model, loading it if needed.
+        Raises:
+            ModelLoadError: If the kind is unknown or loading fails.
+        """
+        key = (kind, model_name)
+        self.evict_idle()
+        with self._lock:
+            entry = self._touch(key)
+            if entry is not None:
+                return entry.model
+            loader = self._loaders.get(kind)
+            if loader is None:
+                raise ModelLoadError(f"No loader registered for model kind '{kind}'")
+            load_lock = self._load_locks.setdefault(key, threading.Lock())
+
+        # Load outside the registry lock so other models stay available,
+        # but only once per model even under concurrent requests.
+        with load_lock:
+            with self._lock:
+                entry = self._touch(key)
+                if entry is not None:
+                    return entry.model
+            logger.info(f"Loading {kind} model: {model_name}")
+            start = time.perf_counter()
+            try:
+                model = loader(model_name)
+            except Exception as e:
+                raise ModelLoadError(f"Failed to load model {model_name}: {str(e)}") from e
+            memory_bytes = estimate_model_memory(model)
+            logger.info(
+                f"Loaded {model_name} in {time.perf_counter() - start:.2f}s "
+                f"({memory_bytes / 2**20:.1f} MB)"
+            )
+            now = time.monotonic()
+            with self._lock:
+                self._entries[key] = ModelEntry(
+                    kind=kind,
+                    name=model_name,
+                    model=model,
+                    memory_bytes=memory_bytes,
+                    loaded_at=now,
+                    last_used=now,
+                    uses=1,
+                )
+                self._enforce_limits(keep=key)
+        return model
+
+    def sentence_transformer(self, model_name: str) -> Any:
+        """Shared SentenceTransformer instance."""
+        return self.get(self.SENTENCE_TRANSFORMER, model_name)
+
+    def cross_encoder(self, model_name: str) -> Any:
+        """Shared CrossEncoder instance."""
+        return self.get(self.CROSS_ENCODER, model_name)
+
+    def tokenizer(self, model_name: str) -> Any:
+        """Shared tokenizer of a model, loaded without the model weights."""
+        return self.get(self.TOKENIZER, model_name)
+
+    def evict(self, kind: str, model_name: str) -> bool:
+        """Drop a model from the registry. Returns True if it was loaded."""
+        with self._lock:
+            entry = self._entries.pop((kind, model_name), None)
+        if entry is not None:
+            logger.info(f"Evicted {kind} model: {model_name}")
+        return entry is not None
+
+    def evict_idle(self, now: Optional[float] = None) -> list[tuple[str, str]]:
+        """Evict models that have not been used for idle_seconds."""
+        if self.idle_seconds <= 0:
+            return []
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            idle = [
+                key for key, entry in self._entries.items()
+                if now - entry.last_used > self.idle_seconds
+            ]
+            for key in idle:
+                del self._entries[key]
+        for kind, model_name in idle:
+            logger.info(f"Evicted idle {kind} model: {model_name}")
+        return idle
+
+    def clear(self) -> None:
+        """Drop every loaded model."""
+        with self._lock:
+            self._entries.clear()
+
+    @property
+    def total_memory_bytes(self) -> int:
+        with self._lock:
+            return sum(entry.memory_bytes for entry in self._entries.values())
+
+    def stats(self) -> list[dict]:
+        """Per-model statistics, least recently used first."""
+        with self._lock:
+            return [
+                {
+                    "kind": entry.kind,
+                    "name": entry.name,
+                    "memory_bytes": entry.memory_bytes,
+                    "uses": entry.uses,
+                    "idle_seconds": time.monotonic() - entry.last_used,
+                }
+                for entry in self._entries.values()
+            ]
+
+    def __contains__(self, key: tuple[str, str]) -> bool:
+        with self._lock:
+            return key in self._entries
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def _touch(self, key: tuple[str, str]) -> Optional[ModelEntry]:
+        """Mark a model as used. Caller must hold the lock."""
+        entry = self._entries.get(key)
+        if entry is not None:
+            entry.last_used = time.monotonic()
+            entry.uses += 1
+            self._entries.move_to_end(key)
+        return entry
+
+    def _enforce_limits(self, keep: tuple[str, str]) -> None:
+        """Evict least recently used models until limits hold. Caller must hold the lock."""
+        def over_limits() -> bool:
+            if self.max_models > 0 and len(self._entries) > self.max_models:
+                return True
+            if self.max_memory_bytes > 0:
+                total = sum(entry.memory_bytes for entry in self._entries.values())
+                return total > self.max_memory_bytes
+            return False
+
+        for key in list(self._entries):
+            if not over_limits():
+                break
+            if key == keep:
+                continue
+            del self._entries[key]
+            logger.info(f"Evicted {key[0]} model: {key[1]} (LRU)")
+
+
+_registry: Optional[ModelRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_model_registry() -> ModelRegistry:
+    """
+    Get the process-wide model registry.
+    Limits are taken from Config on first use.
+    """
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                _registry = ModelRegistry(
+                    max_models=Config.max_loaded_models,
+                    max_memory_bytes=Config.model_memory_limit_mb * 2**20,
+                    idle_seconds=Config.model_idle_seconds,
+                )
+    return _registry
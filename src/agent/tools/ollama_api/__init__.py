@@ -0,0 +1,4 @@
+from src.agent.tools.ollama_api.base import LLMInput, LLMOutput
+from src.agent.tools.ollama_api.ollama import OllamaClient
+
+__all__ = ['OllamaClient', 'LLMInput', 'LLMOutput']
@@ -0,0 +1,29 @@
+from typing import Optional
+from pydantic import Field
+from src.agent.tools.base import ToolInput, ToolOutput
+
+
+class LLMInput(ToolInput):
+    """
+    Input for the Ollama LLM tool.
+    """
+    prompt: str = Field(..., description="Prompt sent to the model")
+    model_name: Optional[str] = Field(
+        default=None,
+        description="Ollama model to use. Defaults to Config.model_name"
+    )
+    system: Optional[str] = Field(default=None, description="Optional system prompt")
+    options: dict = Field(
+        default_factory=dict,
+        description="Generation options passed to Ollama (temperature, num_ctx, ...)"
+    )
+
+class LLMOutput(ToolOutput):
+
+    response: str = Field(default="", description="Generated text")
+    model_name: str = Field(default="", description="Model that produced the response")
+    prompt_tokens: int = Field(default=0, description="Tokens in the evaluated prompt")
+    completion_tokens: int = Field(default=0, description="Tokens generated")
+    duration_seconds: float = Field(default=0.0, description="Wall-clock time including retries")
+    attempts: int = Field(default=0, description="Number of HTTP attempts made")
+    cached: bool = Field(default=False, description="Whether the response came from the cache")
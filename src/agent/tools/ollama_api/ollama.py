@@ -0,0 +1,219 @@
+"""
+Asynchronous Ollama client with a pooled keep-alive connection.
+"""
+import time
+import asyncio
+import threading
+from typing import Optional
+import httpx
+from src.config import Config
+from src.agent.tools.base import Tool
+from src.agent.errors import LLMError, OllamaConnectionError, OllamaTimeoutError
+from src.agent.tools.ollama_api.base import LLMInput, LLMOutput
+from src.agent.tools.ollama_api.response_cache import ResponseCache
+from src.logging_config import get_logger
+
+
+class _RetryableLLMError(LLMError):
+    """Server-side failure worth retrying (HTTP 5xx)."""
+    pass
+
+
+class OllamaClient(Tool):
+    """
+    Generates text with the Ollama /api/generate endpoint.
+
+    All requests run on one background event loop that owns a single
+    httpx.AsyncClient, so keep-alive connections are pooled and the
+    concurrency limit is shared by every caller in the process, whether
+    they use the async API (agenerate) or the blocking one (execute).
+    Failed requests are retried with exponential backoff.
+    Responses are served from and stored in the persistent ResponseCache
+    when caching is enabled in the config.
+    """
+    def __init__(self, config: Config, logger=None, max_concurrency: Optional[int] = None,
+                 cache: Optional[ResponseCache] = None):
+        self.config = config
+        self.logger = logger or get_logger(__name__)
+        self.base_url = config.ollama_base_url.rstrip("/")
+        self.timeout = config.ollama_timeout
+        self.max_retries = config.max_retries
+        self.retry_delay = config.retry_delay
+        self.max_concurrency = max_concurrency or config.ollama_max_concurrency
+        self.cache = cache if cache is not None else ResponseCache.from_config(config)
+
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._client: Optional[httpx.AsyncClient] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    @property
+    def name(self) -> str:
+        """Tool name"""
+        return "OllamaClient"
+
+    def execute(self, input_data: LLMInput) -> LLMOutput:
+        """
+        Generate a response, blocking until it is complete.
+        """
+        future = asyncio.run_coroutine_threadsafe(self._generate(input_data), self._ensure_loop())
+        return future.result()
+
+    async def agenerate(self, input_data: LLMInput) -> LLMOutput:
+        """
+        Generate a response from any event loop.
+        """
+        future = asyncio.run_coroutine_threadsafe(self._generate(input_data), self._ensure_loop())
+        return await asyncio.wrap_future(future)
+
+    async def agenerate_many(self, inputs: list[LLMInput]) -> list[LLMOutput]:
+        """
+        Generate responses for several prompts concurrently, in input order.
+        At most max_concurrency requests are in flight at once.
+        """
+        return list(await asyncio.gather(*(self.agenerate(inp) for inp in inputs)))
+
+    def close(self) -> None:
+        """Close pooled connections and stop the background event loop."""
+        with self._lock:
+            loop, thread = self._loop, self._thread
+            self._loop = self._thread = None
+        if loop is None:
+            return
+        asyncio.run_coroutine_threadsafe(self._client.aclose(), loop).result()
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join()
+        loop.close()
+
+    def __enter__(self) -> "OllamaClient":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                thread = threading.Thread(target=loop.run_forever, name="ollama-client", daemon=True)
+                thread.start()
+                asyncio.run_coroutine_threadsafe(self._open(), loop).result()
+                self._loop, self._thread = loop, thread
+            return self._loop
+
+    async def _open(self) -> None:
+        """Create the pooled HTTP client on the background loop."""
+        self._client = httpx.AsyncClient(
+            base_url=self.base_url,
+            timeout=httpx.Timeout(self.timeout),
+            limits=httpx.Limits(
+                max_connections=self.max_concurrency,
+                max_keepalive_connections=self.max_concurrency,
+            ),
+        )
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+
+    async def _generate(self, input_data: LLMInput) -> LLMOutput:
+        model_name = input_data.model_name or self.config.model_name
+        start = time.perf_counter()
+        try:
+            if not input_data.prompt.strip():
+                raise LLMError("Cannot generate from an empty prompt")
+
+            payload = {
+                "model": model_name,
+                "prompt": input_data.prompt,
+                "stream": False,
+                "options": input_data.options,
+            }
+            if input_data.system:
+                payload["system"] = input_data.system
+
+            if self.cache is not None:
+                cached = self.cache.get(model_name, input_data.prompt, input_data.options, input_data.system)
+                if cached is not None:
+                    self.logger.info(f"Using cached response from {model_name}")
+                    return LLMOutput(
+                        success=True,
+                        response=cached,
+                        model_name=model_name,
+                        duration_seconds=time.perf_counter() - start,
+                        cached=True,
+                    )
+
+            self.logger.debug(f"Generating with {model_name} ({len(input_data.prompt)} prompt chars)")
+            data, attempts = await self._post_with_retries(payload)
+            duration = time.perf_counter() - start
+            response = data.get("response", "").strip()
+            if self.cache is not None:
+                self.cache.put(model_name, input_data.prompt, response, input_data.options, input_data.system)
+            self.logger.info(f"Generated response with {model_name} in {duration:.2f}s")
+            return LLMOutput(
+                success=True,
+                response=response,
+                model_name=data.get("model", model_name),
+                prompt_tokens=data.get("prompt_eval_count", 0),
+                completion_tokens=data.get("eval_count", 0),
+                duration_seconds=duration,
+                attempts=attempts,
+            )
+
+        except LLMError as e:
+            self.logger.error(f"LLMError: {str(e)}")
+            return LLMOutput(
+                success=False,
+                error_message=str(e),
+                model_name=model_name,
+                duration_seconds=time.perf_counter() - start
+            )
+        except Exception as e:
+            self.logger.error(f"Unexpected error in OllamaClient: {str(e)}", exc_info=True)
+            return LLMOutput(
+                success=False,
+                error_message=f"Unexpected error: {str(e)}",
+                model_name=model_name,
+                duration_seconds=time.perf_counter() - start
+            )
+
+    async def _post_with_retries(self, payload: dict) -> tuple[dict, int]:
+        """
+        POST to /api/generate, retrying timeouts, connection errors and 5xx responses.
+        Returns:
+            The decoded response and the number of attempts made.
+        """
+        last_error: LLMError = LLMError("No attempt made")
+        for attempt in range(self.max_retries + 1):
+            try:
+                async with self._semaphore:
+                    response = await self._client.post("/api/generate", json=payload)
+                if response.status_code >= 500:
+                    raise _RetryableLLMError(
+                        f"Ollama returned HTTP {response.status_code}: {response.text}"
+                    )
+                if response.status_code >= 400:
+                    raise LLMError(f"Ollama returned HTTP {response.status_code}: {response.text}")
+                data = response.json()
+                if "error" in data:
+                    raise LLMError(f"Ollama error: {data['error']}")
+                return data, attempt + 1
+
+            except httpx.TimeoutException as e:
+                last_error = OllamaTimeoutError(
+                    f"Ollama did not respond within {self.timeout}s: {str(e)}"
+                )
+            except httpx.TransportError as e:
+                last_error = OllamaConnectionError(
+                    f"Could not connect to Ollama at {self.base_url}: {str(e)}"
+                )
+            except _RetryableLLMError as e:
+                last_error = e
+
+            if attempt < self.max_retries:
+                delay = self.retry_delay * (2 ** attempt)
+                self.logger.warning(
+                    f"Attempt {attempt + 1} failed: {last_error}. Retrying in {delay:.1f}s"
+                )
+                await asyncio.sleep(delay)
+
+        raise type(last_error)(f"{last_error} (after {self.max_retries + 1} attempts)")
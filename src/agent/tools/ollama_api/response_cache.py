@@ -0,0 +1,163 @@
+"""
+Persistent cache of LLM responses.
+"""
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+from pathlib import Path
+from typing import Optional
+from src.config import Config
+from src.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+
+class ResponseCache:
+    """
+    SQLite-backed cache of LLM responses.
+
+    Entries are keyed by model name, a hash of the prompt, the system
+    prompt and the generation options, so any change that alters the
+    prompt (e.g. a different retrieved context) is a miss. Entries older
+    than ttl_seconds are ignored and removed. When the stored responses
+    exceed max_bytes, the least recently used ones are evicted.
+
+    Args:
+        path: SQLite database file
+        max_bytes: Maximum total size of cached responses (0 = unlimited)
+        ttl_seconds: Lifetime of an entry (0 = never expires)
+    """
+    def __init__(self, path: Path, max_bytes: int = 0, ttl_seconds: float = 0):
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            " key TEXT PRIMARY KEY,"
+            " model TEXT NOT NULL,"
+            " response TEXT NOT NULL,"
+            " size INTEGER NOT NULL,"
+            " created_at REAL NOT NULL,"
+            " last_access REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_last_access ON responses(last_access)")
+        self._conn.commit()
+
+    @classmethod
+    def from_config(cls, config: Config) -> Optional["ResponseCache"]:
+        """Build the cache described by config, or None if caching is disabled."""
+        if not config.llm_cache_enabled:
+            return None
+        return cls(
+            path=config.llm_cache_path,
+            max_bytes=config.llm_cache_max_mb * 2**20,
+            ttl_seconds=config.llm_cache_ttl_seconds,
+        )
+
+    @staticmethod
+    def make_key(model: str, prompt: str, options: Optional[dict] = None,
+                 system: Optional[str] = None) -> str:
+        """Fingerprint of everything that determines the response."""
+        fingerprint = json.dumps(
+            {
+                "model": model,
+                "prompt": hashlib.sha256(prompt.encode("utf-8")).hexdigest(),
+                "system": system,
+                "options": options or {},
+            },
+            sort_keys=True,
+        )
+        return hashlib.sha256(fingerprint.encode("utf-8")).hexdigest()
+
+    def get(self, model: str, prompt: str, options: Optional[dict] = None,
+            system: Optional[str] = None) -> Optional[str]:
+        """Return the cached response, or None on a miss."""
+        key = self.make_key(model, prompt, options, system)
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT response, created_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is not None and self._expired(row[1], now):
+                self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self._conn.commit()
+                row = None
+            if row is None:
+                self.misses += 1
+                return None
+            self._conn.execute("UPDATE responses SET last_access = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+            self.hits += 1
+        logger.debug(f"LLM cache hit for {model}")
+        return row[0]
+
+    def put(self, model: str, prompt: str, response: str, options: Optional[dict] = None,
+            system: Optional[str] = None) -> None:
+        """Store a response and evict old entries if over the size limit."""
+        key = self.make_key(model, prompt, options, system)
+        now = time.time()
+        size = len(response.encode("utf-8"))
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, model, response, size, created_at, last_access)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                (key, model, response, size, now, now),
+            )
+            self._evict(now)
+            self._conn.commit()
+
+    def stats(self) -> dict:
+        """Hit/miss counters and current size."""
+        with self._lock:
+            entries, total_bytes = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses"
+            ).fetchone()
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "entries": entries,
+            "total_bytes": total_bytes,
+        }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM responses")
+            self._conn.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def _expired(self, created_at: float, now: float) -> bool:
+        return self.ttl_seconds > 0 and now - created_at > self.ttl_seconds
+
+    def _evict(self, now: float) -> None:
+        """Drop expired entries, then LRU entries past max_bytes. Caller must hold the lock."""
+        if self.ttl_seconds > 0:
+            self._conn.execute(
+                "DELETE FROM responses WHERE created_at < ?", (now - self.ttl_seconds,)
+            )
+        if self.max_bytes <= 0:
+            return
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        evicted = 0
+        for key, size in self._conn.execute(
+            "SELECT key, size FROM responses ORDER BY last_access ASC"
+        ).fetchall():
+            if total <= self.max_bytes:
+                break
+            self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+            total -= size
+            evicted += 1
+        logger.debug(f"Evicted {evicted} LLM cache entries")
@@ -2,6 +2,10 @@ import numpy as np
 from pydantic import BaseModel, Field
 from dataclasses import dataclass
 from src.agent.tools.base import ToolInput, ToolOutput
+from src.agent.tools.chunk_store import ChunkStore
+from typing import Optional
+from src.agent.tools.embedding_matrix import EmbeddingMatrix
+from src.agent.tools.semantic_index import SemanticIndex
 
 @dataclass
 class HybridScores:
@@ -62,8 +66,13 @@ class RetrieverResult(BaseModel):
 class RetrieverInput(ToolInput):
     """Input for hybrid retriever tool."""
     query: str = Field(..., description="User query to search")
-    chunks: list[str] = Field(..., description="Document chunks to search through")
-    embeddings: list[list[float]] = Field(..., description="Embeddings for the chunks")
+    chunks: ChunkStore = Field(..., description="Document chunks to search through")
+    embeddings: EmbeddingMatrix = Field(..., description="Float32 matrix of embeddings, one row per chunk")
+    index: Optional[SemanticIndex] = Field(
+        default=None,
+        exclude=True,
+        description="SemanticIndex of the embeddings, as output by the Embedder; built from them when not given"
+    )
 
     top_k: int = Field(default=5, ge=1, le=100, description="Number of final results to return")
     use_bm25: bool = Field(default=True, description="Enable BM25 lexical search")
@@ -85,10 +94,8 @@ class RetrieverInput(ToolInput):
 
     def validate_dimensions(self) -> bool:
         """Verify embeddings dimension consistency."""
-        if not self.embeddings:
-            return False
-        first_dim = len(self.embeddings[0])
-        return all(len(e) == first_dim for e in self.embeddings)
+        # Rows of a matrix always have the same length
+        return self.embeddings.shape[0] > 0 and self.embeddings.shape[1] > 0
     
     def validate_consistency(self) -> bool:
         """Verify chunks and embeddings counts match."""
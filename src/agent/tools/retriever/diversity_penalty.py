@@ -2,7 +2,9 @@
 Diversity penalty component for reducing redundancy in search results.
 """
 import numpy as np
-from typing import List
+from typing import List, Union
+from src.agent.tools.quantization import QuantizedEmbeddings
+from src.agent.tools.semantic_index import SemanticIndex, as_semantic_index
 
 
 class DiversityPenalty:
@@ -22,18 +24,22 @@ class DiversityPenalty:
         self.diversity_threshold = diversity_threshold
         self.penalty_strength = penalty_strength
 
-    def apply_penalty(self, scores: np.ndarray, embeddings: np.ndarray, top_k: int = 5) -> List[int]:
+    def apply_penalty(self, scores: np.ndarray,
+                      embeddings: Union[np.ndarray, QuantizedEmbeddings, SemanticIndex],
+                      top_k: int = 5) -> List[int]:
         """
         Select top-k diverse results by penalizing similar chunks
         
         Args:
             scores: Similarity scores for each chunk (1D array)
-            embeddings: Chunk embedding (2D array: [num_chunks, embedding_dim])
+            embeddings: Chunk embedding (2D array: [num_chunks, embedding_dim]), possibly quantized,
+                or the SemanticIndex of the chunks, whose unit-norm rows are reused
             top_k: How many results to return
             
         Return:
             Indices of top-k diverse chunks
         """
+        index = as_semantic_index(embeddings)
         selected_indices = []
         remaining_indices = list(range(len(scores)))
         adjusted_scores = scores.copy() # Not mutate original
@@ -41,32 +47,14 @@ class DiversityPenalty:
         for _ in range(min(top_k, len(scores))):
             best_idx = remaining_indices[np.argmax(adjusted_scores[remaining_indices])]
             selected_indices.append(best_idx)
-            remaining_indices.removes(best_idx)
+            remaining_indices.remove(best_idx)
 
             if not remaining_indices:
                 break
             # Penalize remaining chunks similar to the one that was selected
-            selected_embedding = embeddings[best_idx]
-            for idx in remaining_indices:
-                similarity = self._cosine_similarity(
-                    selected_embedding,
-                    embeddings[idx]
-                )
-                # Apply similarity
-                if similarity > self.diversity_threshold:
-                    adjusted_scores[idx] *= (1 - self.penalty_strength)
+            remaining = np.asarray(remaining_indices)
+            similarities = index.scores(index.row(best_idx))[remaining]
+            similar = remaining[similarities > self.diversity_threshold]
+            adjusted_scores[similar] *= (1 - self.penalty_strength)
 
         return selected_indices
-    
-    @staticmethod
-    def _cosine_similarity(vec1: np.ndarray, vec2: np.ndarray) -> float:
-        """
-        Calculate cosine similarity between two vectors.
-        Returns: Float in range [-1, 1], but embeddings typically [0, 1]
-        """
-        dot_product = np.dot(vec1, vec2)
-        norm_product = np.linalg.norm(vec1) * np.linalg.norm(vec2)
-
-        if norm_product == 0:
-            return 0.0
-        return float(dot_product / norm_product)
\ No newline at end of file
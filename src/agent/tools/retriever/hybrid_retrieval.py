@@ -2,10 +2,11 @@
 Combined lexical (BM25) and semantic search as Hybrid retrieval.
 """
 import numpy as np
-from typing import List, Optional
+from typing import List, Optional, Union
 from src.agent.tools.retriever.base import HybridScores
 from src.agent.tools.retriever.bm25 import BM25Scorer
 from src.agent.tools.retriever.semantic_search import SemanticSearcher
+from src.agent.tools.semantic_index import SemanticIndex, as_semantic_index
 from src.agent.tools.retriever.rrf_fusion import RRFFusion
 from src.agent.tools.retriever.query_expander import QueryExpander
 from src.agent.tools.retriever.reranker import Reranker
@@ -45,12 +46,14 @@ class HybridRetriever:
             self,
             query: str,
             chunks: List[str],
-            embeddings: np.ndarray,
+            embeddings: Union[np.ndarray, SemanticIndex],
             bm25_weight: float = 0.5,
             semantic_weight: float = 0.5,
             rerank_top_n: int = 20 ) -> HybridScores:
         
         logger.info(f"Starting hybrid retrieval for query: '{query}'")
+        # Built only when not given, once for query expansion and semantic scoring
+        embeddings = as_semantic_index(embeddings)
         expanded_query = self._expand_query(query, chunks, embeddings)
         bm25_scores = self._compute_bm25_scores(expanded_query, chunks)
         semantic_scores = self._compute_semantic_scores(expanded_query, embeddings)
@@ -74,7 +77,7 @@ class HybridRetriever:
             final_scores=final_scores,
         )
     
-    def _expand_query(self, query: str, chunks: List[str], embeddings: np.ndarray) -> str:
+    def _expand_query(self, query: str, chunks: List[str], embeddings: SemanticIndex) -> str:
         """Returns original if fails"""
         try:
             expanded = self.query_expander.expand(query, chunks, embeddings)
@@ -89,7 +92,7 @@ class HybridRetriever:
         #logger.debug(f"BM25 scores - min: {np.min(scores):.3f}, max: {np.max(scores):.3f}")
         return scores
     
-    def _compute_semantic_scores(self, query: str, embeddings: np.ndarray) -> np.ndarray:
+    def _compute_semantic_scores(self, query: str, embeddings: SemanticIndex) -> np.ndarray:
         scores = self.semantic_searcher.score(query, embeddings)
         #logger.debug(f"Semantic scores - min: {np.min(scores):.3f}, max: {np.max(scores):.3f}")
         return scores
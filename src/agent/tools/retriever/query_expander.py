@@ -1,7 +1,12 @@
 import numpy as np
+from typing import Union
 from sentence_transformers import SentenceTransformer
 from src.logging_config import get_logger
+from src.agent.tools.model_registry import ModelRegistry
+from src.agent.tools.micro_batcher import shared_model
 from src.agent.errors import ToolError
+from src.agent.tools.quantization import QuantizedEmbeddings
+from src.agent.tools.semantic_index import SemanticIndex, as_semantic_index
 
 class QueryExpansionError(ToolError):
     """Raise when query expansion fails."""
@@ -21,23 +26,19 @@ class QueryExpander:
     def __init__(self, model_name: str = "all-MiniLM-L6-v2"):
         self.logger = get_logger(__name__)
         self.model_name = model_name
-        self._model = None
 
     def _load_model(self) -> SentenceTransformer:
-        if self._model is None:
-            try:
-                self.logger.debug(f"Loading embedding model: {self.model_name}")
-                self._model = SentenceTransformer(self.model_name)
-            except Exception as e:
-                raise QueryExpansionError(
-                    f"Failed to load model {self.model_name}: {str(e)}"
-                ) from e
-        return self._model
+        try:
+            return shared_model(ModelRegistry.SENTENCE_TRANSFORMER, self.model_name)
+        except Exception as e:
+            raise QueryExpansionError(
+                f"Failed to load model {self.model_name}: {str(e)}"
+            ) from e
     
     def expand(self,
                query: str,
                chunks: list[str],
-               embeddings: list[list[float]],
+               embeddings: Union[np.ndarray, QuantizedEmbeddings, SemanticIndex],
                max_expansions: int = 3,
                ) -> str:
         """
@@ -46,7 +47,7 @@ class QueryExpander:
         Args:
             query: Original user query
             chunks: List of document chunks
-            embeddings: Pre-computed embeddings for chunks
+            embeddings: Pre-computed embeddings for chunks, possibly quantized or already a SemanticIndex
             max_expansions: Maximum number of terms to add
 
         Returns:
@@ -63,23 +64,14 @@ class QueryExpander:
             model = self._load_model()
 
             query_embedding = model.encode([query], convert_to_tensor=False)[0]
-            query_vec = np.array(query_embedding, dtype=np.float32)
-
-            similarities = []
-            for i, chunk_embedding in enumerate(embeddings):
-                chunk_vec = np.array(chunk_embedding, dtype=np.float32)
-                # Cosine similarity
-                similarity = np.dot(query_vec, chunk_vec) / (
-                    np.linalg.norm(query_vec) * np.linalg.norm(chunk_vec) + 1e-8
-                )
-                similarities.append((i, similarity))
+            indices, similarities = as_semantic_index(embeddings).top_k(query_embedding, max_expansions)
 
             SIMILARITY_THRESHOLD = 0.7
 
             top_indices = [
-                (idx, sim) for idx, sim in sorted(similarities, key=lambda x: x[1], reverse=True)
-                if sim > SIMILARITY_THRESHOLD
-            ][:max_expansions]
+                (int(idx), float(similarity)) for idx, similarity in zip(indices, similarities)
+                if similarity > SIMILARITY_THRESHOLD
+            ]
 
             if not top_indices:
                 self.logger.debug("No chunks. similar enough for expansion")
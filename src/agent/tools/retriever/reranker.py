@@ -1,6 +1,8 @@
 import numpy as np
 from sentence_transformers import CrossEncoder
 from src.logging_config import get_logger
+from src.agent.tools.model_registry import ModelRegistry
+from src.agent.tools.micro_batcher import shared_model
 from src.agent.errors import ToolError
 
 class CrossEncoderError(ToolError):
@@ -16,18 +18,14 @@ class Reranker:
     def __init__(self, model_name: str = "cross-encoder/ms-marco-MiniLM-L-6-v2"):
         self.logger = get_logger(__name__)
         self.model_name = model_name
-        self._model = None
     
     def _load_model(self) -> CrossEncoder:
-        if self._model is None:
-            try:
-                self.logger.debug(f"Loading cross-encoder: {self.model_name}")
-                self._model = CrossEncoder(self.model_name)
-            except Exception as e:
-                raise CrossEncoderError(
-                    f"Failed to load cross-encoder {self.model_name}: {str(e)}"
-                ) from e
-        return self._model
+        try:
+            return shared_model(ModelRegistry.CROSS_ENCODER, self.model_name)
+        except Exception as e:
+            raise CrossEncoderError(
+                f"Failed to load cross-encoder {self.model_name}: {str(e)}"
+            ) from e
     
     def rerank(self, query: str, chunks: list[str]) -> list[float]:
         """
@@ -12,6 +12,7 @@ from src.agent.tools.retriever.base import (
     )
 from src.agent.tools.retriever.hybrid_retrieval import HybridRetriever
 from src.agent.tools.retriever.diversity_penalty import DiversityPenalty
+from src.agent.tools.semantic_index import SemanticIndex
 from src.agent.errors import RetrievalError
 from src.logging_config import get_logger
 
@@ -27,6 +28,11 @@ class Retriever(Tool):
         self.hybrid_retrieval = hybrid_retrieval or HybridRetriever()
         self.diversity_penalty = diversity_penalty or DiversityPenalty()
         logger.info("Retriever initialized")
+
+    @property
+    def name(self) -> str:
+        """Tool name"""
+        return "Retriever"
     
     def execute(self, input_data: RetrieverInput) -> RetrieverOutput:
         """
@@ -37,35 +43,39 @@ class Retriever(Tool):
         try:
             self._validate_input(input_data)
             logger.info(f"Retrieving for query: '{input_data.query}'")
-            embeddings_array = np.array(input_data.embeddings)
+            # Normalized once, for semantic scoring, query expansion and diversity
+            index = input_data.index if input_data.index is not None else SemanticIndex(input_data.embeddings)
             hybrid_scores = self.hybrid_retrieval.retrieve(
-                query=input_data,
+                query=input_data.query,
                 chunks=input_data.chunks,
-                embeddings=embeddings_array,
+                embeddings=index,
                 bm25_weight=input_data.bm25_weight,
                 semantic_weight=input_data.semantic_weight,
                 rerank_top_n=input_data.top_k * 2 # Rerank more candidates
             )
             diverse_indices = self.diversity_penalty.apply_penalty(
                 scores=hybrid_scores.final_scores,
-                embeddings=embeddings_array,
+                embeddings=index,
                 top_k=input_data.top_k,
             )
             results = self._build_results(
                 indices=diverse_indices,
-                Chunks=input_data.chunks,
-                scores=hybrid_scores
+                chunks=input_data.chunks,
+                hybrid_scores=hybrid_scores
             )
             logger.info(f"Retrieved {len(results)} diverse results.")
             return RetrieverOutput(
+                success=True,
                 results=results,
-                query=input_data.query,
-                total_chunks=len(input_data.chunks)
+                results_count=len(results)
             )
-        
+
+        except RetrievalError as e:
+            logger.error(f"RetrievalError: {e}")
+            return RetrieverOutput(success=False, error_message=str(e))
         except Exception as e:
-            logger.error(f"Retrieval failed: {e}")
-            raise RetrievalError(f"Retrieval pipeline failed: {e}") from e
+            logger.error(f"Retrieval failed: {e}", exc_info=True)
+            return RetrieverOutput(success=False, error_message=f"Unexpected error: {e}")
         
     def _validate_input(self, input_data: RetrieverInput) -> None:
         if len(input_data.chunks) == 0:
@@ -76,6 +86,11 @@ class Retriever(Tool):
                 f"Chunks count ({len(input_data.chunks)}) must match "
                 f"embeddings count ({len(input_data.embeddings)})"
             )
+        if input_data.index is not None and len(input_data.index) != len(input_data.chunks):
+            raise RetrievalError(
+                f"Chunks count ({len(input_data.chunks)}) must match "
+                f"index count ({len(input_data.index)})"
+            )
         if input_data.top_k <= 0:
             raise RetrievalError(f"top_k must be positive, got {input_data.top_k}")
         logger.debug("Input validation passed")
@@ -88,18 +103,17 @@ class Retriever(Tool):
         """Build the RetrieverResult object."""
 
         results = []
-        for rank, idx in enumerate(indices):
-            metadata = ChunkMetadata(
+        for idx in indices:
+            idx = int(idx)
+            chunk = chunks[idx]
+            result = RetrieverResult(
+                chunk=chunk,
                 chunk_index=idx,
                 bm25_score=float(hybrid_scores.bm25_scores[idx]),
                 semantic_score=float(hybrid_scores.semantic_scores[idx]),
-                final_score=float(hybrid_scores.final_scores[idx])
-            )
-            result = RetrieverResult(
-                chunks=chunks[idx],
-                score=float(hybrid_scores.final_scores[idx]),
-                rank=rank + 1,
-                metadata=metadata
+                rrf_score=float(hybrid_scores.fused_scores[idx]),
+                final_score=float(hybrid_scores.final_scores[idx]),
+                metadata=ChunkMetadata(chunk_index=idx, chunk_length=len(chunk))
             )
             results.append(result)
         logger.debug(f"Built {len(results)} result objects")
@@ -1,7 +1,12 @@
 import numpy as np
+from typing import Union
 from sentence_transformers import SentenceTransformer
 from src.logging_config import get_logger
+from src.agent.tools.model_registry import ModelRegistry
+from src.agent.tools.micro_batcher import shared_model
 from src.agent.errors import ToolError
+from src.agent.tools.quantization import QuantizedEmbeddings
+from src.agent.tools.semantic_index import SemanticIndex, as_semantic_index
 
 class SemanticSearchError(ToolError):
     """Raised when semantic search fails."""
@@ -15,51 +20,51 @@ class SemanticSearcher:
     def __init__(self, model_name: str ="all-MiniLM-L6-v2"):
         self.logger = get_logger(__name__)
         self.model_name = model_name
-        self._model = None
 
     def _load_model(self) -> SentenceTransformer:
-        if self._model is None:
-            try:
-                self.logger.debug(f"Loading embedding model: {self.model_name}")
-                self._model = SentenceTransformer(self.model_name)
-            except Exception as e:
-                raise SemanticSearchError(
-                    f"Failed to load model {self.model_name}: {str(e)}"
-                ) from e
-        return self._model
+        try:
+            return shared_model(ModelRegistry.SENTENCE_TRANSFORMER, self.model_name)
+        except Exception as e:
+            raise SemanticSearchError(
+                f"Failed to load model {self.model_name}: {str(e)}"
+            ) from e
     
-    def score(self, query: str, embeddings: list[list[float]]) -> np.ndarray:
+    def score(self, query: str, embeddings: Union[np.ndarray, QuantizedEmbeddings, SemanticIndex]) -> np.ndarray:
         """
         Uses cosine similarity between query and chunk embeddings
-        to calculate semantic scores.
+        to calculate semantic scores. Embeddings are normalized into a
+        SemanticIndex unless one is given, so pass the same index when
+        scoring several queries against one corpus.
         Returns:
             List of similarity scores normalzied to [0, 1]
         """
+        return self.score_batch([query], embeddings)[0] if len(embeddings) else np.array([])
+
+    def score_batch(self, queries: list[str],
+                    embeddings: Union[np.ndarray, QuantizedEmbeddings, SemanticIndex]) -> np.ndarray:
+        """
+        Semantic scores of several queries at once: one encode call and one
+        matrix-matrix product.
+        Returns:
+            Matrix of scores in [0, 1], one row per query
+        """
         try:
-            if len(embeddings) == 0:
-                return np.array([])
+            if len(embeddings) == 0 or len(queries) == 0:
+                return np.zeros((len(queries), len(embeddings)))
             model = self._load_model()
-            query_embedding = model.encode([query], convert_to_tensor=False)[0]
-            scores =[]
-            for chunk_embedding in embeddings:
-                query_vec = np.array(query_embedding, dtype=np.float32)
-                chunk_vec = np.array(chunk_embedding, dtype=np.float32)
-
-                cosine_similarity = np.dot(query_vec, chunk_vec) / (
-                    np.linalg.norm(query_vec) * np.linalg.norm(chunk_vec) + 1e-8
-                )
-                # Normalize from [-1, 1] t0 [0, 1]
-                normalized_score = (cosine_similarity + 1) / 2
-                scores.append(float(normalized_score))
+            query_embeddings = model.encode(list(queries), convert_to_tensor=False)
+            cosine_similarities = as_semantic_index(embeddings).scores(np.asarray(query_embeddings))
+            # Normalize from [-1, 1] t0 [0, 1]
+            scores = (cosine_similarities + 1) / 2
 
             self.logger.debug(
-                f"Semantic scoring complete. Mean: {np.mean(scores):.4f}, "
+                f"Semantic scoring of {len(queries)} queries complete. Mean: {np.mean(scores):.4f}, "
                 f"Max: {np.max(scores):.4f}" 
             )
-            return np.array(scores)
+            return scores
         
         except SemanticSearchError:
             raise
         except Exception as e:
             self.logger.error(f"Semantic scoring failed: {str(e)}")
-            return np.array([0.0] * len(embeddings))
\ No newline at end of file
+            return np.zeros((len(queries), len(embeddings)))
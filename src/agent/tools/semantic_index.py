@@ -0,0 +1,95 @@
+"""
+Cosine scoring of chunk embeddings against their norms computed once, with top-k selection.
+"""
+import numpy as np
+from typing import Union
+from src.agent.tools.quantization import QuantizedEmbeddings, as_quantized
+
+
+def top_k_indices(scores: np.ndarray, k: int) -> np.ndarray:
+    """
+    Indices of the k highest scores along the last axis, best first.
+    argpartition finds them in linear time, so only k scores are sorted.
+    """
+    scores = np.asarray(scores)
+    count = scores.shape[-1]
+    k = max(0, min(k, count))
+    if k == 0:
+        return np.empty(scores.shape[:-1] + (0,), dtype=np.intp)
+    if k < count:
+        indices = np.argpartition(-scores, k - 1, axis=-1)[..., :k]
+    else:
+        indices = np.broadcast_to(np.arange(count), scores.shape).copy()
+    order = np.argsort(-np.take_along_axis(scores, indices, axis=-1), axis=-1, kind="stable")
+    return np.take_along_axis(indices, order, axis=-1)
+
+
+class SemanticIndex:
+    """
+    Chunk embeddings with the inverse of their row norms, computed once
+    when the index is built, so the cosine similarities of a query with
+    every chunk are a single matrix-vector product scaled row by row, and
+    those of a batch of queries a single matrix-matrix product. Only the
+    query is normalized when scoring.
+
+    The index shares the caller's rows instead of holding a normalized
+    copy, at any precision: it only adds one float32 per chunk, and
+    QuantizedEmbeddings, whose norms are already known, are indexed
+    without another pass over the matrix.
+
+    Build it once per document, where the embeddings are made (the
+    Embedder output, ProcessedDocument), and pass it on: tool inputs take
+    it as it is, and scoring functions given one reuse it.
+
+    Args:
+        embeddings: Chunk matrix, nested lists, or QuantizedEmbeddings
+    """
+    def __init__(self, embeddings: Union[np.ndarray, QuantizedEmbeddings, list]):
+        self.matrix = as_quantized(embeddings)
+        norms = self.matrix.norms
+        # Zero rows score 0
+        self.inverse_norms = np.divide(1, norms, out=np.zeros_like(norms), where=norms > 0)
+
+    @property
+    def shape(self) -> tuple[int, int]:
+        return self.matrix.shape
+
+    def __len__(self) -> int:
+        return len(self.matrix)
+
+    @classmethod
+    def __get_pydantic_core_schema__(cls, source_type, handler):
+        from pydantic_core import core_schema
+        return core_schema.is_instance_schema(cls)
+
+    def row(self, index: int) -> np.ndarray:
+        """Unit-norm float32 embedding of chunk index."""
+        return self.matrix.row(index) * self.inverse_norms[index]
+
+    def scores(self, queries: np.ndarray) -> np.ndarray:
+        """
+        Cosine similarity of every chunk with a query vector, shape
+        (chunks,), or with each row of a (queries, dim) matrix, shape
+        (queries, chunks). Zero chunks and zero queries score 0.
+        """
+        queries = np.asarray(queries, dtype=np.float32)
+        if queries.ndim == 1:
+            return self.matrix.dot(queries / (np.linalg.norm(queries) + 1e-8)) * self.inverse_norms
+        unit = queries / (np.linalg.norm(queries, axis=1, keepdims=True) + 1e-8)
+        return (self.matrix.dot(unit.T) * self.inverse_norms[:, None]).T
+
+    def top_k(self, queries: np.ndarray, k: int) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Indices and cosine similarities of the k chunks most similar to a
+        query (or to each query of a matrix), best first.
+        """
+        scores = self.scores(queries)
+        indices = top_k_indices(scores, k)
+        return indices, np.take_along_axis(scores, indices, axis=-1)
+
+
+def as_semantic_index(embeddings: Union[np.ndarray, QuantizedEmbeddings, SemanticIndex, list]) -> SemanticIndex:
+    """A SemanticIndex of embeddings, built unless one is given."""
+    if isinstance(embeddings, SemanticIndex):
+        return embeddings
+    return SemanticIndex(embeddings)
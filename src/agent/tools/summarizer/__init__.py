@@ -0,0 +1,4 @@
+from src.agent.tools.summarizer.base import SummarizerInput, SummarizerOutput
+from src.agent.tools.summarizer.map_reduce import MapReduceSummarizer
+
+__all__ = ['MapReduceSummarizer', 'SummarizerInput', 'SummarizerOutput']
@@ -0,0 +1,30 @@
+from pydantic import Field
+from src.agent.tools.base import ToolInput, ToolOutput
+
+
+class SummarizerInput(ToolInput):
+    """
+    Input for the map-reduce Summarizer tool.
+    """
+    chunks: list[str] = Field(..., description="Document chunks to summarize, in document order")
+    query: str = Field(
+        default="Summarize the key points of this document or the main argument.",
+        description="What the summary should focus on"
+    )
+    token_budget: int = Field(
+        default=2000,
+        ge=1,
+        description="Maximum estimated tokens of content sent in a single LLM call"
+    )
+    max_parallel: int = Field(
+        default=2,
+        ge=1,
+        description="Maximum concurrent LLM calls"
+    )
+
+class SummarizerOutput(ToolOutput):
+
+    summary: str = Field(default="", description="Final summary of the document")
+    map_calls: int = Field(default=0, description="Number of chunk groups summarized")
+    reduce_levels: int = Field(default=0, description="Depth of the reduce tree")
+    llm_calls: int = Field(default=0, description="Total LLM calls made")
@@ -0,0 +1,141 @@
+"""
+Hierarchical map-reduce summarization of long documents.
+"""
+import asyncio
+from src.agent.tools.base import Tool
+from src.agent.errors import LLMError
+from src.agent.tools.ollama_api import LLMInput
+from src.agent.tools.summarizer.base import SummarizerInput, SummarizerOutput
+from src.logging_config import get_logger
+
+CHARS_PER_TOKEN = 4 # Rough estimate for English text
+
+MAP_PROMPT = (
+    "Question: {query}\n\n"
+    "Context (part of a longer document):\n{text}\n\n"
+    "Summarize this part concisely, keeping the information relevant to the question:"
+)
+REDUCE_PROMPT = (
+    "Question: {query}\n\n"
+    "Partial summaries of consecutive parts of a document:\n{text}\n\n"
+    "Combine them into one concise summary that answers the question:"
+)
+
+
+def estimate_tokens(text: str) -> int:
+    """Approximate the number of LLM tokens in text."""
+    return max(1, len(text) // CHARS_PER_TOKEN)
+
+
+def pack_groups(texts: list[str], token_budget: int) -> list[list[str]]:
+    """
+    Greedily pack consecutive texts into groups under token_budget.
+    A text larger than the budget gets a group of its own.
+    """
+    groups = []
+    current, current_tokens = [], 0
+    for text in texts:
+        tokens = estimate_tokens(text)
+        if current and current_tokens + tokens > token_budget:
+            groups.append(current)
+            current, current_tokens = [], 0
+        current.append(text)
+        current_tokens += tokens
+    if current:
+        groups.append(current)
+    return groups
+
+
+class MapReduceSummarizer(Tool):
+    """
+    Summarizes documents of any length with bounded per-call prompts.
+
+    Map: chunks are packed into groups that fit the token budget and each
+    group is summarized, with up to max_parallel calls in flight.
+    Reduce: partial summaries are packed and summarized again, level by
+    level, until a single summary remains.
+    """
+    def __init__(self, llm, logger=None):
+        """
+        Args:
+            llm: Client exposing `async agenerate(LLMInput) -> LLMOutput`
+                 (e.g. OllamaClient)
+        """
+        self.llm = llm
+        self.logger = logger or get_logger(__name__)
+
+    @property
+    def name(self) -> str:
+        """Tool name"""
+        return "MapReduceSummarizer"
+
+    def execute(self, input_data: SummarizerInput) -> SummarizerOutput:
+        """
+        Summarize the chunks, blocking until the final summary is ready.
+        """
+        return asyncio.run(self.asummarize(input_data))
+
+    async def asummarize(self, input_data: SummarizerInput) -> SummarizerOutput:
+        """
+        Summarize the chunks with map-reduce.
+        """
+        try:
+            chunks = [chunk for chunk in input_data.chunks if chunk.strip()]
+            if not chunks:
+                raise LLMError("Cannot summarize empty list of chunks")
+
+            semaphore = asyncio.Semaphore(input_data.max_parallel)
+
+            groups = pack_groups(chunks, input_data.token_budget)
+            self.logger.info(f"Map: summarizing {len(chunks)} chunks in {len(groups)} groups")
+            summaries = await self._summarize_groups(
+                groups, MAP_PROMPT, input_data.query, semaphore
+            )
+            map_calls = len(groups)
+            llm_calls = map_calls
+
+            levels = 0
+            while len(summaries) > 1:
+                groups = pack_groups(summaries, input_data.token_budget)
+                if len(groups) == len(summaries):
+                    # Summaries too long to pack: merge pairwise so the tree still shrinks
+                    groups = [summaries[i:i + 2] for i in range(0, len(summaries), 2)]
+                levels += 1
+                self.logger.info(
+                    f"Reduce level {levels}: {len(summaries)} summaries in {len(groups)} groups"
+                )
+                summaries = await self._summarize_groups(
+                    groups, REDUCE_PROMPT, input_data.query, semaphore
+                )
+                llm_calls += len(groups)
+
+            return SummarizerOutput(
+                success=True,
+                summary=summaries[0],
+                map_calls=map_calls,
+                reduce_levels=levels,
+                llm_calls=llm_calls,
+            )
+
+        except LLMError as e:
+            self.logger.error(f"LLMError: {str(e)}")
+            return SummarizerOutput(success=False, error_message=str(e))
+        except Exception as e:
+            self.logger.error(f"Unexpected error in MapReduceSummarizer: {str(e)}", exc_info=True)
+            return SummarizerOutput(success=False, error_message=f"Unexpected error: {str(e)}")
+
+    async def _summarize_groups(self,
+                                groups: list[list[str]],
+                                template: str,
+                                query: str,
+                                semaphore: asyncio.Semaphore) -> list[str]:
+        """Summarize each group concurrently, preserving group order."""
+        async def summarize(group: list[str]) -> str:
+            prompt = template.format(query=query, text="\n\n".join(group))
+            async with semaphore:
+                output = await self.llm.agenerate(LLMInput(prompt=prompt))
+            if not output.success:
+                raise LLMError(f"Summarization call failed: {output.error_message}")
+            return output.response
+
+        return list(await asyncio.gather(*(summarize(group) for group in groups)))
@@ -0,0 +1,242 @@
+import queue
+import threading
+import numpy as np
+from pathlib import Path
+from typing import Iterable, Optional
+from dataclasses import dataclass
+from concurrent.futures import ProcessPoolExecutor
+from read_file import FileProcessor, ProcessedDocument, EMBEDDING_MODEL
+from src.agent.manifest import FileVersion, file_version
+from src.agent.tools.embedder.embedding_cache import EmbeddingCache, encode_cached
+from src.agent.tools.file_processor.text_cache import shared_text_cache
+
+
+_DONE = object() # Sentinel closing a stage queue
+
+
+@dataclass
+class ExtractedDocument:
+    """
+    Chunks of a single file, produced by an extraction worker, with the
+    version of the file they were read from.
+
+    """
+    index: int
+    file_path: Path
+    version: Optional[FileVersion] = None
+    chunks: Optional[list] = None
+    error: Optional[str] = None
+
+
+def extract_document(index: int, file_path: Path, chunking: str = "paragraphs",
+                     dedup: bool = False, text_cache_path: Optional[Path] = None,
+                     text_cache_max_bytes: int = 0,
+                     embedding_model: str = EMBEDDING_MODEL) -> ExtractedDocument:
+    """
+    Read, clean and chunk a file. Runs in a worker process, so it never touches
+    the embedder (token chunking only loads the tokenizer of embedding_model).
+    The text cache is passed by path and size limit, and opened once per
+    worker process.
+    """
+    try:
+        text_cache = shared_text_cache(text_cache_path, text_cache_max_bytes) if text_cache_path else None
+        processor = FileProcessor(file_path, chunking=chunking, dedup=dedup, text_cache=text_cache,
+                                  embedding_model=embedding_model)
+        if not file_path.exists():
+            raise FileNotFoundError(f"File not found: {file_path}")
+        version = file_version(file_path)
+        chunks = processor.deduplicate(processor.chunk_text(processor.read_file(version.content_hash)))
+        return ExtractedDocument(index, file_path, version, chunks)
+    except Exception as e:
+        return ExtractedDocument(index, file_path, error=str(e))
+
+
+class BatchPipeline:
+    """
+    Pipelined multi-document RAG summarization.
+
+    Stages run concurrently and are connected by bounded queues:
+      1. Extraction: files are read and chunked in a process pool
+      2. Embedding: chunks of several documents are embedded in one batched call
+      3. Generation: a bounded number of LLM requests run in parallel
+
+    At most queue_size documents are buffered between stages, so memory
+    stays flat regardless of the number of files. Results are returned
+    in the order of the input files.
+
+    If given, on_complete(file_path, result, error, version) is called
+    as soon as each file finishes, with result None when the file failed,
+    and the FileVersion read by extraction, None when it could not be read. Set
+    collect_results=False when on_complete persists the results, so they
+    are not also kept in memory.
+
+    """
+    def __init__(self, retriever, output_folder: Path, query: str,
+                 extract_workers: int = 4, llm_workers: int = 2,
+                 queue_size: int = 8, embed_batch_docs: int = 4, batch_size: int = 32,
+                 on_complete=None, collect_results: bool = True):
+        self.retriever = retriever
+        self.output_folder = output_folder
+        self.query = query
+        self.extract_workers = extract_workers
+        self.llm_workers = llm_workers
+        self.queue_size = queue_size
+        self.embed_batch_docs = embed_batch_docs
+        self.batch_size = batch_size
+        self.on_complete = on_complete
+        self.collect_results = collect_results
+
+
+    def run(self, files: Iterable) -> list:
+        """
+        Process all files and return (filename, summary) tuples in input order.
+        Files that failed at any stage are left out. Returns an empty list
+        when collect_results is False.
+        """
+        self._slots = threading.BoundedSemaphore(self.queue_size)
+        self._extracted = queue.Queue()
+        self._embedded = queue.Queue(maxsize=self.queue_size)
+        self._results = {}
+        self._results_lock = threading.Lock()
+
+        stages = [
+            threading.Thread(target=self._extract_stage, args=(files,), name="extract"),
+            threading.Thread(target=self._embed_stage, name="embed"),
+        ] + [
+            threading.Thread(target=self._generate_stage, name=f"generate-{i}")
+            for i in range(self.llm_workers)
+        ]
+        for stage in stages:
+            stage.start()
+        for stage in stages:
+            stage.join()
+
+        return [self._results[i] for i in sorted(self._results)]
+
+
+    def _extract_stage(self, files: Iterable) -> None:
+        """
+        Submit files to the process pool, keeping at most queue_size documents in flight.
+        """
+        def on_done(future):
+            try:
+                self._extracted.put(future.result())
+            except Exception as e:
+                index, file_path = future.document
+                self._extracted.put(ExtractedDocument(index, file_path, error=str(e)))
+
+        text_cache = self.retriever.text_cache
+        text_cache_path = text_cache.path if text_cache is not None else None
+        text_cache_max_bytes = text_cache.max_bytes if text_cache is not None else 0
+        try:
+            with ProcessPoolExecutor(max_workers=self.extract_workers) as pool:
+                for index, file_path in enumerate(files):
+                    self._slots.acquire()
+                    future = pool.submit(
+                        extract_document, index, file_path, self.retriever.chunking,
+                        self.retriever.dedup, text_cache_path, text_cache_max_bytes,
+                        self.retriever.embedding_model
+                    )
+                    future.document = (index, file_path)
+                    future.add_done_callback(on_done)
+        finally:
+            self._extracted.put(_DONE)
+
+
+    def _embed_stage(self) -> None:
+        """
+        Embed the chunks of up to embed_batch_docs documents in a single batched call.
+        """
+        done = False
+        try:
+            while not done:
+                batch = [self._extracted.get()]
+                while len(batch) < self.embed_batch_docs:
+                    try:
+                        batch.append(self._extracted.get_nowait())
+                    except queue.Empty:
+                        break
+                if _DONE in batch:
+                    done = True
+                    batch.remove(_DONE)
+
+                ready = []
+                for extracted in batch:
+                    self._slots.release()
+                    if extracted.error is not None:
+                        print(f"Error reading {extracted.file_path.name}: {extracted.error}")
+                        self._complete(extracted.file_path, None, extracted.error)
+                    elif not extracted.chunks:
+                        print(f"Error reading {extracted.file_path.name}: no text extracted")
+                        self._complete(extracted.file_path, None, "No text extracted", extracted.version)
+                    else:
+                        print(f"File {extracted.file_path.name} read successfully with {len(extracted.chunks)} chunks.")
+                        ready.append(extracted)
+                if ready:
+                    self._embed_documents(ready)
+        finally:
+            # Generation workers stop even if this stage failed
+            for _ in range(self.llm_workers):
+                self._embedded.put(_DONE)
+
+
+    def _embed_documents(self, documents: list) -> None:
+        all_chunks = [chunk for document in documents for chunk in document.chunks]
+        try:
+            embeddings = encode_cached(lambda: self.retriever.embedder, all_chunks,
+                                       self.retriever.embedding_cache,
+                                       EmbeddingCache.model_key(self.retriever.embedding_model),
+                                       batch_size=self.batch_size)
+        except Exception as e:
+            for document in documents:
+                print(f"Error embedding {document.file_path.name}: {e}")
+                self._complete(document.file_path, None, str(e), document.version)
+            return
+
+        offsets = np.cumsum([0] + [len(document.chunks) for document in documents])
+        for document, start, end in zip(documents, offsets[:-1], offsets[1:]):
+            try:
+                processed = ProcessedDocument(
+                    filename=self.retriever.document_name(document.file_path),
+                    content_hash=document.version.content_hash,
+                    chunks=document.chunks,
+                    embeddings=embeddings[start:end],
+                    num_characters=sum(len(chunk) for chunk in document.chunks),
+                )
+            except Exception as e:
+                print(f"Error embedding {document.file_path.name}: {e}")
+                self._complete(document.file_path, None, str(e), document.version)
+                continue
+            self._embedded.put((document.index, document.file_path, processed, document.version))
+
+
+    def _generate_stage(self) -> None:
+        """
+        Summarize embedded documents with the LLM.
+        """
+        while True:
+            item = self._embedded.get()
+            if item is _DONE:
+                break
+            index, file_path, document, version = item
+            try:
+                result = self.retriever.summarize_document(document, self.output_folder, self.query)
+                error = None if result else "Summarization failed"
+            except Exception as e:
+                print(f"Error summarizing {file_path.name}: {e}")
+                result, error = None, str(e)
+            if result and self.collect_results:
+                with self._results_lock:
+                    self._results[index] = result
+            self._complete(file_path, result, error, version)
+
+
+    def _complete(self, file_path: Path, result, error: Optional[str],
+                  version: Optional[FileVersion] = None) -> None:
+        """Report a finished file. Errors of on_complete are reported against that file only."""
+        if self.on_complete is None:
+            return
+        try:
+            self.on_complete(file_path, result, error, version)
+        except Exception as e:
+            print(f"Error completing {file_path.name}: {e}")
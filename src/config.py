@@ -18,12 +18,55 @@ class Config:
     model_name: str = os.getenv("MODEL_NAME",  "deepseek-r1:7b")
     ollama_base_url: str = os.getenv("OLLAMA_BASE_URL", "http://localhost:11434")
     ollama_timeout: int = int(os.getenv("OLLAMA_TIMEOUT", "300"))
+    ollama_max_concurrency: int = int(os.getenv("OLLAMA_MAX_CONCURRENCY", "2"))
+
+    llm_cache_enabled: bool = os.getenv("LLM_CACHE_ENABLED", "True").lower() == "true"
+    llm_cache_path: Optional[Path] = None
+    llm_cache_max_mb: int = int(os.getenv("LLM_CACHE_MAX_MB", "256"))
+    llm_cache_ttl_seconds: float = float(os.getenv("LLM_CACHE_TTL_SECONDS", "2592000"))
+
+    text_cache_enabled: bool = os.getenv("TEXT_CACHE_ENABLED", "True").lower() == "true"
+    text_cache_path: Optional[Path] = None
+    text_cache_max_mb: int = int(os.getenv("TEXT_CACHE_MAX_MB", "1024"))
 
     chunk_size: int = int(os.getenv("CHUNK_SIZE", "2500"))
     chunk_overlap: int = int(os.getenv("CHUNK_OVERLAP", "200"))
     top_k_chunks: int = int(os.getenv("TOP_K_CHUNKS", "3"))
+    pdf_extract_workers: int = int(os.getenv("PDF_EXTRACT_WORKERS", str(os.cpu_count() or 1)))
+    pdf_parallel_min_pages: int = int(os.getenv("PDF_PARALLEL_MIN_PAGES", "100"))
+    txt_mmap_min_mb: int = int(os.getenv("TXT_MMAP_MIN_MB", "64"))
+    # Names from file_processor.sections.SECTION_HEADINGS whose heading ends
+    # the extracted text; empty keeps the whole document
+    cutoff_sections: tuple = tuple(
+        name.strip() for name in os.getenv(
+            "CUTOFF_SECTIONS",
+            "references,bibliography,appendix,appendices,index,acknowledgments,works_cited"
+        ).split(",") if name.strip()
+    )
 
     embedding_model: str = os.getenv("EMBEDDING_MODEL", "all-MiniLM-L6-v2")
+    embedding_batch_size: int = int(os.getenv("EMBEDDING_BATCH_SIZE", "32"))
+    embedding_max_tokens: int = int(os.getenv("EMBEDDING_MAX_TOKENS", "256"))
+    # Processes encoding batches in parallel, each pinned to its share of the cores; 0 encodes in-process
+    embedding_workers: int = int(os.getenv("EMBEDDING_WORKERS", "0"))
+    # Pinned revision of the embedding model; part of the embedding cache key
+    embedding_model_revision: str = os.getenv("EMBEDDING_MODEL_REVISION", "")
+    # Precision chunk embeddings are kept and scored at: float32, float16 or int8
+    embedding_quantization: str = os.getenv("EMBEDDING_QUANTIZATION", "float32")
+
+    embedding_cache_enabled: bool = os.getenv("EMBEDDING_CACHE_ENABLED", "True").lower() == "true"
+    embedding_cache_path: Optional[Path] = None
+    embedding_cache_max_mb: int = int(os.getenv("EMBEDDING_CACHE_MAX_MB", "2048"))
+
+    # Concurrent encode/predict calls on a shared model are merged into batches
+    # of up to micro_batch_max_size items, waiting at most micro_batch_max_wait_ms
+    micro_batch_enabled: bool = os.getenv("MICRO_BATCH_ENABLED", "True").lower() == "true"
+    micro_batch_max_size: int = int(os.getenv("MICRO_BATCH_MAX_SIZE", "64"))
+    micro_batch_max_wait_ms: float = float(os.getenv("MICRO_BATCH_MAX_WAIT_MS", "5"))
+
+    max_loaded_models: int = int(os.getenv("MAX_LOADED_MODELS", "4"))
+    model_memory_limit_mb: int = int(os.getenv("MODEL_MEMORY_LIMIT_MB", "0"))
+    model_idle_seconds: float = float(os.getenv("MODEL_IDLE_SECONDS", "0"))
 
     max_retries: int = int(os.getenv("MAX_RETRIES", "3"))
     retry_delay: float = float(os.getenv("RETRY_DELAY", "1.0"))
@@ -40,6 +83,15 @@ class Config:
         if self.log_to_file and self.log_file is None:
             self.log_file = self.output_folder / "agent.log"
 
+        if self.llm_cache_path is None:
+            self.llm_cache_path = self.output_folder / "llm_cache.sqlite3"
+
+        if self.text_cache_path is None:
+            self.text_cache_path = self.output_folder / "text_cache.sqlite3"
+
+        if self.embedding_cache_path is None:
+            self.embedding_cache_path = self.output_folder / "embedding_cache"
+
     def validate(self) -> None:
         """
         Validate configuration values
@@ -53,6 +105,30 @@ class Config:
         if self.chunk_size <= 0:
             raise ValueError("chunk_size must be positive integer")
 
+        if self.pdf_extract_workers <= 0:
+            raise ValueError("pdf_extract_workers must be positive integer")
+
+        if self.embedding_batch_size <= 0:
+            raise ValueError("embedding_batch_size must be positive integer")
+
+        if self.embedding_workers < 0:
+            raise ValueError("embedding_workers cannot be negative")
+
+        if self.embedding_max_tokens <= 2:
+            raise ValueError("embedding_max_tokens must be greater than 2")
+
+        if self.embedding_quantization not in ["float32", "float16", "int8"]:
+            raise ValueError(f"Invalid embedding_quantization: {self.embedding_quantization}")
+
+        if self.micro_batch_max_size <= 0 or self.micro_batch_max_wait_ms < 0:
+            raise ValueError("micro_batch_max_size must be positive and micro_batch_max_wait_ms not negative")
+
+        if self.max_loaded_models < 0 or self.model_memory_limit_mb < 0:
+            raise ValueError("Model registry limits cannot be negative")
+
+        if self.ollama_max_concurrency <= 0:
+            raise ValueError("ollama_max_concurrency must be positive integer")
+
         if self.max_retries < 0:
             raise ValueError("max_retries cannot be negative")
 
@@ -1,40 +1,210 @@
-import pandas as pd
+import sys
+import argparse
 from pathlib import Path
-from rag import Retriever
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT_DIR)) # Make the `src` package importable
+
+from rag import Retriever, PartialSummary, TOP_K
+from read_file import EMBEDDING_MODEL, MAX_CHUNK_LENGTH, CHUNKING_STRATEGIES
+from batch_pipeline import BatchPipeline
+from src.config import Config
+from src.agent.manifest import RunManifest, config_fingerprint, file_version
+from src.agent.ingestion import iter_work_items
+from src.agent.tools.file_processor.readers import supported_extensions
+from src.agent.response import SummaryResult
+from src.agent.sinks import SINKS, open_sink, export_excel
+from src.agent.tools.ollama_api import OllamaClient
+from src.agent.tools.ollama_api.response_cache import ResponseCache
+from src.agent.tools.file_processor.text_cache import TextCache
+from src.agent.tools.embedder.embedding_cache import EmbeddingCache
+from src.agent.tools.embedder.pool import get_embedding_pool
+from src.agent.tools.summarizer import MapReduceSummarizer
 
 
 INPUT_FILE_PATH = "input_files" # Path to the folder containing input files
 OUTPUT_FILE_PATH = "output_files" # Path to the folder where output files will be saved
 MODEL_NAME = "deepseek-r1:7b" # The model name. This script uses models provided by Ollama API.
+EXTRACT_WORKERS = 4 # Processes reading and chunking files in parallel
+EMBED_WORKERS = 0 # Processes encoding chunks in parallel (0 = in-process)
+LLM_CONCURRENCY = 2 # Ollama requests in flight at the same time
+QUEUE_SIZE = 8 # Documents buffered between pipeline stages
+CHECKPOINT_EVERY = 10 # Files between manifest checkpoints
+TOKEN_BUDGET = 2000 # Tokens of content per LLM call in map-reduce mode
+LLM_CACHE_MAX_MB = 256 # LLM answers kept between runs
+LLM_CACHE_TTL_DAYS = 30 # Age after which a cached LLM answer is generated again
+TEXT_CACHE_MAX_MB = 1024 # Compressed extracted text kept between runs
+EMBEDDING_CACHE_MAX_MB = 2048 # Chunk embeddings kept between runs
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Summarize documents with Ollama and RAG.")
+    parser.add_argument("--input-folder", default=INPUT_FILE_PATH, help="Folder containing input files")
+    parser.add_argument("--output-folder", default=OUTPUT_FILE_PATH, help="Folder where summaries are saved")
+    parser.add_argument("--model", default=MODEL_NAME, help="Ollama model to use")
+    parser.add_argument("--extract-workers", type=int, default=EXTRACT_WORKERS,
+                        help="Number of processes reading files in parallel")
+    parser.add_argument("--embed-workers", type=int, default=EMBED_WORKERS,
+                        help="Processes encoding chunks in parallel, each pinned to its share of the cores (0 = in-process)")
+    parser.add_argument("--llm-concurrency", type=int, default=LLM_CONCURRENCY,
+                        help="Number of concurrent Ollama requests")
+    parser.add_argument("--queue-size", type=int, default=QUEUE_SIZE,
+                        help="Documents buffered between pipeline stages")
+    parser.add_argument("--sequential", action="store_true",
+                        help="Process files one after another instead of pipelining")
+    parser.add_argument("--stream", action="store_true",
+                        help="Stream tokens into the output files as they are generated")
+    parser.add_argument("--deadline", type=float, default=None,
+                        help="Cancel streamed generations after this many seconds per document (requires --stream)")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="Always call the LLM instead of reusing cached answers")
+    parser.add_argument("--no-text-cache", action="store_true",
+                        help="Always extract text instead of reusing text extracted in earlier runs")
+    parser.add_argument("--no-embedding-cache", action="store_true",
+                        help="Always embed chunks instead of reusing embeddings from earlier runs")
+    parser.add_argument("--map-reduce", action="store_true",
+                        help="Summarize the whole document with map-reduce instead of the top chunks")
+    parser.add_argument("--token-budget", type=int, default=TOKEN_BUDGET,
+                        help="Maximum estimated tokens of content per map-reduce LLM call")
+    parser.add_argument("--chunking", choices=CHUNKING_STRATEGIES, default="paragraphs",
+                        help="Split documents by paragraphs or by sentences packed to the embedding model's token limit")
+    parser.add_argument("--dedup", action="store_true",
+                        help="Drop duplicate chunks and repeated header/footer lines before embedding")
+    parser.add_argument("--force", action="store_true",
+                        help="Reprocess every file, even those unchanged since the last run")
+    parser.add_argument("--sink", choices=list(SINKS), default="jsonl",
+                        help="Format results are streamed to as each file finishes")
+    parser.add_argument("--no-excel", action="store_true",
+                        help="Skip building summaries.xlsx from the streamed results")
+    args = parser.parse_args()
+    if args.deadline is not None and not args.stream:
+        # Only streamed generations can be cut off and keep a partial answer
+        parser.error("--deadline requires --stream")
+    return args
 
 
 def main():
-    input_folder = Path(INPUT_FILE_PATH)
-    output_folder = Path(OUTPUT_FILE_PATH)
+    args = parse_args()
+    input_folder = Path(args.input_folder)
+    output_folder = Path(args.output_folder)
     output_folder.mkdir(exist_ok=True)
 
     query = "Summarize the key points of this document or the main argument."
-    retriever = Retriever(model_name=MODEL_NAME)
-    files = set(list(input_folder.glob("*.txt")) + list(input_folder.glob("*.pdf")) + list(input_folder.glob("*.PDF")))
-    print(f"Found {len(files)} files in the input folder.")
+    cache = None if args.no_cache else ResponseCache(
+        output_folder / "llm_cache.sqlite3", max_bytes=LLM_CACHE_MAX_MB * 2**20,
+        ttl_seconds=LLM_CACHE_TTL_DAYS * 24 * 3600
+    )
+    text_cache = None if args.no_text_cache else TextCache(
+        output_folder / "text_cache.sqlite3", max_bytes=TEXT_CACHE_MAX_MB * 2**20
+    )
+    embedding_cache = None if args.no_embedding_cache else EmbeddingCache(
+        output_folder / "embedding_cache", max_bytes=EMBEDDING_CACHE_MAX_MB * 2**20
+    )
+    summarizer = None
+    if args.map_reduce:
+        config = Config(input_folder=input_folder, output_folder=output_folder,
+                        model_name=args.model, llm_cache_enabled=False)
+        llm = OllamaClient(config, max_concurrency=args.llm_concurrency, cache=cache)
+        summarizer = MapReduceSummarizer(llm)
+    embedder = get_embedding_pool(EMBEDDING_MODEL, args.embed_workers) if args.embed_workers > 0 else None
+    retriever = Retriever(model_name=args.model, embedder=embedder, stream=args.stream,
+                          deadline_seconds=args.deadline, cache=cache, summarizer=summarizer,
+                          token_budget=args.token_budget, max_parallel=args.llm_concurrency,
+                          chunking=args.chunking, dedup=args.dedup, text_cache=text_cache,
+                          embedding_cache=embedding_cache, input_folder=input_folder)
+    # Files are streamed into the pipeline, largest first, while the folder is still being walked.
+    # An output folder inside the input folder is skipped, so answers are not read back as documents
+    items = iter_work_items(input_folder, supported_extensions(), exclude=[output_folder])
+
+    fingerprint = config_fingerprint(
+        model=args.model,
+        embedding_model=EMBEDDING_MODEL,
+        chunk_size=MAX_CHUNK_LENGTH,
+        chunking=args.chunking,
+        dedup=args.dedup,
+        top_k=TOP_K,
+        query=query,
+        map_reduce=args.map_reduce,
+        token_budget=args.token_budget if args.map_reduce else None,
+    )
+    manifest = RunManifest(output_folder, fingerprint, checkpoint_every=CHECKPOINT_EVERY)
+
+    sink = open_sink(args.sink, output_folder)
+    with sink:
+        unchanged = 0
 
-    if not files:
+        def pending():
+            nonlocal unchanged
+            for item in items:
+                manifest.count_file()
+                if not args.force and manifest.is_up_to_date(item.path):
+                    filename = retriever.document_name(item.path)
+                    output_file = Retriever.output_path(output_folder, filename)
+                    sink.write(SummaryResult(filename=filename, summary=output_file.read_text(encoding="utf-8")))
+                    unchanged += 1
+                else:
+                    yield item.path
+
+        def on_complete(file_path, result, error=None, version=None):
+            filename = retriever.document_name(file_path)
+            if isinstance(result, PartialSummary):
+                # Kept in the results, but recorded as failed so the next run retries it
+                error = "Generation cancelled at deadline, partial answer"
+            if result:
+                sink.write(SummaryResult(filename=filename, summary=result[1], success=error is None, error=error))
+            else:
+                sink.write(SummaryResult(filename=filename, summary="", success=False, error=error))
+            output_file = Retriever.output_path(output_folder, filename) if result else None
+            manifest.record(file_path, success=error is None and bool(result), error=error,
+                            output_file=output_file, version=version)
+
+        if args.sequential:
+            for file in pending():
+                print(f"\nProcessing file: {file.name} with RAG.")
+                try:
+                    version = file_version(file) # Taken before reading, as extraction workers do
+                except OSError:
+                    version = None
+                document = retriever.process_file(file, version.content_hash if version else None)
+                result = retriever.summarize_document(document, output_folder, query) if document else None
+                on_complete(file, result, None if result else "Processing failed", version)
+        else:
+            pipeline = BatchPipeline(
+                retriever,
+                output_folder,
+                query,
+                extract_workers=args.extract_workers,
+                llm_workers=args.llm_concurrency,
+                queue_size=args.queue_size,
+                on_complete=on_complete,
+                collect_results=False,
+            )
+            pipeline.run(pending())
+    manifest.close()
+
+    if not manifest.state.total_files:
         print("No supported files found in the input folder.")
         return
+    print(f"Found {manifest.state.total_files} files in the input folder, {unchanged} unchanged since the last run.")
+    print(f"{manifest.state.files_processed} files processed, {manifest.state.files_failed} failed.")
+    print(f"Results streamed to {sink.path}")
 
-    results = []
-    for file in files:
-        print(f"\nProcessing file: {file.name} with RAG.")
-        result = retriever(file, output_folder, query)
-        if result:
-            results.append(result)
-
-    if results:
-        df = pd.DataFrame(results, columns=["Filename", "Summary"])
+    if not args.no_excel:
         excel_path = output_folder / "summaries.xlsx"
-        df.to_excel(excel_path, index=False)
-        print(f"\nAll summaries saved to {excel_path}")
+        if export_excel(type(sink).read(sink.path), excel_path):
+            print(f"\nAll summaries saved to {excel_path}")
+
+    if cache is not None:
+        stats = cache.stats()
+        print(f"LLM cache: {stats['hits']} hits, {stats['misses']} misses, {stats['entries']} entries")
+    if text_cache is not None:
+        stats = text_cache.stats()
+        print(f"Text cache: {stats['entries']} documents, {stats['total_bytes'] / 2**20:.1f} MB")
+    if embedding_cache is not None:
+        stats = embedding_cache.stats()
+        print(f"Embedding cache: {stats['hits']} hits, {stats['misses']} misses, "
+              f"{stats['entries']} chunks, {stats['total_bytes'] / 2**20:.1f} MB")
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
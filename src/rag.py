@@ -1,24 +1,101 @@
+import time
 import ollama
+import dataclasses
 import numpy as np
-from typing import Tuple
+from typing import Optional, Tuple, Union
 from pathlib import Path
-from sentence_transformers import SentenceTransformer
-from read_file import FileProcessor
+from dataclasses import dataclass
+from read_file import FileProcessor, ProcessedDocument, EMBEDDING_MODEL
+from src.agent.tools.model_registry import get_model_registry
+from src.agent.tools.ollama_api.response_cache import ResponseCache
+from src.agent.tools.file_processor.text_cache import TextCache
+from src.agent.tools.embedder.embedding_cache import EmbeddingCache
+from src.agent.tools.semantic_index import SemanticIndex, as_semantic_index
+from src.agent.tools.summarizer import MapReduceSummarizer, SummarizerInput
 
+TOP_K = 3 # Chunks used as context for the LLM
+
+
+@dataclass
+class GenerationStats:
+    """
+    Timing of a single LLM generation.
+
+    """
+    total_seconds: float
+    tokens: int = 0
+    time_to_first_token: Optional[float] = None
+    cancelled: bool = False
+    cached: bool = False
+
+    @property
+    def tokens_per_second(self) -> float:
+        if self.time_to_first_token is None:
+            return 0.0
+        generation_seconds = self.total_seconds - self.time_to_first_token
+        return self.tokens / generation_seconds if generation_seconds > 0 else 0.0
+
+
+class PartialSummary(tuple):
+    """
+    (filename, summary) of a document whose streamed generation was
+    cancelled at its deadline. Unpacks like a complete result, but should
+    not be recorded as done, so the document is summarized again later.
+
+    """
 
 
 class Retriever:
     """
     Class to handle retrieval of relevant chunks from a document based on a query.
     Uses SentenceTransformer for embedding and cosine similarity for retrieval.
-    
+
+    With stream=True, tokens are written to the output file as they arrive and
+    generations running longer than deadline_seconds are cancelled, keeping the
+    partial answer.
+
+    When a ResponseCache is given, answers for prompts already seen are
+    served from it instead of calling the LLM.
+
+    When a MapReduceSummarizer is given, the whole document is summarized
+    with map-reduce instead of only the top retrieved chunks.
+
+    chunking selects how FileProcessor splits documents ("paragraphs" or "tokens"),
+    and dedup drops duplicate chunks before they are embedded. When a TextCache
+    is given, text extracted from PDFs in earlier runs is reused, and when an
+    EmbeddingCache is given, only chunks not embedded in earlier runs are encoded.
+    embedding_model names the model embedder encodes with.
+
+    Documents are named by their path relative to input_folder when given,
+    so files with the same name in different subfolders, or with another
+    extension, get answer files of their own.
+
     """
 
-    def __init__(self, model_name: str = None, embedder=None):
+    def __init__(self, model_name: str = None, embedder=None,
+                 stream: bool = False, deadline_seconds: float = None,
+                 cache: ResponseCache = None, summarizer: MapReduceSummarizer = None,
+                 token_budget: int = 2000, max_parallel: int = 2, chunking: str = "paragraphs",
+                 dedup: bool = False, text_cache: TextCache = None,
+                 embedding_cache: EmbeddingCache = None, embedding_model: str = EMBEDDING_MODEL,
+                 input_folder: Path = None):
 
         self.model_name = model_name if model_name else "phi4:14b"
-        self.embedder = embedder if embedder else SentenceTransformer("all-MiniLM-L6-v2")
-        
+        self.embedding_model = embedding_model
+        self.embedder = embedder if embedder else get_model_registry().sentence_transformer(embedding_model)
+        self.stream = stream
+        self.deadline_seconds = deadline_seconds
+        self.client = ollama.Client(timeout=deadline_seconds) if stream else None
+        self.cache = cache
+        self.summarizer = summarizer
+        self.token_budget = token_budget
+        self.max_parallel = max_parallel
+        self.chunking = chunking
+        self.dedup = dedup
+        self.text_cache = text_cache
+        self.embedding_cache = embedding_cache
+        self.input_folder = Path(input_folder).resolve() if input_folder else None
+
 
     def __call__(self, file_path: Path, output_folder: Path, query: str) -> Tuple[str, str] or None:
         """
@@ -26,51 +103,210 @@ class Retriever:
         This method reads the file, summarizes it, saves the summary as a .txt file,
         and returns a tuple of (filename, summary).
 
+        """
+        document = self.process_file(file_path)
+        if document is None:
+            return None
+        return self.summarize_document(document, output_folder, query)
+
+    def process_file(self, file_path: Path, content_hash: Optional[str] = None) -> Optional[ProcessedDocument]:
+        """
+        Read, chunk and embed a file. Returns None on failure.
+        content_hash saves hashing the file when the caller already did.
+
         """
         try:
-            file = FileProcessor(file_path)
-            print(f"File {file_path.name} read successfully with {len(file()[1])} chunks.")
+            document = FileProcessor(file_path, embedder=self.embedder,
+                                     chunking=self.chunking, dedup=self.dedup,
+                                     text_cache=self.text_cache,
+                                     embedding_cache=self.embedding_cache,
+                                     embedding_model=self.embedding_model).process(content_hash)
+            print(f"File {file_path.name} read successfully with {document.num_chunks} chunks.")
+            return dataclasses.replace(document, filename=self.document_name(file_path))
         except Exception as e:
             print(f"Error reading {file_path.name}: {e}")
             return None
 
+    def document_name(self, file_path: Path) -> str:
+        """
+        Name of a document in results: its path relative to input_folder, or
+        its file name for files outside of it.
+
+        """
+        if self.input_folder is not None:
+            try:
+                return Path(file_path).resolve().relative_to(self.input_folder).as_posix()
+            except ValueError:
+                pass
+        return Path(file_path).name
+
+    @staticmethod
+    def output_path(output_folder: Path, filename: str) -> Path:
+        """
+        Path of the .txt file holding the answer for a document named
+        filename, in the subfolder of output_folder matching the document's.
+
+        """
+        return output_folder / f"{filename}_rag_answer.txt"
+
+    def summarize_document(self, document: ProcessedDocument, output_folder: Path,
+                           query: str) -> Tuple[str, str] or None:
+        """
+        Summarize an already processed document and save the answer as a .txt file.
+        Returns a tuple of (filename, summary), a PartialSummary when a streamed
+        generation was cancelled at its deadline, or None on failure.
+
+        """
         try:
-            answer = self.rag_summarize(query, file()[1], file()[2])
-            output_file = output_folder / f"{file_path.stem}_rag_answer.txt"
-            output_file.write_text(answer, encoding="utf-8")
-            print(f"RAG answer for {file_path.name} saved to {output_file}")
-            return file_path.name, answer
+            output_file = self.output_path(output_folder, document.filename)
+            output_file.parent.mkdir(parents=True, exist_ok=True)
+            if self.summarizer is not None:
+                answer = self.map_reduce_summarize(query, document.chunks)
+                output_file.write_text(answer, encoding="utf-8")
+                print(f"RAG answer for {document.filename} saved to {output_file}")
+                return document.filename, answer
+
+            prompt = self.build_prompt(query, document.chunks, document.index)
+            if self.stream:
+                answer, stats = self.generate_streaming(prompt, output_file)
+                if stats.cached:
+                    print(f"Using cached answer for {document.filename}")
+                else:
+                    status = "cancelled at deadline, partial answer" if stats.cancelled else "complete"
+                    print(f"Generation for {document.filename} {status}: "
+                          f"time to first token {stats.time_to_first_token or 0:.2f}s, "
+                          f"{stats.tokens_per_second:.1f} tokens/s, {stats.total_seconds:.1f}s total")
+                if stats.cancelled:
+                    print(f"Partial RAG answer for {document.filename} saved to {output_file}")
+                    return PartialSummary((document.filename, answer))
+            else:
+                answer = self.generate(prompt)
+                output_file.write_text(answer, encoding="utf-8")
+            print(f"RAG answer for {document.filename} saved to {output_file}")
+            return document.filename, answer
         except Exception as e:
-            print(f"Error summarizing {file_path.name}: {e}")
+            print(f"Error summarizing {document.filename}: {e}")
             return None
 
 
-    def retrieve_relevant_chunks(self, query: str, chunks: list, chunk_embeddings: np.ndarray,
-                                top_k: int = 3) -> list:
+    def retrieve_relevant_chunks(self, query: str, chunks: list,
+                                 chunk_embeddings: Union[np.ndarray, SemanticIndex], top_k: int = 3) -> list:
         """
         Retrieve top_k chunks that are most similar to the query.
+        chunk_embeddings may be the document's SemanticIndex, which is reused.
 
         """
         query_embedding = self.embedder.encode(query)
-        norms = np.linalg.norm(chunk_embeddings, axis=1) * np.linalg.norm(query_embedding)
-        similarities = np.dot(chunk_embeddings, query_embedding) / (norms + 1e-10)
-        top_indices = np.argsort(similarities)[-top_k:][::-1]
+        top_indices, _ = as_semantic_index(chunk_embeddings).top_k(query_embedding, top_k)
         return [chunks[i] for i in top_indices]
 
 
-    def rag_summarize(self, query: str, chunks: list, chunk_embeddings: np.ndarray) -> str:
+    def rag_summarize(self, query: str, chunks: list,
+                      chunk_embeddings: Union[np.ndarray, SemanticIndex]) -> str:
 
         """
         Given a document and a query, retrieve top relevant chunks and use them to prompt the LLM.
         
         """
-        relevant_chunks = self.retrieve_relevant_chunks(query, chunks, chunk_embeddings, top_k=3)
+        return self.generate(self.build_prompt(query, chunks, chunk_embeddings))
+
+
+    def map_reduce_summarize(self, query: str, chunks: list) -> str:
+        """
+        Summarize every chunk in token-budgeted groups, then reduce the partial summaries.
+
+        """
+        output = self.summarizer.execute(SummarizerInput(
+            chunks=chunks,
+            query=query,
+            token_budget=self.token_budget,
+            max_parallel=self.max_parallel,
+        ))
+        if not output.success:
+            raise RuntimeError(output.error_message)
+        print(f"Map-reduce summary from {output.map_calls} groups "
+              f"with {output.reduce_levels} reduce levels ({output.llm_calls} LLM calls)")
+        return output.summary
+
+
+    def build_prompt(self, query: str, chunks: list,
+                     chunk_embeddings: Union[np.ndarray, SemanticIndex]) -> str:
+        """
+        Build the LLM prompt from the top relevant chunks.
+
+        """
+        relevant_chunks = self.retrieve_relevant_chunks(query, chunks, chunk_embeddings, top_k=TOP_K)
         context = "\n".join(relevant_chunks)
 
-        prompt = (f"Question: {query}\n\nContext:\n{context}\n\n"
+        return (f"Question: {query}\n\nContext:\n{context}\n\n"
                 "Answer the question concisely based on the context:")
+
+
+    def generate(self, prompt: str) -> str:
+        """
+        Generate the full answer in a single blocking call.
+
+        """
+        if self.cache is not None:
+            cached = self.cache.get(self.model_name, prompt)
+            if cached is not None:
+                return cached
         response = ollama.generate(model=self.model_name, prompt=prompt)
-        return response.get("response", "").strip()
+        answer = response.get("response", "").strip()
+        if self.cache is not None:
+            self.cache.put(self.model_name, prompt, answer)
+        return answer
+
+
+    def generate_streaming(self, prompt: str, output_file: Path) -> Tuple[str, GenerationStats]:
+        """
+        Stream the answer into output_file token by token.
+        Stops at deadline_seconds and keeps whatever was generated so far.
+
+        """
+        start = time.perf_counter()
+        if self.cache is not None:
+            cached = self.cache.get(self.model_name, prompt)
+            if cached is not None:
+                output_file.write_text(cached, encoding="utf-8")
+                return cached, GenerationStats(total_seconds=time.perf_counter() - start, cached=True)
+
+        deadline = start + self.deadline_seconds if self.deadline_seconds else None
+        stats = GenerationStats(total_seconds=0.0)
+        parts = []
+
+        with output_file.open("w", encoding="utf-8") as f:
+            stream = self.client.generate(model=self.model_name, prompt=prompt, stream=True)
+            try:
+                for chunk in stream:
+                    token = chunk.get("response", "")
+                    if token:
+                        if stats.time_to_first_token is None:
+                            stats.time_to_first_token = time.perf_counter() - start
+                        stats.tokens += 1
+                        parts.append(token)
+                        f.write(token)
+                        f.flush()
+                    if chunk.get("done"):
+                        stats.tokens = chunk.get("eval_count") or stats.tokens
+                        break
+                    if deadline is not None and time.perf_counter() > deadline:
+                        stats.cancelled = True
+                        break
+            except Exception as e:
+                if deadline is None or time.perf_counter() < deadline:
+                    raise
+                # The client read timeout fired while waiting for the next token
+                print(f"Generation stopped at deadline: {e}")
+                stats.cancelled = True
+            finally:
+                stream.close()
+
+        stats.total_seconds = time.perf_counter() - start
+        answer = "".join(parts).strip()
+        if self.cache is not None and not stats.cancelled:
+            self.cache.put(self.model_name, prompt, answer)
+        return answer, stats
     
         
         
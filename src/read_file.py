@@ -1,55 +1,186 @@
-import re
-import PyPDF2
+import threading
 import numpy as np
 from pathlib import Path
-from sentence_transformers import SentenceTransformer
+from collections import OrderedDict
+import dataclasses
+from dataclasses import dataclass
+from typing import Optional
+from src.agent.manifest import file_content_hash
+from src.agent.tools.model_registry import get_model_registry
+from src.agent.tools.embedder.embedding_cache import EmbeddingCache, encode_cached
+from src.agent.tools.file_processor.streaming import iter_pdf_pages, stop_at_section
+from src.agent.tools.file_processor.sections import SectionScanner
+from src.agent.tools.file_processor.readers import reader_for
+from src.agent.tools.file_processor.token_chunker import TokenChunker, model_max_tokens
+from src.agent.tools.file_processor.text_cache import TextCache
+from src.agent.tools.deduplicator import Deduplicator, DeduplicatorInput
+from src.agent.tools.semantic_index import SemanticIndex
+
+
+EMBEDDING_MODEL = "all-MiniLM-L6-v2"
+EMBEDDING_MAX_TOKENS = 256 # Tokens per chunk for models whose tokenizer declares no max length
+MAX_CHUNK_LENGTH = 2500
+CHUNKING_STRATEGIES = ("paragraphs", "tokens")
+_CACHE_SIZE = 32 # Number of processed documents kept in memory
+_processed_cache = OrderedDict()
+_processed_cache_lock = threading.Lock() # Pipeline stages process files concurrently
+CUTOFF_SECTIONS = SectionScanner.for_names(["bibliography", "references"])
+
+
+@dataclass(frozen=True)
+class ProcessedDocument:
+    """
+    Result of reading, chunking and embedding a single document.
+    Computed once per file content and reused by the whole pipeline.
+    The SemanticIndex of the embeddings, which shares their memory, is
+    built with the document and kept by copies made with dataclasses.replace.
+
+    """
+    filename: str
+    content_hash: str
+    chunks: list
+    embeddings: np.ndarray
+    num_characters: int
+    index: Optional[SemanticIndex] = None
+
+    def __post_init__(self):
+        if self.index is None:
+            object.__setattr__(self, "index", SemanticIndex(self.embeddings))
+
+    @property
+    def num_chunks(self) -> int:
+        return len(self.chunks)
+
+    @property
+    def embedding_dim(self) -> int:
+        return self.embeddings.shape[1] if self.embeddings.ndim == 2 else 0
+
 
 
 
 class FileProcessor:
     """
     Class to handle reading and processing files.
-    Supports .txt and .pdf formats.
+    Supports .txt and .pdf formats, and the other formats of the reader
+    registry (.md, .html, and .docx if python-docx is installed).
+
+    embedding_model names the model embedder encodes with (the registry's
+    EMBEDDING_MODEL when no embedder is given). It keys the in-memory
+    memo and the embedding cache, so vectors of one model are never
+    returned for another.
+
+    Text is chunked by paragraphs up to MAX_CHUNK_LENGTH characters, or with
+    chunking="tokens" by whole sentences up to the embedding model's max
+    sequence length. With dedup=True, duplicate and near-duplicate chunks and
+    repeated header/footer lines are dropped before embedding. Extracted text
+    is reused from text_cache and chunk embeddings from embedding_cache when given.
 
     """
-    def __init__(self, file_path: Path, embedder = None):
+    def __init__(self, file_path: Path, embedder = None, batch_size: int = 32,
+                 chunking: str = "paragraphs", dedup: bool = False,
+                 text_cache: Optional[TextCache] = None,
+                 embedding_cache: Optional[EmbeddingCache] = None,
+                 embedding_model: str = EMBEDDING_MODEL):
+        if chunking not in CHUNKING_STRATEGIES:
+            raise ValueError(f"Unknown chunking strategy: {chunking}")
         self.supported_formats = [".txt", ".pdf"]
         self.file_path = file_path
-        self.max_chunk_length = 2500
-        self.embedder = embedder if embedder else SentenceTransformer("all-MiniLM-L6-v2")
+        self.max_chunk_length = MAX_CHUNK_LENGTH
+        self.batch_size = batch_size
+        self.chunking = chunking
+        self.dedup = dedup
+        self.text_cache = text_cache
+        self.embedding_cache = embedding_cache
+        self._embedder = embedder
+        self.embedding_model = embedding_model
+        self.model_key = EmbeddingCache.model_key(embedding_model)
+
+    @property
+    def embedder(self):
+        """Embedding model; the shared registry instance unless one was given."""
+        if self._embedder is None:
+            return get_model_registry().sentence_transformer(self.embedding_model)
+        return self._embedder
 
 
     def __call__(self) -> tuple[str, list, np.ndarray]:
 
         """
         Process the file: read, clean, chunk, and embed.
-        Returns the filename and a list of chunks.
+        Returns the filename, a list of chunks and their embeddings.
+        """
+        document = self.process()
+        return document.filename, document.chunks, document.embeddings
+
+    def process(self, content_hash: Optional[str] = None) -> ProcessedDocument:
+        """
+        Process the file once and memoize the result by content hash and
+        embedding model. Files with identical content are only read, chunked
+        and embedded once per model. content_hash saves hashing the file
+        when the caller already did.
         """
         if not self.file_path.exists():
             raise FileNotFoundError(f"File not found: {self.file_path}")
-        text = self.read_file()
-        chunks = self.chunk_text(text)
+        key = (content_hash or file_content_hash(self.file_path), self.max_chunk_length, self.chunking, self.dedup,
+               self.model_key)
+        with _processed_cache_lock:
+            document = _processed_cache.get(key)
+            if document is not None:
+                _processed_cache.move_to_end(key)
+        if document is not None:
+            if document.filename != self.file_path.name:
+                document = dataclasses.replace(document, filename=self.file_path.name)
+            return document
+
+        text = self.read_file(content_hash=key[0])
+        chunks = self.deduplicate(self.chunk_text(text))
         embeddings = self.embed_chunks(chunks)
-        return self.file_path.name, chunks, embeddings
-
-    def read_file(self) -> str:
+        document = ProcessedDocument(
+            filename=self.file_path.name,
+            content_hash=key[0],
+            chunks=chunks,
+            embeddings=embeddings,
+            num_characters=sum(len(chunk) for chunk in chunks),
+        )
+        with _processed_cache_lock:
+            _processed_cache[key] = document
+            if len(_processed_cache) > _CACHE_SIZE:
+                _processed_cache.popitem(last=False)
+        return document
+
+    def read_file(self, content_hash: Optional[str] = None) -> str:
         """
-        Read file content from .txt or .pdf.
+        Read file content from .txt, .pdf or another registered format.
+        Text extracted from other formats than .txt is kept in the text cache,
+        if one was given; content_hash saves hashing the file again.
         """
-        if self.file_path.suffix.lower() == self.supported_formats[0]:
+        suffix = self.file_path.suffix.lower()
+        if suffix == self.supported_formats[0]:
             return self.file_path.read_text(encoding="utf-8")
-        elif self.file_path.suffix.lower() == self.supported_formats[1]:
-            text = ""
-            with self.file_path.open("rb") as f:
-                reader = PyPDF2.PdfReader(f)
-                for page in reader.pages:
-                    page_text = page.extract_text()
-                    if page_text:
-                        text += page_text + "\n"
-            cleaned_text = self.clean_text(text)
-            return cleaned_text
-        else:
+        if self.text_cache is None:
+            return self._extract_text()
+
+        content_hash = content_hash or file_content_hash(self.file_path)
+        extractor = f"legacy{suffix}"
+        text = self.text_cache.get(content_hash, extractor)
+        if text is None:
+            text = self._extract_text()
+            self.text_cache.put(content_hash, extractor, text)
+        return text
+
+    def _extract_text(self) -> str:
+        """
+        Extract the text of a PDF or another registered format, up to the bibliography.
+        """
+        if self.file_path.suffix.lower() == self.supported_formats[1]:
+            # Stop extracting pages once the bibliography starts
+            pages = (page + "\n" for page in iter_pdf_pages(self.file_path) if page)
+            return "".join(stop_at_section(pages, CUTOFF_SECTIONS))
+        reader = reader_for(self.file_path)
+        if reader is None:
             raise ValueError(f"Unsupported file type: {self.file_path.suffix}")
+        pages = reader.iter_pages(self.file_path)
+        return "".join(stop_at_section(pages, CUTOFF_SECTIONS))
 
 
     def clean_text(self, text: str) -> str:
@@ -57,14 +188,18 @@ class FileProcessor:
         Remove sections like 'Bibliography' or 'References' if present.
     
         """
-        match = re.search(r"(Bibliography|References)", text, re.IGNORECASE)
-        return text[:match.start()] if match else text
+        boundary = CUTOFF_SECTIONS.first(text)
+        return text[:boundary.start] if boundary else text
 
 
     def chunk_text(self, text: str) -> list:
         """
         Split text into smaller chunks; for RAG, shorter chunks are easier to retrieve.
         """
+        if self.chunking == "tokens":
+            tokenizer = get_model_registry().tokenizer(self.embedding_model)
+            max_tokens = model_max_tokens(tokenizer, EMBEDDING_MAX_TOKENS)
+            return TokenChunker(tokenizer, max_tokens).chunk(text).tolist()
 
         paragraphs = text.split("\n")
         chunks = []
@@ -77,13 +212,28 @@ class FileProcessor:
                 current_chunk += para + "\n"
         if current_chunk:
             chunks.append(current_chunk.strip())
-        return chunks
+        # Blank documents, and a first paragraph longer than a chunk, leave empty chunks
+        return [chunk for chunk in chunks if chunk]
     
+    def deduplicate(self, chunks: list) -> list:
+        """
+        Drop duplicate chunks and repeated header/footer lines if dedup is enabled.
+        """
+        if not self.dedup or not chunks:
+            return chunks
+        output = Deduplicator().execute(DeduplicatorInput(chunks=chunks, strip_repeated_lines=True))
+        if not output.success:
+            raise ValueError(output.error_message)
+        return [chunk for chunk in output.chunks if chunk]
+
     def embed_chunks(self, chunks: list) -> np.ndarray:
         """
-        Compute embedding for each chunk.
+        Compute embeddings for all chunks in length-sorted batches, except
+        those already in the embedding cache.
+        Returns a float32 matrix with one row per chunk, in chunk order.
         """
-        return np.array([self.embedder.encode(chunk) for chunk in chunks])
+        return encode_cached(lambda: self.embedder, chunks, self.embedding_cache, self.model_key,
+                             batch_size=self.batch_size)
 
 
         
@@ -0,0 +1,77 @@
+"""
+Tests for the recursive, size-ordered file discovery.
+"""
+import os
+import pytest
+from src.agent.ingestion import scan_files, iter_work_items
+
+
+@pytest.fixture
+def input_tree(tmp_path):
+    """Nested folders with supported, unsupported and hidden files."""
+    files = {
+        "a.txt": 10,
+        "nested/b.PDF": 300,
+        "nested/deeper/c.md": 50,
+        "nested/deeper/d.html": 200,
+        "other/e.txt": 100,
+        "other/ignored.csv": 1000,
+        ".hidden/f.txt": 500,
+        "nested/.g.txt": 400,
+    }
+    for name, size in files.items():
+        path = tmp_path / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(b"x" * size)
+    return tmp_path
+
+
+class TestIngestion:
+
+    def test_walks_recursively(self, input_tree):
+        """Supported files are found in every subfolder, hidden entries are skipped."""
+        found = {item.path.relative_to(input_tree).as_posix() for item in scan_files(input_tree)}
+        assert found == {"a.txt", "nested/b.PDF", "nested/deeper/c.md", "nested/deeper/d.html", "other/e.txt"}
+
+    def test_items_carry_stat(self, input_tree):
+        """Each item holds the size and modification time of its file."""
+        for item in scan_files(input_tree):
+            stat = item.path.stat()
+            assert (item.size, item.mtime_ns) == (stat.st_size, stat.st_mtime_ns)
+
+    def test_extension_filter(self, input_tree):
+        names = [item.path.name for item in scan_files(input_tree, extensions={".TXT"})]
+        assert sorted(names) == ["a.txt", "e.txt"]
+
+    def test_ordered_by_size(self, input_tree):
+        """Work items come largest first, or smallest first on request."""
+        sizes = [item.size for item in iter_work_items(input_tree)]
+        assert sizes == [300, 200, 100, 50, 10]
+        sizes = [item.size for item in iter_work_items(input_tree, largest_first=False)]
+        assert sizes == [10, 50, 100, 200, 300]
+
+    def test_window_streams_before_walk_ends(self, input_tree):
+        """With a small window every file is still yielded exactly once."""
+        items = list(iter_work_items(input_tree, window=2, workers=2))
+        assert len(items) == len({item.path for item in items}) == 5
+
+    def test_many_files(self, tmp_path):
+        """Files spread over many folders are all found."""
+        for folder in range(20):
+            os.makedirs(tmp_path / str(folder))
+            for i in range(30):
+                (tmp_path / str(folder) / f"{i}.txt").write_text("text")
+        assert sum(1 for _ in scan_files(tmp_path)) == 600
+
+    def test_missing_folder(self, tmp_path):
+        """A folder that does not exist yields nothing."""
+        assert list(iter_work_items(tmp_path / "missing")) == []
+
+    def test_excluded_folder(self, input_tree):
+        """An output folder inside the input folder is not scanned, a folder outside is ignored."""
+        (input_tree / "out").mkdir()
+        (input_tree / "out" / "a_rag_answer.txt").write_text("answer")
+        found = {item.path.name for item in iter_work_items(input_tree, exclude=[input_tree / "out"])}
+        assert found == {"a.txt", "b.PDF", "c.md", "d.html", "e.txt"}
+        found = {item.path.name for item in scan_files(input_tree / "nested", exclude=[input_tree / "out"])}
+        assert found == {"b.PDF", "c.md", "d.html"}
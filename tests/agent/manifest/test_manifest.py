@@ -0,0 +1,143 @@
+"""
+Tests for the processed-files manifest.
+"""
+import os
+import json
+import pytest
+import threading
+from src.agent import manifest as manifest_module
+from src.agent.manifest import RunManifest, config_fingerprint, file_version
+
+
+@pytest.fixture
+def input_file(tmp_path):
+    path = tmp_path / "doc.txt"
+    path.write_text("Some content")
+    return path
+
+
+class TestRunManifest:
+
+    def test_new_file_needs_processing(self, tmp_path, input_file):
+        """Files never seen are not up to date."""
+        manifest = RunManifest(tmp_path, "fp")
+        assert manifest.is_up_to_date(input_file) == False
+
+    def test_success_is_skipped_next_run(self, tmp_path, input_file):
+        """A successful file is up to date in a later run."""
+        manifest = RunManifest(tmp_path, "fp")
+        manifest.record(input_file, success=True)
+        manifest.checkpoint()
+        assert RunManifest(tmp_path, "fp").is_up_to_date(input_file) == True
+
+    def test_failed_is_retried(self, tmp_path, input_file):
+        """Failed files are processed again."""
+        manifest = RunManifest(tmp_path, "fp")
+        manifest.record(input_file, success=False, error="boom")
+        manifest.checkpoint()
+        assert RunManifest(tmp_path, "fp").is_up_to_date(input_file) == False
+
+    def test_changed_content(self, tmp_path, input_file):
+        """Changed files are processed again."""
+        manifest = RunManifest(tmp_path, "fp")
+        manifest.record(input_file, success=True)
+        manifest.checkpoint()
+        input_file.write_text("Different content, different size")
+        assert RunManifest(tmp_path, "fp").is_up_to_date(input_file) == False
+
+    def test_changed_config(self, tmp_path, input_file):
+        """A different settings fingerprint invalidates results."""
+        manifest = RunManifest(tmp_path, config_fingerprint(chunk_size=2500))
+        manifest.record(input_file, success=True)
+        manifest.checkpoint()
+        other = RunManifest(tmp_path, config_fingerprint(chunk_size=1000))
+        assert other.is_up_to_date(input_file) == False
+
+    def test_periodic_checkpoint(self, tmp_path):
+        """Entries and workflow state are written every checkpoint_every files."""
+        manifest = RunManifest(tmp_path, "fp", checkpoint_every=2)
+        paths = []
+        for i in range(3):
+            path = tmp_path / f"doc{i}.txt"
+            path.write_text(f"content {i}")
+            paths.append(path)
+            manifest.record(path, success=i != 1, error="boom" if i == 1 else None)
+
+        saved = RunManifest(tmp_path, "fp")
+        state = json.loads((tmp_path / RunManifest.STATE_FILENAME).read_text())
+        assert [saved.entry(path) is not None for path in paths] == [True, True, False]
+        assert saved.entry(paths[1]).error == "boom"
+        assert state["files_processed"] == 1
+        assert state["files_failed"] == 1
+        assert state["results"] == [] and state["errors"] == [] # Counters only
+
+    def test_corrupt_manifest_ignored(self, tmp_path, input_file):
+        """An unreadable manifest starts a fresh run."""
+        (tmp_path / RunManifest.FILENAME).write_text("{not a database")
+        manifest = RunManifest(tmp_path, "fp")
+        assert manifest.is_up_to_date(input_file) == False
+        manifest.record(input_file, success=True)
+        manifest.close()
+        assert RunManifest(tmp_path, "fp").is_up_to_date(input_file) == True
+
+    def test_record_with_known_version(self, tmp_path, input_file, monkeypatch):
+        """A version taken while processing the file is used instead of reading it again."""
+        version = file_version(input_file)
+        manifest = RunManifest(tmp_path, "fp")
+        monkeypatch.setattr(manifest_module, "file_content_hash", lambda path: pytest.fail("file re-read"))
+
+        assert manifest.is_up_to_date(input_file) == False
+        manifest.record(input_file, success=True, version=version)
+        manifest.close()
+        assert RunManifest(tmp_path, "fp").entry(input_file).content_hash == version.content_hash
+
+    def test_edited_while_processed(self, tmp_path, input_file):
+        """A file edited after it was read is processed again by the next run."""
+        version = file_version(input_file)
+        input_file.write_text("Edited")
+        os.utime(input_file, ns=(version.mtime_ns + 10**9, version.mtime_ns + 10**9))
+
+        manifest = RunManifest(tmp_path, "fp")
+        manifest.record(input_file, success=True, version=version)
+        manifest.close()
+        assert RunManifest(tmp_path, "fp").is_up_to_date(input_file) == False
+
+    def test_deleted_while_processed(self, tmp_path, input_file):
+        """A file deleted before its result is recorded is counted, not recorded."""
+        manifest = RunManifest(tmp_path, "fp")
+        input_file.unlink()
+
+        manifest.record(input_file, success=False, error="File not found")
+        assert manifest.state.files_failed == 1
+        assert manifest.entry(input_file) is None
+
+    def test_up_to_date_files_not_kept(self, tmp_path, input_file):
+        """Hashes of unchanged files are not held for a record() that never comes."""
+        manifest = RunManifest(tmp_path, "fp")
+        manifest.record(input_file, success=True)
+        manifest.close()
+
+        manifest = RunManifest(tmp_path, "fp")
+        input_file.touch()
+        assert manifest.is_up_to_date(input_file) == True
+        assert manifest._hashes == {}
+
+    def test_concurrent_counting(self, tmp_path):
+        """Files counted while others are recorded are all in the checkpointed state."""
+        manifest = RunManifest(tmp_path, "fp", checkpoint_every=5)
+        paths = []
+        for i in range(50):
+            path = tmp_path / f"doc{i}.txt"
+            path.write_text(f"content {i}")
+            paths.append(path)
+
+        counter = threading.Thread(target=lambda: [manifest.count_file() for _ in range(5000)])
+        counter.start()
+        for path in paths:
+            manifest.record(path, success=True)
+        counter.join()
+        manifest.close()
+
+        state = json.loads((tmp_path / RunManifest.STATE_FILENAME).read_text())
+        assert state["total_files"] == 5000
+        assert state["files_processed"] == 50
@@ -0,0 +1,66 @@
+"""
+Tests for the streaming result sinks.
+"""
+import pytest
+from src.agent.errors import ConfigurationError
+from src.agent.response import SummaryResult
+from src.agent.sinks import JsonlSink, CsvSink, open_sink, export_excel
+
+
+def make_results():
+    return [
+        SummaryResult(filename="b.txt", summary="Second, with a comma\nand a newline"),
+        SummaryResult(filename="a.txt", summary="First"),
+        SummaryResult(filename="c.pdf", summary="", success=False, error="No text extracted"),
+    ]
+
+
+class TestResultSinks:
+
+    @pytest.mark.parametrize("kind", ["jsonl", "csv", "parquet"])
+    def test_round_trip(self, tmp_path, kind):
+        """Results read back equal the results written, in write order."""
+        if kind == "parquet":
+            pytest.importorskip("pyarrow")
+        results = make_results()
+        with open_sink(kind, tmp_path) as sink:
+            for result in results:
+                sink.write(result)
+        assert sink.count == 3
+        assert sink.path == tmp_path / f"summaries.{kind}"
+        assert list(type(sink).read(sink.path)) == results
+
+    def test_jsonl_visible_before_close(self, tmp_path):
+        """Each result is on disk as soon as it is written."""
+        with JsonlSink(tmp_path / "out.jsonl") as sink:
+            sink.write(make_results()[0])
+            assert len(list(JsonlSink.read(sink.path))) == 1
+
+    def test_csv_failed_result_has_no_error_string(self, tmp_path):
+        """Empty CSV error cells are read back as None."""
+        with CsvSink(tmp_path / "out.csv") as sink:
+            sink.write(SummaryResult(filename="a.txt", summary="ok"))
+        assert next(CsvSink.read(sink.path)).error is None
+
+    def test_unknown_kind(self, tmp_path):
+        """Unsupported sink kinds are rejected."""
+        with pytest.raises(ConfigurationError):
+            open_sink("xml", tmp_path)
+
+
+class TestExportExcel:
+
+    def test_successful_rows_sorted(self, tmp_path):
+        """Only successful results are exported, ordered by filename."""
+        pd = pytest.importorskip("pandas")
+        pytest.importorskip("openpyxl")
+        excel_path = tmp_path / "summaries.xlsx"
+        assert export_excel(make_results(), excel_path) == 2
+        df = pd.read_excel(excel_path)
+        assert list(df["Filename"]) == ["a.txt", "b.txt"]
+
+    def test_no_rows_no_file(self, tmp_path):
+        """Nothing is written when no result succeeded."""
+        excel_path = tmp_path / "summaries.xlsx"
+        assert export_excel([], excel_path) == 0
+        assert not excel_path.exists()
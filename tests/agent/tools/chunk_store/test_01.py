@@ -0,0 +1,74 @@
+"""
+Tests for the array-backed ChunkStore.
+"""
+import pytest
+import numpy as np
+from pydantic import ValidationError
+from src.agent.tools.chunk_store import ChunkStore
+from src.agent.tools.embedder import EmbedderInput
+from src.agent.tools.file_processor import FileProcessorOutput
+
+
+class TestChunkStore:
+
+    def test_from_text_windows(self):
+        """Overlapping windows index into the same text."""
+        store = ChunkStore.from_text("AAABBBCCCDDD", chunk_size=5, overlap=2)
+        assert store.tolist() == ["AAABB", "BBBCC", "CCCDD", "DDD"]
+        assert store.total_characters == 18
+
+    def test_from_chunks_round_trip(self):
+        """Arbitrary chunks come back unchanged."""
+        chunks = ["first", "", "third chunk"]
+        store = ChunkStore.from_chunks(chunks)
+        assert list(store) == chunks
+        assert store == chunks
+
+    def test_slice_is_view(self):
+        """Slicing shares the text and offset arrays."""
+        store = ChunkStore.from_text("x" * 100, chunk_size=10, overlap=0)
+        view = store[2:5]
+        assert isinstance(view, ChunkStore)
+        assert len(view) == 3
+        assert np.shares_memory(view.starts, store.starts)
+        assert view[0] == store[2]
+
+    def test_numpy_index(self):
+        """Chunks can be fetched with numpy integer indices."""
+        store = ChunkStore.from_chunks(["a", "b", "c"])
+        assert [store[i] for i in np.array([2, 0])] == ["c", "a"]
+
+    def test_slots(self):
+        """Stores carry no per-instance __dict__."""
+        assert not hasattr(ChunkStore(), "__dict__")
+
+    def test_mismatched_offsets(self):
+        """starts and ends must have the same length."""
+        with pytest.raises(ValueError):
+            ChunkStore("abc", np.array([0, 1]), np.array([1]))
+
+
+class TestPydanticFields:
+
+    def test_store_passed_without_copy(self):
+        """A ChunkStore given to a tool input is used as-is."""
+        store = ChunkStore.from_text("some text here", chunk_size=4, overlap=1)
+        inp = EmbedderInput(chunks=store)
+        assert inp.chunks is store
+
+    def test_list_is_converted(self):
+        """Lists of strings are still accepted."""
+        inp = EmbedderInput(chunks=["a", "b"])
+        assert isinstance(inp.chunks, ChunkStore)
+        assert inp.chunks == ["a", "b"]
+
+    def test_invalid_chunks(self):
+        """Non-string chunks are rejected by validation."""
+        with pytest.raises(ValidationError):
+            EmbedderInput(chunks=[1, 2])
+
+    def test_serializes_as_list(self):
+        """Model dumps contain the chunk texts."""
+        output = FileProcessorOutput(success=True, chunks=["a", "b"])
+        assert output.model_dump()["chunks"] == ["a", "b"]
+        assert '"chunks":["a","b"]' in output.model_dump_json()
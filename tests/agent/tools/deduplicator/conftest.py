@@ -0,0 +1,20 @@
+"""
+Shared fixtures for Deduplicator test.
+"""
+import pytest
+from src.agent.tools.deduplicator import Deduplicator
+from src.logging_config import get_logger
+
+@pytest.fixture
+def deduplicator():
+    """Provide a Deduplicator instance."""
+    logger = get_logger("test.deduplicator")
+    return Deduplicator(logger=logger)
+
+@pytest.fixture
+def paragraphs():
+    """Distinct paragraphs of about sixty words each."""
+    return [
+        " ".join(f"topic{i} word{j} appears in paragraph {i} sentence {j // 10}." for j in range(60))
+        for i in range(5)
+    ]
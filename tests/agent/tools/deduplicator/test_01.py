@@ -0,0 +1,95 @@
+"""
+Tests for exact and near-duplicate chunk removal.
+"""
+from src.agent.tools.chunk_store import ChunkStore
+from src.agent.tools.deduplicator import DeduplicatorInput
+from src.agent.tools.deduplicator.simhash import simhash, hamming_distance, SimHashIndex
+
+
+class TestDeduplicator:
+
+    def test_exact_duplicates(self, deduplicator, paragraphs):
+        """Chunks differing only in case and whitespace are collapsed."""
+        chunks = [paragraphs[0], paragraphs[1], "  " + paragraphs[0].upper() + "\n", paragraphs[1]]
+        result = deduplicator.execute(DeduplicatorInput(chunks=chunks))
+
+        assert result.success is True
+        assert result.chunks == [paragraphs[0], paragraphs[1]]
+        assert result.exact_duplicates == 2
+        assert result.near_duplicates == 0
+
+    def test_near_duplicates(self, deduplicator, paragraphs):
+        """A chunk with one word changed maps to its original."""
+        edited = paragraphs[2].replace("word30", "term30")
+        chunks = paragraphs + [edited]
+        result = deduplicator.execute(DeduplicatorInput(chunks=chunks))
+
+        assert result.success is True
+        assert len(result.chunks) == len(paragraphs)
+        assert result.near_duplicates == 1
+        assert result.duplicate_of[-1] == 2
+
+    def test_distinct_chunks_are_kept(self, deduplicator, paragraphs):
+        """Different paragraphs are never merged."""
+        result = deduplicator.execute(DeduplicatorInput(chunks=paragraphs))
+
+        assert result.chunks == paragraphs
+        assert result.source_indices == list(range(len(paragraphs)))
+
+    def test_mapping_back_to_input(self, deduplicator, paragraphs):
+        """Every input chunk maps to a unique chunk with the same text."""
+        chunks = [paragraphs[3], paragraphs[0], paragraphs[3], paragraphs[0], paragraphs[1]]
+        result = deduplicator.execute(DeduplicatorInput(chunks=chunks))
+
+        assert result.source_indices == [0, 1, 4]
+        assert result.duplicate_of == [0, 1, 0, 1, 2]
+        for i, unique in enumerate(result.duplicate_of):
+            assert result.chunks[unique] == chunks[i]
+
+    def test_result_shares_input_text(self, deduplicator, paragraphs):
+        """Unique chunks are a view over the input store."""
+        store = ChunkStore.from_chunks(paragraphs + paragraphs)
+        result = deduplicator.execute(DeduplicatorInput(chunks=store))
+
+        assert result.chunks._source is store._source
+        assert result.chunks == paragraphs
+
+    def test_strip_repeated_lines(self, deduplicator, paragraphs):
+        """Page headers and numbered footers are removed from every chunk."""
+        chunks = [
+            f"Journal of Examples, Vol. 3\n{text}\nPage {page} of 9"
+            for page, text in enumerate(paragraphs, start=1)
+        ]
+        result = deduplicator.execute(DeduplicatorInput(chunks=chunks, strip_repeated_lines=True))
+
+        assert result.success is True
+        assert result.chunks == paragraphs
+        assert result.lines_stripped == 2 * len(paragraphs)
+
+    def test_short_chunks(self, deduplicator):
+        """Chunks with fewer words than a shingle are handled."""
+        result = deduplicator.execute(DeduplicatorInput(chunks=["one", "", "two words", "one"]))
+
+        assert result.success is True
+        assert result.chunks == ["one", "", "two words"]
+
+    def test_empty_chunks(self, deduplicator):
+        """Empty input is rejected."""
+        result = deduplicator.execute(DeduplicatorInput(chunks=[]))
+
+        assert result.success is False
+        assert "empty" in result.error_message.lower()
+
+
+class TestSimHash:
+
+    def test_similar_texts_are_close(self, paragraphs):
+        edited = paragraphs[0].replace("word5", "term5")
+        assert hamming_distance(simhash(paragraphs[0]), simhash(edited)) <= 6
+        assert hamming_distance(simhash(paragraphs[0]), simhash(paragraphs[1])) > 6
+
+    def test_index_query(self):
+        index = SimHashIndex(max_distance=3)
+        first = index.add(0b1011)
+        assert index.query(0b1011 ^ (1 << 40) ^ (1 << 2)) == first
+        assert index.query(0b1011 ^ 0b1111 << 20) == -1
@@ -2,6 +2,11 @@ import pytest
 from src.agent.tools.embedder import Embedder
 from src.logging_config import get_logger
 
+@pytest.fixture(autouse=True)
+def isolated_embedding_cache(config, tmp_path):
+    """Keep the embedding cache of each test in its own folder."""
+    config.embedding_cache_path = tmp_path / "embedding_cache"
+
 @pytest.fixture
 def embedder(config):
     """Creates an embedder instance"""
@@ -2,6 +2,7 @@
 Test embedding execution
 """
 import pytest
+import numpy as np
 from src.agent.tools.embedder import EmbedderInput, EmbedderOutput
 
 class TestEmbeddingExecution:
@@ -29,7 +30,7 @@ class TestEmbeddingExecution:
 
           for embedding in output.embeddings:
               for value in embedding:
-                  assert isinstance(value, (int, float))
+                  assert isinstance(value, (int, float, np.floating))
 
     def test_single_chunk(self, embedder, sample_single_chunk):
         """execute() works with single chunk."""
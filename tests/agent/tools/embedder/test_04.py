@@ -0,0 +1,47 @@
+"""
+Test batched, length-sorted encoding.
+"""
+import numpy as np
+import pytest
+from src.agent.tools.embedder.batching import encode_in_batches
+
+
+class FakeModel:
+    """Encodes each text as [len(text), index of call]."""
+    def __init__(self):
+        self.batches = []
+
+    def encode(self, texts, batch_size=32, convert_to_numpy=True):
+        self.batches.append(list(texts))
+        return np.array([[len(t), len(self.batches)] for t in texts], dtype=np.float64)
+
+
+class TestEncodeInBatches:
+
+    def test_restores_order(self):
+        """Rows come back in the original chunk order."""
+        texts = ["a", "ccc", "bb", "dddd", ""]
+        embeddings = encode_in_batches(FakeModel(), texts, batch_size=2)
+        assert embeddings[:, 0].tolist() == [1, 3, 2, 4, 0]
+
+    def test_batches_by_length(self):
+        """Each batch holds texts of similar length."""
+        model = FakeModel()
+        encode_in_batches(model, ["a", "ccc", "bb", "dddd"], batch_size=2)
+        assert model.batches == [["dddd", "ccc"], ["bb", "a"]]
+
+    def test_float32_contiguous(self):
+        """Output is a contiguous float32 matrix."""
+        embeddings = encode_in_batches(FakeModel(), ["x", "yy", "zzz"], batch_size=2)
+        assert embeddings.dtype == np.float32
+        assert embeddings.flags["C_CONTIGUOUS"]
+        assert embeddings.shape == (3, 2)
+
+    def test_empty(self):
+        """Empty input returns an empty matrix."""
+        assert encode_in_batches(FakeModel(), []).shape[0] == 0
+
+    def test_invalid_batch_size(self):
+        """Non-positive batch size raises ValueError."""
+        with pytest.raises(ValueError):
+            encode_in_batches(FakeModel(), ["x"], batch_size=0)
@@ -0,0 +1,96 @@
+"""
+Test the float32 matrix passed from the Embedder to the Retriever.
+"""
+import json
+import numpy as np
+import pytest
+from src.agent.tools.embedder import EmbedderInput, EmbedderOutput
+from src.agent.tools.retriever import RetrieverInput
+from src.agent.tools.quantization import QuantizedEmbeddings
+from src.agent.tools.semantic_index import SemanticIndex
+
+
+class FakeModel:
+    """Encodes each text as [len(text), 1, 0]."""
+    def encode(self, texts, batch_size=32, convert_to_numpy=True):
+        return np.array([[len(t), 1, 0] for t in texts], dtype=np.float32)
+
+
+@pytest.fixture
+def fake_embedder(embedder, monkeypatch):
+    monkeypatch.setattr(embedder, "_load_model", lambda: FakeModel())
+    return embedder
+
+
+class TestEmbeddingMatrix:
+
+    def test_output_is_float32_matrix(self, fake_embedder, sample_chunks):
+        """Embeddings come back as one contiguous float32 matrix."""
+        output = fake_embedder.execute(EmbedderInput(chunks=sample_chunks))
+
+        assert output.success
+        assert isinstance(output.embeddings, np.ndarray)
+        assert output.embeddings.dtype == np.float32
+        assert output.embeddings.flags.c_contiguous
+        assert output.embeddings.shape == (3, 3)
+        assert output.embedding_dim == 3
+        assert output.embeddings[:, 0].tolist() == [len(chunk) for chunk in sample_chunks]
+
+    def test_retriever_input_shares_memory(self, fake_embedder, sample_chunks):
+        """Handing the embeddings to the Retriever copies nothing."""
+        output = fake_embedder.execute(EmbedderInput(chunks=sample_chunks))
+        retriever_input = RetrieverInput(query="q", chunks=sample_chunks, embeddings=output.embeddings)
+
+        assert retriever_input.embeddings is output.embeddings
+        assert retriever_input.validate_dimensions()
+        assert retriever_input.validate_consistency()
+
+    def test_index_built_with_embeddings(self, fake_embedder, sample_chunks):
+        """The Embedder builds the SemanticIndex once; the Retriever input keeps it as it is."""
+        output = fake_embedder.execute(EmbedderInput(chunks=sample_chunks))
+        retriever_input = RetrieverInput(query="q", chunks=sample_chunks, embeddings=output.embeddings,
+                                         index=output.index)
+
+        assert isinstance(output.index, SemanticIndex)
+        assert len(output.index) == len(sample_chunks)
+        assert retriever_input.index is output.index
+        assert "index" not in json.loads(output.model_dump_json())
+
+    def test_lists_are_converted(self):
+        """Nested lists and other dtypes are converted to float32."""
+        from_lists = RetrieverInput(query="q", chunks=["a", "b"], embeddings=[[1, 2], [3, 4]])
+        from_float64 = RetrieverInput(query="q", chunks=["a", "b"], embeddings=np.eye(2))
+
+        assert from_lists.embeddings.dtype == np.float32
+        assert from_float64.embeddings.dtype == np.float32
+        assert from_float64.embeddings.tolist() == [[1.0, 0.0], [0.0, 1.0]]
+
+    @pytest.mark.parametrize("embeddings", [[[1.0], [2.0, 3.0]], [1.0, 2.0], np.zeros((2, 2, 2)), "text"])
+    def test_rejects_non_matrices(self, embeddings):
+        with pytest.raises(Exception):
+            RetrieverInput(query="q", chunks=["a", "b"], embeddings=embeddings)
+
+    def test_lists_only_in_json(self, fake_embedder, sample_chunks):
+        """Only the JSON dump turns the matrix into lists."""
+        output = fake_embedder.execute(EmbedderInput(chunks=sample_chunks))
+
+        assert isinstance(output.model_dump()["embeddings"], np.ndarray)
+        data = json.loads(output.model_dump_json())
+        assert data["embeddings"] == output.embeddings.tolist()
+        assert np.array_equal(EmbedderOutput.model_validate_json(output.model_dump_json()).embeddings,
+                              output.embeddings)
+
+    def test_failure_has_empty_matrix(self, fake_embedder):
+        output = fake_embedder.execute(EmbedderInput(chunks=[]))
+
+        assert not output.success
+        assert output.embeddings.shape == (0, 0)
+
+    def test_quantized_output(self, fake_embedder, sample_chunks):
+        """With a lower precision configured, the matrix is returned quantized."""
+        fake_embedder.quantization = "int8"
+        output = fake_embedder.execute(EmbedderInput(chunks=sample_chunks))
+
+        assert isinstance(output.embeddings, QuantizedEmbeddings)
+        assert output.embeddings.quantization == "int8"
+        assert output.embedding_dim == 3
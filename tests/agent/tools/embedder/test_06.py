@@ -0,0 +1,128 @@
+"""
+Test the persistent embedding cache.
+"""
+import numpy as np
+import pytest
+from src.agent.tools.embedder import EmbedderInput
+from src.agent.tools.embedder import embedding_cache as cache_module
+from src.agent.tools.embedder.embedding_cache import EmbeddingCache, encode_cached
+
+
+class CountingModel:
+    """Encodes each text as [len(text), number of texts encoded so far] and counts encoded texts."""
+    def __init__(self):
+        self.encoded = []
+
+    def encode(self, texts, batch_size=32, convert_to_numpy=True):
+        self.encoded.extend(texts)
+        return np.array([[len(t), len(self.encoded)] for t in texts], dtype=np.float32)
+
+
+def hashes(texts):
+    return [EmbeddingCache.chunk_hash(text) for text in texts]
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = EmbeddingCache(tmp_path / "embedding_cache")
+    yield cache
+    cache.close()
+
+
+class TestEmbeddingCache:
+
+    def test_round_trip(self, cache):
+        vectors = np.arange(6, dtype=np.float32).reshape(3, 2)
+        cache.put("model", hashes(["a", "b", "c"]), vectors)
+
+        found_vectors, found = cache.get("model", hashes(["c", "x", "a"]))
+
+        assert found.tolist() == [True, False, True]
+        assert found_vectors[[0, 2]].tolist() == [[4, 5], [0, 1]]
+        assert cache.stats()["entries"] == 3
+
+    def test_models_are_separate(self, cache):
+        """The same chunk embedded by another model or revision is a miss."""
+        cache.put(EmbeddingCache.model_key("model", "v1"), hashes(["a"]), np.ones((1, 2)))
+
+        assert cache.get(EmbeddingCache.model_key("model", "v2"), hashes(["a"]))[0] is None
+        assert cache.get(EmbeddingCache.model_key("model", "v1"), hashes(["a"]))[1].all()
+
+    def test_shared_between_instances(self, cache, tmp_path):
+        """A second connection, as in another process, reads what the first wrote."""
+        cache.put("model", hashes(["a", "b"]), np.eye(2))
+        other = EmbeddingCache(tmp_path / "embedding_cache")
+
+        vectors, found = other.get("model", hashes(["b"]))
+        cache.put("model", hashes(["c"]), np.full((1, 2), 7))
+        later, later_found = other.get("model", hashes(["c"]))
+        other.close()
+
+        assert found.all() and vectors.tolist() == [[0, 1]]
+        assert later_found.all() and later.tolist() == [[7, 7]]
+
+    def test_dimension_mismatch(self, cache):
+        cache.put("model", hashes(["a"]), np.ones((1, 2)))
+        with pytest.raises(ValueError):
+            cache.put("model", hashes(["b"]), np.ones((1, 3)))
+
+    def test_lru_eviction(self, tmp_path):
+        """Over max_bytes, the least recently used vectors are dropped."""
+        cache = EmbeddingCache(tmp_path / "small", max_bytes=2 * 2 * 4) # Two 2-d vectors
+        cache.put("model", hashes(["a"]), np.ones((1, 2)))
+        cache.put("model", hashes(["b"]), np.ones((1, 2)))
+        cache.get("model", hashes(["a"])) # b is now least recent
+        cache.put("model", hashes(["c"]), np.ones((1, 2)))
+
+        found = cache.get("model", hashes(["a", "b", "c"]))[1]
+        cache.close()
+        assert found.tolist() == [True, False, True]
+
+    def test_compaction(self, tmp_path, monkeypatch):
+        """A mostly evicted file is rewritten, keeping the live vectors."""
+        monkeypatch.setattr(cache_module, "COMPACT_MIN_BYTES", 0)
+        cache = EmbeddingCache(tmp_path / "compact", max_bytes=2 * 2 * 4)
+        for i in range(10):
+            cache.put("model", hashes([str(i)]), np.full((1, 2), i))
+
+        vectors, found = cache.get("model", hashes(["8", "9"]))
+        stats = cache.stats()
+        cache.close()
+
+        assert found.all() and vectors[:, 0].tolist() == [8, 9]
+        assert stats["entries"] == 2
+        assert stats["file_bytes"] <= 4 * 2 * 4
+        assert len(list((tmp_path / "compact").glob("*.f32"))) == 1
+
+
+class TestEncodeCached:
+
+    def test_encodes_only_misses(self, cache):
+        """Cached chunks are spliced back in order; only new ones are encoded."""
+        model = CountingModel()
+        first = encode_cached(lambda: model, ["aa", "b"], cache, "model")
+        second = encode_cached(lambda: model, ["ccc", "aa", "b", "dddd"], cache, "model")
+
+        assert model.encoded == ["aa", "b", "dddd", "ccc"]
+        assert second[:, 0].tolist() == [3, 2, 1, 4]
+        assert np.array_equal(second[1:3], first)
+
+    def test_full_hit_does_not_load_model(self, cache):
+        encode_cached(CountingModel, ["a"], cache, "model")
+
+        def fail():
+            raise AssertionError("model loaded")
+        assert encode_cached(fail, ["a"], cache, "model").tolist() == [[1, 1]]
+
+    def test_embedder_uses_cache(self, embedder, monkeypatch, sample_chunks):
+        """A second run over the same chunks encodes nothing."""
+        model = CountingModel()
+        monkeypatch.setattr(embedder, "_load_model", lambda: model)
+
+        first = embedder.execute(EmbedderInput(chunks=sample_chunks))
+        second = embedder.execute(EmbedderInput(chunks=sample_chunks))
+
+        assert second.success
+        assert len(model.encoded) == len(sample_chunks)
+        assert np.array_equal(first.embeddings, second.embeddings)
+        assert embedder.cache.hits == len(sample_chunks)
@@ -0,0 +1,56 @@
+"""
+Test the multi-process embedding pool.
+"""
+import os
+import numpy as np
+import pytest
+from src.agent.tools.embedder.batching import encode_in_batches
+from src.agent.tools.embedder.pool import EmbeddingPool, split_cores
+
+
+class PidModel:
+    """Encodes each text as [len(text), pid of the worker, number of cores it may use]."""
+    def encode(self, texts, batch_size=32, convert_to_numpy=True):
+        cores = len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else 0
+        return np.array([[len(t), os.getpid(), cores] for t in texts], dtype=np.float32)
+
+
+def load_pid_model(model_name):
+    return PidModel()
+
+
+@pytest.fixture(scope="module")
+def pool():
+    pool = EmbeddingPool("pid-model", workers=2, loader=load_pid_model, cores=[0])
+    yield pool
+    pool.close(wait=True)
+
+
+class TestSplitCores:
+
+    def test_contiguous_groups(self):
+        assert split_cores(list(range(8)), 3) == [[0, 1, 2], [3, 4, 5], [6, 7]]
+
+    def test_more_workers_than_cores(self):
+        assert split_cores([0, 1], 3) == [[0], [1], [0]]
+
+
+class TestEmbeddingPool:
+
+    def test_encodes_in_order(self, pool):
+        """Batches spread over the workers come back in text order."""
+        texts = ["a" * n for n in range(1, 41)]
+        embeddings = encode_in_batches(pool, texts, batch_size=4)
+
+        assert embeddings.dtype == np.float32
+        assert embeddings[:, 0].tolist() == list(range(1, 41))
+        assert os.getpid() not in embeddings[:, 1]
+
+    @pytest.mark.skipif(not hasattr(os, "sched_getaffinity"), reason="No CPU affinity on this platform")
+    def test_workers_are_pinned(self, pool):
+        embeddings = pool.encode(["x"] * 16, batch_size=1)
+        assert set(embeddings[:, 2].tolist()) == {1}
+
+    def test_encode_single_text(self, pool):
+        """Like SentenceTransformer, a single text gives a single vector."""
+        assert pool.encode("abc").tolist()[0] == 3
@@ -5,6 +5,11 @@ import pytest
 from src.agent.tools.file_processor import FileProcessor
 from src.logging_config import get_logger
 
+@pytest.fixture(autouse=True)
+def isolated_text_cache(config, tmp_path):
+    """Keep the text cache of each test in its own folder."""
+    config.text_cache_path = tmp_path / "text_cache.sqlite3"
+
 @pytest.fixture
 def file_processor(config):
     """Provide a FileProcessor instance."""
@@ -33,3 +38,39 @@ def sample_txt_file(tmp_path):
     file_path = tmp_path / "sample.txt"
     file_path.write_text(content)
     return file_path
+
+
+def write_pdf(path, pages):
+    """Write a minimal PDF; each page is a string whose lines are drawn one below the other."""
+    objects = [b"<< /Type /Catalog /Pages 2 0 R >>", None,
+               b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    kids = []
+    for text in pages:
+        lines = " T* ".join(f"({line}) Tj" for line in text.split("\n"))
+        stream = f"BT /F1 12 Tf 14 TL 72 720 Td {lines} ET".encode("latin-1")
+        objects.append(b"<< /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream))
+        objects.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % (len(objects))
+        )
+        kids.append(f"{len(objects)} 0 R")
+    objects[1] = f"<< /Type /Pages /Kids [{' '.join(kids)}] /Count {len(kids)} >>".encode()
+
+    data = b"%PDF-1.4\n"
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(data))
+        data += b"%d 0 obj\n%s\nendobj\n" % (number, body)
+    xref = len(data)
+    data += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    data += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    data += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    path.write_bytes(data)
+    return path
+
+
+@pytest.fixture
+def sample_pdf_file(tmp_path):
+    """Create a 12-page PDF whose last pages are references."""
+    pages = [f"Page {i} content" for i in range(1, 10)] + ["References\n[1] Smith", "[2] Jones", "[3] Brown"]
+    return write_pdf(tmp_path / "sample.pdf", pages)
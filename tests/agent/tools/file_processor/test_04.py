@@ -1,5 +1,6 @@
 """Test execute() method."""
 import pytest
+from src.agent.tools.chunk_store import ChunkStore
 from src.agent.tools.file_processor import FileProcessorInput
 
 class TestExecute:
@@ -18,10 +19,10 @@ class TestExecute:
         assert output.filename == sample_txt_file.name
 
     def test_return_chunks(self, file_processor, sample_txt_file):
-        """execute() returns list of chunks."""
+        """execute() returns a ChunkStore of chunks."""
         inp = FileProcessorInput(file_path=str(sample_txt_file))
         output = file_processor.execute(inp)
-        assert isinstance(output.chunks, list)
+        assert isinstance(output.chunks, ChunkStore)
         assert len(output.chunks) > 0
 
     def test_missing_file(self, file_processor):
@@ -0,0 +1,40 @@
+"""Test the streaming extraction helpers."""
+from src.agent.tools.file_processor import FileProcessorInput
+from src.agent.tools.file_processor.streaming import stop_at_section
+
+
+class TestStopAtSection:
+
+    def test_stops_consuming_pages(self):
+        """Pages after the unwanted section are never requested."""
+        consumed = []
+        def pages():
+            for page in ["Intro text.\n", "More.\nReferences\n[1] A", "[2] B", "[3] C"]:
+                consumed.append(page)
+                yield page
+        text = "".join(stop_at_section(pages()))
+        assert text == "Intro text.\nMore.\n"
+        assert len(consumed) == 2
+
+    def test_heading_split_across_pages(self):
+        """A heading split between two pages is still found."""
+        text = "".join(stop_at_section(["Content.\nBiblio", "graphy\nItem 1"]))
+        assert text == "Content.\n"
+
+    def test_no_section(self):
+        """Text without unwanted sections passes through unchanged."""
+        pages = ["a" * 100, "b" * 100, "c"]
+        assert "".join(stop_at_section(pages)) == "".join(pages)
+
+
+class TestExecuteStreaming:
+
+    def test_same_chunks_as_full_read(self, file_processor, sample_txt_file):
+        """execute() chunks exactly what reading, cleaning and chunking produce."""
+        text = file_processor._clean_text(file_processor._read_file(str(sample_txt_file)))
+        expected = file_processor._chunk_text(text, 50, 10)
+        output = file_processor.execute(
+            FileProcessorInput(file_path=str(sample_txt_file), chunk_size=50, chunk_overlap=10)
+        )
+        assert output.chunks == expected
+        assert not any("Smith" in chunk for chunk in output.chunks)
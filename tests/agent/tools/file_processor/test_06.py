@@ -0,0 +1,47 @@
+"""Test parallel PDF extraction."""
+import pytest
+from src.agent.tools.file_processor import FileProcessorInput
+from src.agent.tools.file_processor.parallel import (
+    page_ranges, iter_pdf_pages_parallel, pdf_page_count
+)
+from src.agent.tools.file_processor.streaming import iter_pdf_pages
+
+
+class TestPageRanges:
+
+    def test_ranges_cover_all_pages(self):
+        """Ranges are consecutive and cover every page once."""
+        ranges = page_ranges(103, workers=4)
+        assert ranges[0][0] == 0
+        assert ranges[-1][1] == 103
+        assert all(a[1] == b[0] for a, b in zip(ranges, ranges[1:]))
+
+    def test_fewer_pages_than_shards(self):
+        """Small documents get one page per range."""
+        assert page_ranges(3, workers=4) == [(0, 1), (1, 2), (2, 3)]
+
+
+class TestParallelExtraction:
+
+    def test_same_pages_as_serial(self, sample_pdf_file):
+        """Parallel extraction returns the serial pages, in order."""
+        num_pages = pdf_page_count(sample_pdf_file)
+        assert num_pages == 12
+        parallel = list(iter_pdf_pages_parallel(sample_pdf_file, workers=2, num_pages=num_pages))
+        assert parallel == list(iter_pdf_pages(sample_pdf_file))
+
+    def test_execute_parallel_matches_serial(self, config, sample_pdf_file):
+        """execute() produces the same chunks with and without the process pool."""
+        from src.agent.tools.file_processor import FileProcessor
+        inp = FileProcessorInput(file_path=str(sample_pdf_file), chunk_size=40, chunk_overlap=5)
+        config.text_cache_enabled = False # Extract twice instead of reusing the serial text
+
+        config.pdf_extract_workers = 1
+        serial = FileProcessor(config).execute(inp)
+        config.pdf_extract_workers = 2
+        config.pdf_parallel_min_pages = 1
+        parallel = FileProcessor(config).execute(inp)
+
+        assert serial.success == True
+        assert parallel.chunks == serial.chunks
+        assert not any("Smith" in chunk for chunk in parallel.chunks)
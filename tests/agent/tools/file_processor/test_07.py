@@ -0,0 +1,51 @@
+"""Test the memory-mapped chunk store."""
+import pytest
+from src.agent.errors import FileProcessingError
+from src.agent.tools.file_processor import FileProcessorInput
+from src.agent.tools.file_processor.mmap_store import MappedChunkStore
+
+
+class TestMappedChunkStore:
+
+    def test_same_chunks_as_chunk_text(self, file_processor, sample_txt_file):
+        """Chunks equal cleaning and chunking the whole text."""
+        text = sample_txt_file.read_text()
+        expected = file_processor._chunk_text(file_processor._clean_text(text), 50, 10)
+        with MappedChunkStore(sample_txt_file, 50, 10) as store:
+            assert list(store) == expected
+            assert store[-1] == expected[-1]
+
+    def test_offsets_are_arrays(self, sample_txt_file):
+        """Chunks are stored as int64 offsets, not strings."""
+        with MappedChunkStore(sample_txt_file, 50, 10) as store:
+            assert store.starts.dtype == "int64"
+            assert len(store.starts) == len(store.ends) == len(store)
+            assert store.nbytes == 16 * len(store)
+
+    def test_multibyte_characters(self, tmp_path):
+        """Chunks never split a UTF-8 character and cover the text without gaps."""
+        path = tmp_path / "unicode.txt"
+        path.write_text("héllo wörld ünïcode " * 20, encoding="utf-8")
+        with MappedChunkStore(path, 7, 2) as store:
+            chunks = list(store)
+        assert chunks[0] == "héllo "
+        with MappedChunkStore(path, 7, 0) as store:
+            assert "".join(store) == path.read_text(encoding="utf-8").strip()
+
+    def test_empty_file(self, tmp_path):
+        """Empty or blank files raise FileProcessingError."""
+        for content in ["", "  \n\n "]:
+            path = tmp_path / "empty.txt"
+            path.write_text(content)
+            with pytest.raises(FileProcessingError):
+                MappedChunkStore(path, 10, 2)
+
+    def test_execute_uses_mmap(self, config, sample_txt_file):
+        """execute() gives the same chunks when large files are memory-mapped."""
+        from src.agent.tools.file_processor import FileProcessor
+        inp = FileProcessorInput(file_path=str(sample_txt_file), chunk_size=50, chunk_overlap=10)
+        streamed = FileProcessor(config).execute(inp)
+        config.txt_mmap_min_mb = 0
+        mapped = FileProcessor(config).execute(inp)
+        assert mapped.success == True
+        assert mapped.chunks == streamed.chunks
@@ -0,0 +1,93 @@
+"""Test token-aware chunking."""
+import re
+import pytest
+from src.agent.tools import model_registry
+from src.agent.tools.model_registry import get_model_registry, ModelRegistry
+from src.agent.tools.file_processor import FileProcessorInput
+from src.agent.tools.file_processor.token_chunker import TokenChunker, model_max_tokens, sentence_spans
+
+
+class WordTokenizer:
+    """Stand-in tokenizer with one token per word."""
+    def __call__(self, texts, add_special_tokens=True, return_offsets_mapping=False):
+        if isinstance(texts, str):
+            matches = list(re.finditer(r"\S+", texts))
+            encoded = {"input_ids": list(range(len(matches)))}
+            if return_offsets_mapping:
+                encoded["offset_mapping"] = [match.span() for match in matches]
+            return encoded
+        return {"input_ids": [self(text)["input_ids"] for text in texts]}
+
+
+@pytest.fixture
+def word_tokenizer():
+    """Serve WordTokenizer from the shared model registry."""
+    registry = get_model_registry()
+    registry.register_loader(ModelRegistry.TOKENIZER, lambda name: WordTokenizer())
+    yield
+    registry.evict(ModelRegistry.TOKENIZER, "all-MiniLM-L6-v2")
+    registry.register_loader(ModelRegistry.TOKENIZER, model_registry._load_tokenizer)
+
+
+class TestSentenceSpans:
+
+    def test_splits_on_sentence_ends(self):
+        """Sentences end at punctuation followed by whitespace."""
+        text = "First one. Second one!  Third?\n\nFourth"
+        assert [text[s:e] for s, e in sentence_spans(text)] == [
+            "First one.", "Second one!", "Third?", "Fourth"
+        ]
+
+    def test_blank_text(self):
+        """Whitespace-only text has no sentences."""
+        assert sentence_spans("  \n ") == []
+
+
+class TestTokenChunker:
+
+    def test_packs_whole_sentences(self):
+        """Chunks hold whole sentences without exceeding the token budget."""
+        text = "One two three. Four five. Six seven eight nine. Ten."
+        chunker = TokenChunker(WordTokenizer(), max_tokens=7) # Budget of 5 words
+        chunks = chunker.chunk(text).tolist()
+        assert chunks == ["One two three. Four five.", "Six seven eight nine. Ten."]
+
+    def test_splits_long_sentence(self):
+        """A sentence over the budget is split at token boundaries."""
+        text = "a b c d e f g h"
+        chunks = TokenChunker(WordTokenizer(), max_tokens=5).chunk(text).tolist()
+        assert chunks == ["a b c", "d e f", "g h"]
+
+    def test_no_chunk_over_budget(self):
+        """Every chunk fits the model's sequence length."""
+        text = " ".join(f"Sentence number {i} has some words." for i in range(50))
+        chunker = TokenChunker(WordTokenizer(), max_tokens=20)
+        counts = chunker.count_tokens(chunker.chunk(text).tolist())
+        assert counts.max() <= chunker.budget
+
+    def test_invalid_max_tokens(self):
+        """max_tokens must leave room for content."""
+        with pytest.raises(ValueError):
+            TokenChunker(WordTokenizer(), max_tokens=2)
+
+    def test_model_max_tokens(self):
+        """The tokenizer's model_max_length is used unless it declares no limit."""
+        tokenizer = WordTokenizer()
+        assert model_max_tokens(tokenizer, 256) == 256
+        tokenizer.model_max_length = 128
+        assert model_max_tokens(tokenizer, 256) == 128
+        tokenizer.model_max_length = int(1e30)
+        assert model_max_tokens(tokenizer, 256) == 256
+
+
+class TestExecuteTokens:
+
+    def test_token_strategy(self, config, file_processor, sample_txt_file, word_tokenizer):
+        """execute() chunks by tokens when requested."""
+        config.embedding_max_tokens = 12
+        inp = FileProcessorInput(file_path=str(sample_txt_file), chunk_strategy="tokens")
+        output = file_processor.execute(inp)
+        assert output.success == True
+        assert len(output.chunks) > 1
+        assert all(len(chunk.split()) <= 10 for chunk in output.chunks)
+        assert not any("Smith" in chunk for chunk in output.chunks)
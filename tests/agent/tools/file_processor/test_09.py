@@ -0,0 +1,68 @@
+"""Test the single-pass section scanner."""
+import pytest
+from src.agent.tools.file_processor import FileProcessorInput
+from src.agent.tools.file_processor.sections import (
+    UNWANTED_SECTIONS, SectionBoundary, SectionScanner
+)
+
+
+class TestSectionScanner:
+
+    def test_reports_all_boundaries(self):
+        """Every heading is reported with its name and offsets."""
+        text = "Body.\nAppendix A\nTables.\n  REFERENCES  \n[1] Smith\nIndex\nterms"
+        boundaries = UNWANTED_SECTIONS.scan(text)
+
+        assert [boundary.name for boundary in boundaries] == ["appendix", "references", "index"]
+        for boundary in boundaries:
+            assert text[boundary.start:boundary.end].strip().lower().startswith(boundary.name[:5])
+        assert boundaries[1] == SectionBoundary("references", text.index("REFERENCES"),
+                                                text.index("REFERENCES") + len("REFERENCES"))
+
+    def test_heading_must_be_alone_on_its_line(self):
+        """Words in running text are not headings."""
+        text = "We thank the references\nsee the index of terms\nreferences are listed below"
+        assert UNWANTED_SECTIONS.scan(text) == []
+
+    def test_heading_at_start_and_end(self):
+        """Headings on the first and last line are found."""
+        assert [b.start for b in UNWANTED_SECTIONS.scan("Index\nterms\nBibliography")] == [0, 12]
+
+    def test_bytes_and_str_agree(self):
+        """Byte offsets equal character offsets for ASCII text."""
+        text = "Intro\n\nAcknowledgements\nThanks\nWorks Cited\n[1]"
+        assert UNWANTED_SECTIONS.scan(text.encode()) == UNWANTED_SECTIONS.scan(text)
+
+    def test_split_and_remove(self):
+        """Callers can drop some sections and keep others."""
+        scanner = SectionScanner.for_names(["appendix", "references"])
+        text = "Body.\nAppendix A\nTables.\nReferences\n[1] Smith"
+
+        assert [name for name, _ in scanner.split(text)] == ["", "appendix", "references"]
+        assert scanner.remove(text, {"references"}) == "Body.\nAppendix A\nTables.\n"
+
+    def test_unknown_section_name(self):
+        with pytest.raises(ValueError):
+            SectionScanner.for_names(["references", "glossary"])
+
+
+class TestSectionStream:
+
+    def test_stream_matches_whole_text(self):
+        """Offsets found piece by piece equal those of the joined text."""
+        text = ("Some content here.\n" * 20 + "Appendix B\n" + "x" * 300 + "\nReferences\n[1] A") * 3
+        pieces = [text[i:i + 7] for i in range(0, len(text), 7)]
+        stream = UNWANTED_SECTIONS.stream()
+        found = [boundary for piece in pieces for boundary in stream.feed(piece)] + stream.close()
+
+        assert found == UNWANTED_SECTIONS.scan(text)
+
+    def test_configured_sections(self, file_processor, tmp_path):
+        """Only the configured sections cut the text."""
+        path = tmp_path / "doc.txt"
+        path.write_text("Body.\n\nAppendix A\nDetails.\n\nReferences\n[1] Smith\n")
+        file_processor.sections = SectionScanner.for_names(["references"])
+
+        result = file_processor.execute(FileProcessorInput(file_path=str(path), chunk_size=100, chunk_overlap=0))
+
+        assert result.chunks == ["Body.\n\nAppendix A\nDetails."]
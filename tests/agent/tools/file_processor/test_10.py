@@ -0,0 +1,69 @@
+"""Test the format reader registry."""
+import pytest
+from src.agent.tools.file_processor import FileProcessorInput
+from src.agent.tools.file_processor.readers import (
+    FormatReader, READERS, reader_for, register_reader, supported_extensions
+)
+
+
+class TestFormatReaders:
+
+    def test_registry(self):
+        """Readers are found by extension, case-insensitively."""
+        assert reader_for("notes.MD") is READERS[".md"]
+        assert reader_for("data.csv") is None
+        assert {".txt", ".pdf", ".md", ".html"} <= supported_extensions()
+
+    def test_markdown(self, file_processor, tmp_path):
+        """Markdown markup is removed and a "# References" heading cuts the text."""
+        path = tmp_path / "notes.md"
+        path.write_text(
+            "# Title\n\nSome **bold** text with a [link](http://x.org).\n\n"
+            "```\ncode()\n```\n\n## References\n[1] Smith\n"
+        )
+        result = file_processor.execute(FileProcessorInput(file_path=str(path), chunk_size=500, chunk_overlap=0))
+
+        assert result.success is True
+        assert result.chunks.tolist() == ["Title\n\nSome bold text with a link.\n\ncode()"]
+
+    def test_html(self, file_processor, tmp_path):
+        """Only visible text is kept, one block per line."""
+        path = tmp_path / "page.html"
+        path.write_text(
+            "<html><head><style>p {color: red}</style><script>var x = 1;</script></head>"
+            "<body><h1>Title</h1><p>First &amp; second.</p><h2>Bibliography</h2><p>[1]</p></body></html>"
+        )
+        result = file_processor.execute(FileProcessorInput(file_path=str(path), chunk_size=500, chunk_overlap=0))
+
+        assert result.success is True
+        assert result.chunks.tolist() == ["Title\n\nFirst & second."]
+
+    def test_custom_reader(self, file_processor, tmp_path):
+        """Registering a reader makes its format supported."""
+        class CsvReader(FormatReader):
+            extensions = (".csv",)
+
+            def iter_pages(self, file_path):
+                yield path.read_text().replace(",", " ")
+
+        path = tmp_path / "table.csv"
+        path.write_text("a,b,c\n")
+        register_reader(CsvReader())
+        try:
+            result = file_processor.execute(FileProcessorInput(file_path=str(path), chunk_size=50, chunk_overlap=0))
+        finally:
+            del READERS[".csv"]
+        assert result.chunks == ["a b c"]
+
+    def test_unsupported_format(self, file_processor, tmp_path):
+        path = tmp_path / "table.csv"
+        path.write_text("a,b,c\n")
+        result = file_processor.execute(FileProcessorInput(file_path=str(path)))
+
+        assert result.success is False
+        assert ".txt" in result.error_message
+
+    def test_docx_without_python_docx(self, tmp_path):
+        """.docx is only supported when python-docx is installed."""
+        reader = READERS[".docx"]
+        assert (".docx" in supported_extensions()) == reader.available
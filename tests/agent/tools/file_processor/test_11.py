@@ -0,0 +1,55 @@
+"""Test the extracted text cache."""
+from src.agent.tools.file_processor import FileProcessor, FileProcessorInput
+from src.agent.tools.file_processor.text_cache import TextCache
+
+
+class TestTextCache:
+
+    def test_round_trip(self, tmp_path):
+        """Text comes back unchanged, keyed by content hash and extractor."""
+        cache = TextCache(tmp_path / "cache.sqlite3")
+        cache.put("abc", ".pdf", "Extracted text é")
+
+        assert cache.get("abc", ".pdf") == "Extracted text é"
+        assert cache.get("abc", ".docx") is None
+        assert cache.get("def", ".pdf") is None
+        assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 2
+
+    def test_lru_eviction(self, tmp_path):
+        """The least recently used texts are evicted past max_bytes."""
+        cache = TextCache(tmp_path / "cache.sqlite3")
+        cache.put("a", "x", "a" * 10_000)
+        entry_size = cache.stats()["total_bytes"]
+        cache.max_bytes = 2 * entry_size
+
+        cache.put("b", "x", "b" * 10_000)
+        cache.get("a", "x") # a is now more recent than b
+        cache.put("c", "x", "c" * 10_000)
+
+        assert cache.get("b", "x") is None
+        assert cache.get("a", "x") is not None
+        assert cache.get("c", "x") is not None
+
+    def test_persists_across_instances(self, tmp_path):
+        TextCache(tmp_path / "cache.sqlite3").put("a", "x", "text")
+        assert TextCache(tmp_path / "cache.sqlite3").get("a", "x") == "text"
+
+    def test_pdf_extracted_once(self, config, sample_pdf_file, monkeypatch):
+        """A second FileProcessor reuses the text instead of reading the PDF."""
+        config.pdf_extract_workers = 1
+        inp = FileProcessorInput(file_path=str(sample_pdf_file), chunk_size=40, chunk_overlap=5)
+        FileProcessor(config).execute(inp)
+
+        processor = FileProcessor(config)
+        def fail(path):
+            raise AssertionError("PDF read again")
+        monkeypatch.setattr(processor, "_iter_pages", fail)
+        inp = FileProcessorInput(file_path=str(sample_pdf_file), chunk_size=25, chunk_overlap=0)
+        second = processor.execute(inp)
+
+        config.text_cache_enabled = False
+        expected = FileProcessor(config).execute(inp)
+
+        assert second.success is True
+        assert second.chunks == expected.chunks
+        assert processor.text_cache.stats()["hits"] == 1
@@ -0,0 +1,148 @@
+"""
+Test cross-request micro-batching.
+"""
+import threading
+import numpy as np
+import pytest
+from src.config import Config
+from src.agent.tools.micro_batcher import MicroBatcher, BatchedModel, shared_model, micro_batch_stats
+from src.agent.tools.model_registry import ModelRegistry, get_model_registry
+
+
+class RecordingRun:
+    """Doubles every item and records the size of every batch."""
+    def __init__(self):
+        self.sizes = []
+
+    def __call__(self, items):
+        self.sizes.append(len(items))
+        return [item * 2 for item in items]
+
+
+class FakeSentenceTransformer:
+    def __init__(self):
+        self.batch_sizes = []
+
+    def encode(self, texts, batch_size=32, convert_to_numpy=True):
+        self.batch_sizes.append(len(texts))
+        return np.array([[len(t), 1.0] for t in texts], dtype=np.float32)
+
+
+@pytest.fixture
+def run():
+    return RecordingRun()
+
+
+def submit_concurrently(batcher, requests):
+    results = [None] * len(requests)
+    barrier = threading.Barrier(len(requests))
+
+    def call(i):
+        barrier.wait()
+        results[i] = batcher(requests[i])
+    threads = [threading.Thread(target=call, args=(i,)) for i in range(len(requests))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+class TestMicroBatcher:
+
+    def test_merges_concurrent_requests(self, run):
+        """Single-item requests arriving together share forward passes, and get their own results."""
+        batcher = MicroBatcher(run, max_batch_size=64, max_wait_ms=200)
+        results = submit_concurrently(batcher, [[i] for i in range(16)])
+        batcher.close()
+
+        assert results == [[i * 2] for i in range(16)]
+        assert sum(run.sizes) == 16
+        assert len(run.sizes) < 16
+
+    def test_max_batch_size(self, run):
+        """Batches never exceed max_batch_size, except a single larger request."""
+        batcher = MicroBatcher(run, max_batch_size=4, max_wait_ms=50)
+        results = submit_concurrently(batcher, [[1, 2, 3]] * 5 + [list(range(10))])
+        batcher.close()
+
+        assert results[-1] == [i * 2 for i in range(10)]
+        assert sorted(run.sizes) == [3, 3, 3, 3, 3, 10]
+
+    def test_errors_reach_every_caller(self):
+        def fail(items):
+            raise RuntimeError("model crashed")
+        batcher = MicroBatcher(fail, max_wait_ms=1)
+
+        with pytest.raises(RuntimeError, match="model crashed"):
+            batcher([1])
+        batcher.close()
+
+    def test_stats(self, run):
+        batcher = MicroBatcher(run, max_batch_size=8, max_wait_ms=1)
+        batcher([1])
+        batcher([1, 2, 3])
+        stats = batcher.stats()
+        batcher.close()
+
+        assert stats["requests"] == 2
+        assert stats["batches"] == 2
+        assert stats["batch_sizes"] == {1: 1, 4: 1}
+        assert stats["mean_batch_size"] == 2
+        assert stats["queue_depth"] == 0 and stats["max_queue_depth"] >= 1
+
+    def test_close_drains_queue(self, run):
+        batcher = MicroBatcher(run, max_wait_ms=10_000)
+        future = batcher.submit([5])
+        batcher.close()
+
+        assert future.result(timeout=1) == [10]
+
+
+class TestSharedModel:
+
+    @pytest.fixture
+    def loaded(self):
+        return FakeSentenceTransformer()
+
+    @pytest.fixture
+    def fake_model(self, monkeypatch, loaded):
+        registry = get_model_registry()
+        monkeypatch.setitem(registry._loaders, ModelRegistry.SENTENCE_TRANSFORMER, lambda name: loaded)
+        yield "fake-batched-model"
+        registry.evict(ModelRegistry.SENTENCE_TRANSFORMER, "fake-batched-model")
+
+    def test_batched_encode(self, fake_model):
+        """Shared models encode through the micro-batcher like a SentenceTransformer."""
+        model = shared_model(ModelRegistry.SENTENCE_TRANSFORMER, fake_model)
+
+        assert isinstance(model, BatchedModel)
+        assert model is shared_model(ModelRegistry.SENTENCE_TRANSFORMER, fake_model)
+        assert model.encode(["ab", "c"]).tolist() == [[2, 1], [1, 1]]
+        assert model.encode("abc").tolist() == [3, 1]
+        assert micro_batch_stats()[model.batcher.name]["requests"] == 2
+
+    def test_disabled(self, fake_model, monkeypatch):
+        monkeypatch.setattr(Config, "micro_batch_enabled", False)
+        model = shared_model(ModelRegistry.SENTENCE_TRANSFORMER, fake_model)
+
+        assert isinstance(model, FakeSentenceTransformer)
+
+    def test_large_call_split(self, fake_model, loaded):
+        """A call with more items than max_batch_size never runs as one forward pass."""
+        model = shared_model(ModelRegistry.SENTENCE_TRANSFORMER, fake_model)
+        texts = ["x" * (i % 7) for i in range(3 * model.max_batch_size + 5)]
+
+        embeddings = model.encode(texts, batch_size=len(texts), show_progress_bar=False)
+
+        assert embeddings[:, 0].tolist() == [len(text) for text in texts]
+        assert max(loaded.batch_sizes) <= model.max_batch_size
+
+    @pytest.mark.parametrize("kwargs", [{"normalize_embeddings": True}, {"convert_to_tensor": True}])
+    def test_unsupported_kwargs(self, fake_model, kwargs):
+        """Options that would change other callers' results are rejected, not dropped."""
+        model = shared_model(ModelRegistry.SENTENCE_TRANSFORMER, fake_model)
+
+        with pytest.raises(TypeError):
+            model.encode(["text"], **kwargs)
+        assert model.encode(["text"], convert_to_tensor=False, convert_to_numpy=True).shape == (1, 2)
@@ -0,0 +1,30 @@
+"""
+Shared fixtures for ModelRegistry tests.
+"""
+import pytest
+from src.agent.tools.model_registry import ModelRegistry
+
+
+class FakeModel:
+    """Stand-in for a loaded model."""
+    def __init__(self, name: str):
+        self.name = name
+
+
+@pytest.fixture
+def load_calls():
+    """Records every model name passed to the fake loader."""
+    return []
+
+
+@pytest.fixture
+def registry(load_calls):
+    """Provide a ModelRegistry with a fake model loader."""
+    registry = ModelRegistry(max_models=2)
+
+    def loader(model_name):
+        load_calls.append(model_name)
+        return FakeModel(model_name)
+
+    registry.register_loader("fake", loader)
+    return registry
@@ -0,0 +1,73 @@
+"""Test shared model loading and eviction."""
+import json
+import threading
+import pytest
+from src.agent.tools.model_registry import ModelLoadError, _sentence_transformer_max_length
+
+
+class TestModelRegistry:
+
+    def test_loads_once(self, registry, load_calls):
+        """The same model is loaded once and shared."""
+        first = registry.get("fake", "model-a")
+        second = registry.get("fake", "model-a")
+        assert first is second
+        assert load_calls == ["model-a"]
+
+    def test_concurrent_loads_once(self, registry, load_calls):
+        """Concurrent requests for one model trigger a single load."""
+        models = []
+        threads = [
+            threading.Thread(target=lambda: models.append(registry.get("fake", "model-a")))
+            for _ in range(8)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert load_calls == ["model-a"]
+        assert all(model is models[0] for model in models)
+
+    def test_lru_eviction(self, registry):
+        """Least recently used model is evicted past max_models."""
+        registry.get("fake", "model-a")
+        registry.get("fake", "model-b")
+        registry.get("fake", "model-a") # a is now most recent
+        registry.get("fake", "model-c")
+        assert ("fake", "model-a") in registry
+        assert ("fake", "model-b") not in registry
+        assert len(registry) == 2
+
+    def test_idle_eviction(self, registry):
+        """Models unused for idle_seconds are evicted."""
+        registry.idle_seconds = 10
+        registry.get("fake", "model-a")
+        assert registry.evict_idle() == []
+        evicted = registry.evict_idle(now=float("inf"))
+        assert evicted == [("fake", "model-a")]
+        assert len(registry) == 0
+
+    def test_unknown_kind(self, registry):
+        """Unknown model kind raises ModelLoadError."""
+        with pytest.raises(ModelLoadError):
+            registry.get("unknown", "model-a")
+
+    def test_loader_failure(self, registry):
+        """Loader exceptions are wrapped in ModelLoadError."""
+        def failing_loader(model_name):
+            raise OSError("no such model")
+        registry.register_loader("broken", failing_loader)
+        with pytest.raises(ModelLoadError):
+            registry.get("broken", "model-a")
+
+
+class TestSentenceTransformerMaxLength:
+
+    def test_local_model(self, tmp_path):
+        """max_seq_length is read from a model folder's sentence_bert_config.json."""
+        (tmp_path / "sentence_bert_config.json").write_text(json.dumps({"max_seq_length": 128}))
+        assert _sentence_transformer_max_length(str(tmp_path)) == 128
+
+    def test_not_a_sentence_transformer(self, tmp_path, monkeypatch):
+        monkeypatch.setenv("HF_HUB_OFFLINE", "1")
+        assert _sentence_transformer_max_length(str(tmp_path / "missing")) is None
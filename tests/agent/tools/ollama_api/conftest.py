@@ -0,0 +1,98 @@
+"""
+Shared fixtures for OllamaClient tests.
+Runs a local HTTP server that mimics Ollama's /api/generate endpoint.
+"""
+import json
+import time
+import threading
+import pytest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from src.config import Config
+from src.agent.tools.ollama_api import OllamaClient
+from src.logging_config import get_logger
+
+
+class FakeOllamaHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1" # Keep-alive
+
+    def do_POST(self):
+        server = self.server
+        length = int(self.headers.get("Content-Length", 0))
+        payload = json.loads(self.rfile.read(length))
+
+        with server.lock:
+            server.requests.append(payload)
+            server.connections.add(self.client_address)
+            server.active += 1
+            server.max_active = max(server.max_active, server.active)
+            failing = server.fail_next > 0
+            if failing:
+                server.fail_next -= 1
+        try:
+            time.sleep(server.delay)
+            if self.path != "/api/generate":
+                self._send(404, {"error": "not found"})
+            elif failing:
+                self._send(500, {"error": "internal error"})
+            else:
+                self._send(200, {
+                    "model": payload["model"],
+                    "response": f"Echo: {payload['prompt']}",
+                    "done": True,
+                    "prompt_eval_count": len(payload["prompt"].split()),
+                    "eval_count": 3,
+                })
+        finally:
+            with server.lock:
+                server.active -= 1
+
+    def _send(self, status, body):
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def ollama_server():
+    """Start a stand-in Ollama server on a free local port."""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FakeOllamaHandler)
+    server.lock = threading.Lock()
+    server.requests = []
+    server.connections = set()
+    server.active = 0
+    server.max_active = 0
+    server.fail_next = 0
+    server.delay = 0.0
+    server.url = f"http://127.0.0.1:{server.server_address[1]}"
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def llm_config(ollama_server):
+    """Config pointing at the stand-in server with fast retries."""
+    return Config(
+        ollama_base_url=ollama_server.url,
+        ollama_timeout=2,
+        ollama_max_concurrency=2,
+        max_retries=2,
+        retry_delay=0.01,
+        llm_cache_enabled=False,
+    )
+
+
+@pytest.fixture
+def ollama_client(llm_config):
+    """Provide an OllamaClient connected to the stand-in server."""
+    client = OllamaClient(config=llm_config, logger=get_logger("test.ollama"))
+    yield client
+    client.close()
@@ -0,0 +1,20 @@
+"""
+Input validation test case.
+"""
+import pytest
+from src.agent.tools.ollama_api import LLMInput
+
+
+class TestInputValidation:
+
+    def test_input_defaults(self):
+        """Input only requires a prompt."""
+        inp = LLMInput(prompt="Summarize this")
+        assert inp.prompt == "Summarize this"
+        assert inp.model_name is None
+        assert inp.options == {}
+
+    def test_require_prompt(self):
+        """Input requires prompt parameter."""
+        with pytest.raises(Exception):
+            LLMInput()
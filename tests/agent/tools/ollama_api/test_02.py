@@ -0,0 +1,43 @@
+"""
+Test generation against the stand-in server.
+"""
+import asyncio
+from src.agent.tools.ollama_api import LLMInput, LLMOutput
+
+
+class TestGeneration:
+
+    def test_execute(self, ollama_client, llm_config):
+        """execute() returns the generated response."""
+        output = ollama_client.execute(LLMInput(prompt="hello there"))
+        assert isinstance(output, LLMOutput)
+        assert output.success == True
+        assert output.response == "Echo: hello there"
+        assert output.model_name == llm_config.model_name
+        assert output.prompt_tokens == 2
+        assert output.attempts == 1
+
+    def test_payload(self, ollama_client, ollama_server):
+        """Model, system prompt and options are sent to the server."""
+        ollama_client.execute(LLMInput(
+            prompt="hi", model_name="llama3:8b", system="Be brief", options={"temperature": 0}
+        ))
+        payload = ollama_server.requests[0]
+        assert payload["model"] == "llama3:8b"
+        assert payload["system"] == "Be brief"
+        assert payload["options"] == {"temperature": 0}
+        assert payload["stream"] == False
+
+    def test_connection_reuse(self, ollama_client, ollama_server):
+        """Sequential requests reuse one keep-alive connection."""
+        for i in range(5):
+            assert ollama_client.execute(LLMInput(prompt=f"prompt {i}")).success
+        assert len(ollama_server.connections) == 1
+
+    def test_concurrency_limit(self, ollama_client, ollama_server):
+        """No more than max_concurrency requests are in flight."""
+        ollama_server.delay = 0.05
+        inputs = [LLMInput(prompt=f"prompt {i}") for i in range(6)]
+        outputs = asyncio.run(ollama_client.agenerate_many(inputs))
+        assert [o.response for o in outputs] == [f"Echo: prompt {i}" for i in range(6)]
+        assert ollama_server.max_active <= 2
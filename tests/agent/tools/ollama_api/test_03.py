@@ -0,0 +1,52 @@
+"""
+Test retries and error handling.
+"""
+from src.config import Config
+from src.agent.tools.ollama_api import OllamaClient, LLMInput
+
+
+class TestErrorHandling:
+
+    def test_retry_then_succeed(self, ollama_client, ollama_server):
+        """A server error is retried."""
+        ollama_server.fail_next = 1
+        output = ollama_client.execute(LLMInput(prompt="hi"))
+        assert output.success == True
+        assert output.attempts == 2
+
+    def test_retries_exhausted(self, ollama_client, ollama_server):
+        """Failure is reported once max_retries is exhausted."""
+        ollama_server.fail_next = 10
+        output = ollama_client.execute(LLMInput(prompt="hi"))
+        assert output.success == False
+        assert "3 attempts" in output.error_message
+        assert len(ollama_server.requests) == 3
+
+    def test_timeout(self, ollama_server, llm_config):
+        """Slow responses fail with a timeout error."""
+        llm_config.ollama_timeout = 0.05
+        llm_config.max_retries = 0
+        ollama_server.delay = 0.3
+        with OllamaClient(config=llm_config) as client:
+            output = client.execute(LLMInput(prompt="hi"))
+        assert output.success == False
+        assert "did not respond" in output.error_message
+
+    def test_connection_refused(self):
+        """Unreachable server fails gracefully."""
+        config = Config(
+            ollama_base_url="http://127.0.0.1:9",
+            max_retries=1,
+            retry_delay=0.01,
+            llm_cache_enabled=False,
+        )
+        with OllamaClient(config=config) as client:
+            output = client.execute(LLMInput(prompt="hi"))
+        assert output.success == False
+        assert "Could not connect" in output.error_message
+
+    def test_empty_prompt(self, ollama_client, ollama_server):
+        """Empty prompt fails without calling the server."""
+        output = ollama_client.execute(LLMInput(prompt="   "))
+        assert output.success == False
+        assert len(ollama_server.requests) == 0
@@ -0,0 +1,76 @@
+"""
+Test the persistent response cache.
+"""
+import pytest
+from src.agent.tools.ollama_api import OllamaClient, LLMInput
+from src.agent.tools.ollama_api.response_cache import ResponseCache
+
+
+@pytest.fixture
+def cache(tmp_path):
+    """Provide an empty ResponseCache."""
+    cache = ResponseCache(tmp_path / "cache.sqlite3")
+    yield cache
+    cache.close()
+
+
+class TestResponseCache:
+
+    def test_miss_then_hit(self, cache):
+        """Stored responses are returned and counted."""
+        assert cache.get("model", "prompt") is None
+        cache.put("model", "prompt", "answer")
+        assert cache.get("model", "prompt") == "answer"
+        assert cache.stats()["hits"] == 1
+        assert cache.stats()["misses"] == 1
+
+    def test_key_includes_model_and_options(self, cache):
+        """Different model or options do not share entries."""
+        cache.put("model", "prompt", "answer", options={"temperature": 0})
+        assert cache.get("other-model", "prompt", options={"temperature": 0}) is None
+        assert cache.get("model", "prompt", options={"temperature": 1}) is None
+        assert cache.get("model", "prompt", options={"temperature": 0}) == "answer"
+
+    def test_persistent(self, tmp_path):
+        """Entries survive reopening the database."""
+        ResponseCache(tmp_path / "cache.sqlite3").put("model", "prompt", "answer")
+        assert ResponseCache(tmp_path / "cache.sqlite3").get("model", "prompt") == "answer"
+
+    def test_ttl(self, tmp_path):
+        """Expired entries are misses."""
+        cache = ResponseCache(tmp_path / "cache.sqlite3", ttl_seconds=1e-9)
+        cache.put("model", "prompt", "answer")
+        assert cache.get("model", "prompt") is None
+
+    def test_size_eviction(self, tmp_path):
+        """Least recently used entries are evicted past max_bytes."""
+        cache = ResponseCache(tmp_path / "cache.sqlite3", max_bytes=10)
+        cache.put("model", "a", "12345")
+        cache.put("model", "b", "12345")
+        cache.get("model", "a") # b is now least recently used
+        cache.put("model", "c", "12345")
+        assert cache.get("model", "a") == "12345"
+        assert cache.get("model", "b") is None
+        assert cache.stats()["total_bytes"] <= 10
+
+
+class TestClientCaching:
+
+    def test_second_call_cached(self, llm_config, ollama_server, cache):
+        """Identical prompts only reach the server once."""
+        with OllamaClient(config=llm_config, cache=cache) as client:
+            first = client.execute(LLMInput(prompt="hello"))
+            second = client.execute(LLMInput(prompt="hello"))
+        assert first.cached == False
+        assert second.cached == True
+        assert second.response == first.response
+        assert len(ollama_server.requests) == 1
+
+    def test_failures_not_cached(self, llm_config, ollama_server, cache):
+        """Failed generations are not stored."""
+        llm_config.max_retries = 0
+        ollama_server.fail_next = 1
+        with OllamaClient(config=llm_config, cache=cache) as client:
+            assert client.execute(LLMInput(prompt="hello")).success == False
+            assert client.execute(LLMInput(prompt="hello")).success == True
+        assert len(ollama_server.requests) == 2
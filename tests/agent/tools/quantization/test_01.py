@@ -0,0 +1,82 @@
+"""
+Test quantized storage and scoring of embeddings.
+"""
+import numpy as np
+import pytest
+from src.agent.tools import quantization
+from src.agent.tools.quantization import QuantizedEmbeddings, as_quantized
+from src.agent.tools.retriever import RetrieverInput
+from src.agent.tools.retriever.diversity_penalty import DiversityPenalty
+
+
+@pytest.fixture
+def embeddings():
+    rng = np.random.default_rng(0)
+    return rng.standard_normal((300, 32)).astype(np.float32)
+
+
+class TestQuantizedEmbeddings:
+
+    @pytest.mark.parametrize("precision, itemsize", [("float32", 4), ("float16", 2), ("int8", 1)])
+    def test_storage(self, embeddings, precision, itemsize):
+        matrix = QuantizedEmbeddings.quantize(embeddings, precision)
+
+        assert matrix.quantization == precision
+        assert matrix.values.itemsize == itemsize
+        assert matrix.shape == embeddings.shape
+        assert len(matrix) == len(embeddings)
+
+    def test_float32_is_not_copied(self, embeddings):
+        assert as_quantized(embeddings).values is embeddings
+
+    @pytest.mark.parametrize("precision, tolerance", [("float16", 1e-3), ("int8", 1e-2)])
+    def test_cosine_close_to_float32(self, embeddings, precision, tolerance, monkeypatch):
+        """Scores on the quantized rows, converted block by block, match float32."""
+        monkeypatch.setattr(quantization, "SCORE_BLOCK", 64)
+        query = embeddings[0] + 0.1
+        expected = QuantizedEmbeddings.quantize(embeddings).cosine(query)
+
+        found = QuantizedEmbeddings.quantize(embeddings, precision).cosine(query)
+
+        assert found.dtype == np.float32
+        assert np.abs(found - expected).max() < tolerance
+
+    def test_int8_rows_scaled(self, embeddings):
+        """Every int8 row uses the full range and dequantizes close to the original."""
+        matrix = QuantizedEmbeddings.quantize(embeddings, "int8")
+
+        assert (np.abs(matrix.values).max(axis=1) == 127).all()
+        assert np.allclose(matrix.dequantize(), embeddings, atol=matrix.scales.max())
+        assert np.allclose(matrix.row(5), matrix.dequantize()[5])
+
+    def test_zero_rows(self):
+        matrix = QuantizedEmbeddings.quantize(np.zeros((2, 4)), "int8")
+        assert matrix.cosine(np.ones(4)).tolist() == [0.0, 0.0]
+
+    def test_unknown_precision(self, embeddings):
+        with pytest.raises(ValueError):
+            QuantizedEmbeddings.quantize(embeddings, "int4")
+
+
+class TestQuantizedRetrieval:
+
+    def test_retriever_input_keeps_quantized(self, embeddings):
+        """Quantized embeddings pass through the tool contract and dump to JSON lists."""
+        matrix = QuantizedEmbeddings.quantize(embeddings[:2], "int8")
+        retriever_input = RetrieverInput(query="q", chunks=["a", "b"], embeddings=matrix)
+
+        assert retriever_input.embeddings is matrix
+        assert retriever_input.validate_dimensions() and retriever_input.validate_consistency()
+        assert np.allclose(retriever_input.model_dump(mode="json")["embeddings"], matrix.dequantize())
+
+    @pytest.mark.parametrize("precision", ["float16", "int8"])
+    def test_diversity_penalty(self, precision):
+        """Near-duplicates are detected on the quantized matrix as on float32."""
+        embeddings = np.array([[1.0, 0.0], [0.99, 0.05], [0.0, 1.0]], dtype=np.float32)
+        scores = np.array([0.9, 0.85, 0.5])
+        penalty = DiversityPenalty(diversity_threshold=0.9, penalty_strength=0.5)
+
+        expected = penalty.apply_penalty(scores, embeddings, top_k=3)
+        found = penalty.apply_penalty(scores, QuantizedEmbeddings.quantize(embeddings, precision), top_k=3)
+
+        assert found == expected == [0, 2, 1]
@@ -0,0 +1,44 @@
+import numpy as np
+import pytest
+from src.agent.tools.retriever import Retriever, HybridScores
+
+
+class FakeHybridRetriever:
+    """Scores chunks by the first component of their unit-norm embedding and records its arguments."""
+    def __init__(self):
+        self.calls = []
+
+    def retrieve(self, query, chunks, embeddings, bm25_weight=0.5, semantic_weight=0.5, rerank_top_n=20):
+        self.calls.append({"query": query, "embeddings": embeddings})
+        scores = embeddings.matrix.dequantize()[:, 0].astype(np.float64)
+        return HybridScores(
+            bm25_scores=scores,
+            semantic_scores=scores,
+            fused_scores=scores,
+            final_scores=scores,
+        )
+
+
+@pytest.fixture
+def hybrid_retriever():
+    return FakeHybridRetriever()
+
+
+@pytest.fixture
+def retriever(hybrid_retriever):
+    return Retriever(hybrid_retrieval=hybrid_retriever)
+
+
+@pytest.fixture
+def chunks():
+    return ["low", "high", "middle", "high copy"]
+
+
+@pytest.fixture
+def embeddings():
+    return np.array([
+        [0.1, 1.0, 0.0],
+        [0.9, 0.0, 1.0],
+        [0.5, 1.0, 1.0],
+        [0.8, 0.0, 1.0],
+    ], dtype=np.float32)
@@ -0,0 +1,74 @@
+"""
+Test the retrieval pipeline on a precomputed embedding matrix.
+"""
+import numpy as np
+import pytest
+from src.agent.tools.retriever import RetrieverInput, RetrieverOutput
+from src.agent.tools.retriever.diversity_penalty import DiversityPenalty
+from src.agent.tools.semantic_index import SemanticIndex
+
+
+class TestRetriever:
+
+    def test_ranks_and_diversifies(self, retriever, chunks, embeddings):
+        """Results are ranked by score, and near-duplicates are pushed down."""
+        output = retriever.execute(RetrieverInput(query="q", chunks=chunks, embeddings=embeddings, top_k=3))
+
+        assert output.success
+        assert output.results_count == 3
+        assert [result.chunk for result in output.results] == ["high", "middle", "high copy"]
+        assert output.results[0].chunk_index == 1
+        assert output.results[0].final_score == output.results[0].semantic_score
+
+    def test_builds_index_once(self, retriever, hybrid_retriever, chunks, embeddings, monkeypatch):
+        """Without an index, one is built from the matrix and shared by all stages."""
+        penalized = []
+        apply_penalty = retriever.diversity_penalty.apply_penalty
+
+        def recording_penalty(scores, embeddings, top_k):
+            penalized.append(embeddings)
+            return apply_penalty(scores, embeddings, top_k)
+
+        monkeypatch.setattr(retriever.diversity_penalty, "apply_penalty", recording_penalty)
+        retriever.execute(RetrieverInput(query="what is high", chunks=chunks, embeddings=embeddings))
+
+        call = hybrid_retriever.calls[0]
+        assert call["query"] == "what is high"
+        assert isinstance(call["embeddings"], SemanticIndex)
+        assert penalized == [call["embeddings"]]
+
+    def test_reuses_given_index(self, retriever, hybrid_retriever, chunks, embeddings, monkeypatch):
+        """An index from the Embedder is used as it is, never rebuilt."""
+        index = SemanticIndex(embeddings)
+        monkeypatch.setattr(SemanticIndex, "__init__", lambda self, embeddings: pytest.fail("index rebuilt"))
+
+        output = retriever.execute(RetrieverInput(query="q", chunks=chunks, embeddings=embeddings, index=index))
+
+        assert output.success
+        assert hybrid_retriever.calls[0]["embeddings"] is index
+
+    def test_index_count_mismatch(self, retriever, chunks, embeddings):
+        output = retriever.execute(RetrieverInput(query="q", chunks=chunks, embeddings=embeddings,
+                                                  index=SemanticIndex(embeddings[:2])))
+
+        assert not output.success
+        assert "index count" in output.error_message
+
+    def test_count_mismatch(self, retriever, chunks, embeddings):
+        """Mismatched chunks and embeddings fail without raising."""
+        output = retriever.execute(RetrieverInput(query="q", chunks=chunks[:2], embeddings=embeddings))
+
+        assert isinstance(output, RetrieverOutput)
+        assert not output.success
+        assert "must match" in output.error_message
+
+
+class TestDiversityPenalty:
+
+    def test_index_same_as_matrix(self, embeddings):
+        """Penalizing with the index's unit rows selects as the raw matrix does."""
+        scores = np.array([0.1, 0.9, 0.5, 0.8])
+        penalty = DiversityPenalty()
+
+        assert penalty.apply_penalty(scores, SemanticIndex(embeddings), 4) == penalty.apply_penalty(scores, embeddings, 4)
+        assert penalty.apply_penalty(scores, embeddings, 3) == [1, 2, 3]
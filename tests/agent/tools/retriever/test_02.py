@@ -0,0 +1,126 @@
+"""
+Test semantic scoring against precomputed row norms.
+"""
+import numpy as np
+import pytest
+from src.agent.tools.quantization import QuantizedEmbeddings
+from src.agent.tools.semantic_index import SemanticIndex, as_semantic_index, top_k_indices
+from src.agent.tools.retriever.semantic_search import SemanticSearcher
+from src.agent.tools.retriever.query_expander import QueryExpander
+
+
+class FakeEncoder:
+    """Encodes a text as the vector of its characters' counts of 'a', 'b' and 'c'."""
+    def encode(self, texts, **kwargs):
+        return np.array([[text.count(c) for c in "abc"] for text in texts], dtype=np.float32)
+
+
+@pytest.fixture
+def corpus():
+    rng = np.random.default_rng(0)
+    matrix = rng.standard_normal((500, 16)).astype(np.float32)
+    matrix[7] = 0 # A zero row scores 0
+    return matrix
+
+
+def reference_cosine(matrix, query):
+    return np.array([
+        np.dot(row, query) / (np.linalg.norm(row) * np.linalg.norm(query) + 1e-8) for row in matrix
+    ])
+
+
+class TestSemanticIndex:
+
+    def test_matches_per_chunk_cosine(self, corpus):
+        query = corpus[3] + 0.1
+        scores = SemanticIndex(corpus).scores(query)
+
+        np.testing.assert_allclose(scores, reference_cosine(corpus, query), atol=1e-5)
+        assert scores[7] == 0
+
+    def test_shares_rows(self, corpus):
+        """The index keeps the caller's rows, with one inverse norm per chunk, instead of a copy."""
+        index = SemanticIndex(corpus)
+
+        assert index.matrix.values is corpus
+        assert index.inverse_norms.shape == (len(corpus),)
+        np.testing.assert_allclose(np.linalg.norm(index.row(3)), 1, atol=1e-5)
+        assert not index.row(7).any()
+
+    def test_quantized_reused(self, corpus):
+        """QuantizedEmbeddings are indexed with the norms they already have."""
+        quantized = QuantizedEmbeddings.quantize(corpus, "float16")
+        assert SemanticIndex(quantized).matrix is quantized
+
+    def test_batch_of_queries(self, corpus):
+        queries = corpus[:4] * 3
+        index = SemanticIndex(corpus)
+
+        scores = index.scores(queries)
+        assert scores.shape == (4, len(corpus))
+        for query, row in zip(queries, scores):
+            np.testing.assert_allclose(row, index.scores(query), atol=1e-6)
+
+    @pytest.mark.parametrize("precision", ["float16", "int8"])
+    def test_quantized(self, corpus, precision):
+        index = SemanticIndex(QuantizedEmbeddings.quantize(corpus, precision))
+
+        assert index.matrix.quantization == precision
+        np.testing.assert_allclose(index.scores(corpus[5]), reference_cosine(corpus, corpus[5]), atol=0.01)
+
+    def test_top_k(self, corpus):
+        index = SemanticIndex(corpus)
+        indices, scores = index.top_k(corpus[11], 5)
+
+        expected = np.argsort(-reference_cosine(corpus, corpus[11]))[:5]
+        assert indices.tolist() == expected.tolist()
+        assert indices[0] == 11
+        assert np.all(np.diff(scores) <= 0)
+
+        batch_indices, _ = index.top_k(corpus[[11, 12]], 5)
+        assert batch_indices.shape == (2, 5)
+        assert batch_indices[0].tolist() == indices.tolist()
+
+    def test_top_k_bounds(self):
+        scores = np.array([0.2, 0.9, 0.5])
+
+        assert top_k_indices(scores, 10).tolist() == [1, 2, 0]
+        assert top_k_indices(scores, 0).tolist() == []
+
+    def test_index_is_reused(self, corpus):
+        index = SemanticIndex(corpus)
+        assert as_semantic_index(index) is index
+
+
+class TestSemanticScoring:
+
+    @pytest.fixture
+    def encoder(self, monkeypatch):
+        encoder = FakeEncoder()
+        monkeypatch.setattr(SemanticSearcher, "_load_model", lambda self: encoder)
+        monkeypatch.setattr(QueryExpander, "_load_model", lambda self: encoder)
+        return encoder
+
+    @pytest.fixture
+    def chunks(self):
+        return ["aaaa words here", "bbbb other words", "cccc last words", "aaab similar words"]
+
+    def test_score(self, encoder, chunks):
+        embeddings = encoder.encode(chunks)
+        scores = SemanticSearcher().score("aa", embeddings)
+
+        np.testing.assert_allclose(scores, (reference_cosine(embeddings, [2, 0, 0]) + 1) / 2, atol=1e-5)
+        assert np.argmax(scores) == 0
+
+    def test_score_batch(self, encoder, chunks):
+        index = SemanticIndex(encoder.encode(chunks))
+        searcher = SemanticSearcher()
+        scores = searcher.score_batch(["aa", "cc"], index)
+
+        assert scores.shape == (2, len(chunks))
+        np.testing.assert_allclose(scores[1], searcher.score("cc", index), atol=1e-6)
+
+    def test_expand_with_top_chunks(self, encoder, chunks):
+        expanded = QueryExpander().expand("aa", chunks, SemanticIndex(encoder.encode(chunks)), max_expansions=1)
+
+        assert expanded == "aa aaaa words"
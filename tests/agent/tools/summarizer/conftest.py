@@ -0,0 +1,37 @@
+"""
+Shared fixtures for MapReduceSummarizer tests.
+"""
+import asyncio
+import pytest
+from src.agent.tools.ollama_api import LLMOutput
+from src.agent.tools.summarizer import MapReduceSummarizer
+
+
+class FakeLLM:
+    """Returns a short summary per prompt and records concurrency."""
+    def __init__(self):
+        self.prompts = []
+        self.active = 0
+        self.max_active = 0
+        self.fail = False
+
+    async def agenerate(self, input_data):
+        self.prompts.append(input_data.prompt)
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        await asyncio.sleep(0.01)
+        self.active -= 1
+        if self.fail:
+            return LLMOutput(success=False, error_message="model not found")
+        return LLMOutput(success=True, response=f"summary {len(self.prompts)}")
+
+
+@pytest.fixture
+def fake_llm():
+    return FakeLLM()
+
+
+@pytest.fixture
+def summarizer(fake_llm):
+    """Provide a MapReduceSummarizer backed by the fake LLM."""
+    return MapReduceSummarizer(llm=fake_llm)
@@ -0,0 +1,24 @@
+"""Test grouping chunks under the token budget."""
+from src.agent.tools.summarizer.map_reduce import pack_groups, estimate_tokens
+
+
+class TestPackGroups:
+
+    def test_groups_respect_budget(self):
+        """Groups stay under the token budget."""
+        texts = ["a" * 400] * 10 # 100 tokens each
+        groups = pack_groups(texts, token_budget=250)
+        assert [len(group) for group in groups] == [2, 2, 2, 2, 2]
+        for group in groups:
+            assert sum(estimate_tokens(t) for t in group) <= 250
+
+    def test_keeps_order(self):
+        """Texts keep their document order across groups."""
+        texts = [f"chunk {i} " * 10 for i in range(7)]
+        groups = pack_groups(texts, token_budget=40)
+        assert [t for group in groups for t in group] == texts
+
+    def test_oversized_text_alone(self):
+        """A text larger than the budget gets its own group."""
+        groups = pack_groups(["a" * 40, "b" * 4000, "c" * 40], token_budget=100)
+        assert groups == [["a" * 40], ["b" * 4000], ["c" * 40]]
@@ -0,0 +1,42 @@
+"""Test execute() method."""
+from src.agent.tools.summarizer import SummarizerInput, SummarizerOutput
+
+
+class TestExecute:
+
+    def test_single_group(self, summarizer, fake_llm):
+        """A short document needs a single call."""
+        output = summarizer.execute(SummarizerInput(chunks=["short text"]))
+        assert isinstance(output, SummarizerOutput)
+        assert output.success == True
+        assert output.map_calls == 1
+        assert output.reduce_levels == 0
+        assert len(fake_llm.prompts) == 1
+
+    def test_map_reduce_tree(self, summarizer, fake_llm):
+        """Long documents are mapped then reduced into one summary."""
+        chunks = ["x" * 400] * 20 # 100 tokens each
+        output = summarizer.execute(SummarizerInput(chunks=chunks, token_budget=200))
+        assert output.success == True
+        assert output.map_calls == 10
+        assert output.reduce_levels >= 1
+        assert output.llm_calls == len(fake_llm.prompts)
+        assert output.summary.startswith("summary")
+
+    def test_bounded_parallelism(self, summarizer, fake_llm):
+        """No more than max_parallel calls run at once."""
+        chunks = ["x" * 400] * 12
+        summarizer.execute(SummarizerInput(chunks=chunks, token_budget=100, max_parallel=3))
+        assert fake_llm.max_active == 3
+
+    def test_llm_failure(self, summarizer, fake_llm):
+        """A failed call fails the whole summary gracefully."""
+        fake_llm.fail = True
+        output = summarizer.execute(SummarizerInput(chunks=["text"]))
+        assert output.success == False
+        assert "model not found" in output.error_message
+
+    def test_empty_chunks(self, summarizer):
+        """Empty input fails gracefully."""
+        output = summarizer.execute(SummarizerInput(chunks=["", "  "]))
+        assert output.success == False
@@ -0,0 +1,40 @@
+import sys
+import numpy as np
+import pytest
+from pathlib import Path
+
+SRC_DIR = Path(__file__).resolve().parent.parent.parent / "src"
+sys.path.insert(0, str(SRC_DIR)) # The scripts in src/ import each other as top-level modules
+
+
+class FakeEmbedder:
+    """SentenceTransformer stand-in encoding a text as [length, word count, seed], counting calls."""
+    def __init__(self, seed: float = 1.0):
+        self.seed = seed
+        self.calls = 0
+
+    def encode(self, texts, batch_size=32, convert_to_numpy=True, **kwargs):
+        single = isinstance(texts, str)
+        texts = [texts] if single else texts
+        self.calls += 1
+        vectors = np.array([[len(t), len(t.split()), self.seed] for t in texts], dtype=np.float32)
+        return vectors[0] if single else vectors
+
+
+@pytest.fixture
+def make_embedder():
+    return FakeEmbedder
+
+
+@pytest.fixture
+def embedder():
+    return FakeEmbedder()
+
+
+@pytest.fixture(autouse=True)
+def clear_processed_cache():
+    """Documents memoized by another test are not reused."""
+    import read_file
+    read_file._processed_cache.clear()
+    yield
+    read_file._processed_cache.clear()
@@ -0,0 +1,208 @@
+"""
+Tests for the pipelined multi-document processing of batch_pipeline.BatchPipeline.
+"""
+import time
+import random
+import threading
+import pytest
+from batch_pipeline import BatchPipeline, extract_document
+from src.agent.manifest import file_version
+from src.agent.tools.file_processor.text_cache import TextCache
+
+
+class FakeRetriever:
+    """rag.Retriever stand-in whose summary is the document's first chunk."""
+    def __init__(self, embedder, delays=None):
+        self.embedder = embedder
+        self.embedding_model = "fake-model"
+        self.embedding_cache = None
+        self.text_cache = None
+        self.chunking = "paragraphs"
+        self.dedup = False
+        self.delays = delays or {}
+
+    def document_name(self, file_path):
+        return file_path.name
+
+    def summarize_document(self, document, output_folder, query):
+        time.sleep(self.delays.get(document.filename, 0))
+        if "unsummarizable" in document.chunks[0]:
+            return None
+        return document.filename, document.chunks[0]
+
+
+class FailingEmbedder:
+    """Fails every batch containing the word 'poison'."""
+    def __init__(self, embedder):
+        self.embedder = embedder
+
+    def encode(self, texts, **kwargs):
+        if any("poison" in text for text in texts):
+            raise RuntimeError("poisoned batch")
+        return self.embedder.encode(texts, **kwargs)
+
+
+class BlockingEmbedder:
+    """Blocks every batch until released."""
+    def __init__(self, embedder):
+        self.embedder = embedder
+        self.released = threading.Event()
+
+    def encode(self, texts, **kwargs):
+        self.released.wait(timeout=30)
+        return self.embedder.encode(texts, **kwargs)
+
+
+def make_files(tmp_path, texts, suffix=".txt"):
+    paths = []
+    for i, text in enumerate(texts):
+        path = tmp_path / f"doc{i}{suffix}"
+        path.write_text(text, encoding="utf-8")
+        paths.append(path)
+    return paths
+
+
+def run(retriever, files, tmp_path, **kwargs):
+    completed = {}
+    lock = threading.Lock()
+
+    def on_complete(file_path, result, error=None, version=None):
+        with lock:
+            completed[file_path.name] = (result, error, version)
+
+    pipeline = BatchPipeline(retriever, tmp_path, "query", extract_workers=2, llm_workers=3,
+                             on_complete=on_complete, **kwargs)
+    return pipeline.run(files), completed
+
+
+class TestBatchPipeline:
+
+    def test_results_in_input_order(self, tmp_path, embedder):
+        """Results come back in input order, however long each summary takes."""
+        files = make_files(tmp_path, [f"Text of document {i}" for i in range(8)])
+        delays = {file.name: random.Random(i).uniform(0, 0.05) for i, file in enumerate(files)}
+
+        results, completed = run(FakeRetriever(embedder, delays), files, tmp_path)
+
+        assert results == [(f"doc{i}.txt", f"Text of document {i}") for i in range(8)]
+        assert all(error is None for _, error, _ in completed.values())
+
+    def test_failures_reach_on_complete(self, tmp_path, embedder):
+        """
+        Unreadable, empty and unsummarizable files are reported, with the
+        version of what was read, and left out of the results.
+        """
+        files = make_files(tmp_path, ["Readable text", "   ", "unsummarizable text"])
+        files.append(tmp_path / "missing.txt")
+
+        results, completed = run(FakeRetriever(embedder), files, tmp_path)
+
+        assert results == [("doc0.txt", "Readable text")]
+        assert completed["doc0.txt"] == (("doc0.txt", "Readable text"), None, file_version(files[0]))
+        assert completed["doc1.txt"] == (None, "No text extracted", file_version(files[1]))
+        assert completed["doc2.txt"] == (None, "Summarization failed", file_version(files[2]))
+        result, error, version = completed["missing.txt"]
+        assert result is None and "not found" in error
+        assert version is None
+
+    def test_embed_failure_fails_its_batch_only(self, tmp_path, embedder):
+        files = make_files(tmp_path, ["Fine text", "poison text", "Also fine"])
+
+        results, completed = run(FakeRetriever(FailingEmbedder(embedder)), files, tmp_path,
+                                 embed_batch_docs=1)
+
+        assert [filename for filename, _ in results] == ["doc0.txt", "doc2.txt"]
+        assert completed["doc1.txt"][:2] == (None, "poisoned batch")
+
+    def test_queue_size_bounds_documents_in_flight(self, tmp_path, embedder):
+        """While embedding is stuck, only queue_size more files are taken from the input."""
+        files = make_files(tmp_path, [f"Document {i}" for i in range(20)])
+        taken = []
+
+        def source():
+            for file in files:
+                taken.append(file)
+                yield file
+
+        blocking = BlockingEmbedder(embedder)
+        thread = threading.Thread(target=run, args=(FakeRetriever(blocking), source(), tmp_path),
+                                  kwargs={"queue_size": 2, "embed_batch_docs": 1})
+        thread.start()
+        time.sleep(1.0)
+        # One document being embedded, queue_size extracted or extracting, one waiting for a slot
+        assert len(taken) <= 4
+        blocking.released.set()
+        thread.join(timeout=30)
+        assert len(taken) == 20
+
+    def test_failing_callbacks_do_not_stall(self, tmp_path, embedder):
+        """
+        Errors raised by on_complete or by summarizing a document only
+        affect that file, and run() still returns.
+        """
+        files = make_files(tmp_path, ["First text", "Second text", "Third text", "Fourth text"])
+        retriever = FakeRetriever(embedder)
+        summarize_document = retriever.summarize_document
+
+        def summarize(document, output_folder, query):
+            if document.filename == "doc1.txt":
+                raise RuntimeError("LLM down")
+            return summarize_document(document, output_folder, query)
+
+        retriever.summarize_document = summarize
+        completed = []
+
+        def on_complete(file_path, result, error=None, version=None):
+            if file_path.name in ("doc2.txt", "doc3.txt"):
+                raise OSError("sink full")
+            completed.append((file_path.name, error))
+
+        pipeline = BatchPipeline(retriever, tmp_path, "query", extract_workers=2, llm_workers=2,
+                                 on_complete=on_complete)
+        thread = threading.Thread(target=lambda: completed.append(pipeline.run(files)))
+        thread.start()
+        thread.join(timeout=30)
+
+        assert not thread.is_alive()
+        assert sorted(completed[:-1]) == [("doc0.txt", None), ("doc1.txt", "LLM down")]
+        assert [filename for filename, _ in completed[-1]] == ["doc0.txt", "doc2.txt", "doc3.txt"]
+
+    def test_results_not_collected(self, tmp_path, embedder):
+        """With collect_results=False, results only go to on_complete."""
+        files = make_files(tmp_path, ["First text", "Second text"])
+
+        results, completed = run(FakeRetriever(embedder), files, tmp_path, collect_results=False)
+
+        assert results == []
+        assert completed["doc1.txt"][:2] == (("doc1.txt", "Second text"), None)
+
+
+def incompressible_texts(count, length=4000):
+    rng = random.Random(0)
+    return ["".join(rng.choice("abcdefghijklmnopqrstuvwxyz ") for _ in range(length)) for _ in range(count)]
+
+
+class TestTextCacheLimit:
+
+    def test_extract_document_evicts(self, tmp_path):
+        """Extraction workers keep the text cache within the size limit they are given."""
+        files = make_files(tmp_path, incompressible_texts(4), suffix=".md")
+        cache_path = tmp_path / "text_cache.sqlite3"
+
+        for index, file in enumerate(files):
+            extracted = extract_document(index, file, text_cache_path=cache_path, text_cache_max_bytes=6000)
+            assert extracted.error is None
+
+        stats = TextCache(cache_path).stats()
+        assert 0 < stats["entries"] < 4
+        assert stats["total_bytes"] <= 6000
+
+    def test_pipeline_passes_limit(self, tmp_path, embedder):
+        files = make_files(tmp_path, incompressible_texts(4), suffix=".md")
+        retriever = FakeRetriever(embedder)
+        retriever.text_cache = TextCache(tmp_path / "text_cache.sqlite3", max_bytes=6000)
+
+        results, _ = run(retriever, files, tmp_path)
+
+        assert len(results) == 4
+        assert retriever.text_cache.stats()["total_bytes"] <= 6000
@@ -0,0 +1,193 @@
+"""
+Tests for streamed generation and document naming in rag.Retriever.
+"""
+import time
+import pytest
+from rag import Retriever, PartialSummary
+from src.agent.tools.ollama_api.response_cache import ResponseCache
+from src.agent.tools.semantic_index import SemanticIndex
+
+
+class FakeStream:
+    """
+    Iterator over Ollama stream chunks, recording the output file's content
+    before each chunk and whether it was closed. A chunk that is an
+    exception is raised instead.
+    """
+    def __init__(self, chunks, output_file=None, delay=0.0):
+        self.chunks = iter(chunks)
+        self.output_file = output_file
+        self.delay = delay
+        self.seen_on_disk = []
+        self.closed = False
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        if self.output_file is not None:
+            self.seen_on_disk.append(self.output_file.read_text(encoding="utf-8"))
+        time.sleep(self.delay)
+        chunk = next(self.chunks)
+        if isinstance(chunk, Exception):
+            raise chunk
+        return chunk
+
+    def close(self):
+        self.closed = True
+
+
+class FakeClient:
+    def __init__(self, stream):
+        self.stream = stream
+        self.calls = 0
+
+    def generate(self, model, prompt, stream):
+        self.calls += 1
+        return self.stream
+
+
+def tokens(*words, done=True):
+    chunks = [{"response": word} for word in words]
+    return chunks + [{"response": "", "done": True, "eval_count": len(words)}] if done else chunks
+
+
+def endless(word="tok"):
+    while True:
+        yield {"response": word}
+
+
+@pytest.fixture
+def output_file(tmp_path):
+    return tmp_path / "answer.txt"
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = ResponseCache(tmp_path / "llm_cache.sqlite3")
+    yield cache
+    cache.close()
+
+
+def make_retriever(embedder, stream, deadline_seconds=None, cache=None):
+    retriever = Retriever(model_name="fake", embedder=embedder, stream=True,
+                          deadline_seconds=deadline_seconds, cache=cache)
+    retriever.client = FakeClient(stream)
+    return retriever
+
+
+class TestGenerateStreaming:
+
+    def test_tokens_written_as_they_arrive(self, embedder, output_file):
+        """Each token is on disk before the next one is requested."""
+        stream = FakeStream(tokens("One", " two", " three"), output_file)
+        retriever = make_retriever(embedder, stream)
+
+        answer, stats = retriever.generate_streaming("prompt", output_file)
+
+        assert answer == "One two three"
+        assert stream.seen_on_disk == ["", "One", "One two", "One two three"]
+        assert output_file.read_text(encoding="utf-8") == "One two three"
+        assert stats.tokens == 3 and not stats.cancelled
+        assert stats.time_to_first_token is not None
+        assert stream.closed
+
+    def test_cancelled_at_deadline(self, embedder, output_file, cache):
+        """A generation past the deadline keeps its partial answer, which is not cached."""
+        stream = FakeStream(endless(), delay=0.01)
+        retriever = make_retriever(embedder, stream, deadline_seconds=0.1, cache=cache)
+
+        answer, stats = retriever.generate_streaming("prompt", output_file)
+
+        assert stats.cancelled
+        assert answer.startswith("tok")
+        assert output_file.read_text(encoding="utf-8") == answer
+        assert cache.get("fake", "prompt") is None
+        assert stream.closed
+
+    def test_cancelled_summary_is_partial(self, tmp_path, embedder):
+        """A document whose generation was cancelled is returned as a PartialSummary, complete ones are not."""
+        path = tmp_path / "doc.txt"
+        path.write_text("Some text", encoding="utf-8")
+        retriever = make_retriever(embedder, FakeStream(endless(), delay=0.01), deadline_seconds=0.1)
+        document = retriever.process_file(path)
+
+        result = retriever.summarize_document(document, tmp_path, "query")
+        assert isinstance(result, PartialSummary)
+        filename, answer = result
+        assert filename == "doc.txt" and answer.startswith("tok")
+
+        retriever.client = FakeClient(FakeStream(tokens("Done")))
+        result = retriever.summarize_document(document, tmp_path, "query")
+        assert result == ("doc.txt", "Done") and not isinstance(result, PartialSummary)
+
+    def test_timeout_after_deadline_cancels(self, embedder, output_file):
+        """A read timeout once the deadline passed counts as cancellation."""
+        stream = FakeStream(tokens("Partial", done=False) + [TimeoutError("read timed out")], delay=0.06)
+        retriever = make_retriever(embedder, stream, deadline_seconds=0.1)
+
+        answer, stats = retriever.generate_streaming("prompt", output_file)
+
+        assert stats.cancelled
+        assert answer == "Partial"
+        assert stream.closed
+
+    def test_error_before_deadline_raised(self, embedder, output_file):
+        stream = FakeStream(tokens("Partial", done=False) + [ConnectionError("connection reset")])
+        retriever = make_retriever(embedder, stream, deadline_seconds=60)
+
+        with pytest.raises(ConnectionError):
+            retriever.generate_streaming("prompt", output_file)
+        assert stream.closed
+
+    def test_complete_answer_cached(self, embedder, output_file, cache):
+        """Complete answers are cached and served without calling the LLM again."""
+        retriever = make_retriever(embedder, FakeStream(tokens("Cached", " answer")), cache=cache)
+        retriever.generate_streaming("prompt", output_file)
+        output_file.unlink()
+
+        answer, stats = retriever.generate_streaming("prompt", output_file)
+
+        assert stats.cached
+        assert answer == "Cached answer"
+        assert output_file.read_text(encoding="utf-8") == "Cached answer"
+        assert retriever.client.calls == 1
+
+
+class TestDocumentNames:
+
+    def test_same_name_in_subfolders(self, tmp_path, embedder, monkeypatch):
+        """Files sharing a name across subfolders and extensions get answer files of their own."""
+        input_folder, output_folder = tmp_path / "in", tmp_path / "out"
+        paths = [input_folder / "a" / "report.txt", input_folder / "b" / "report.txt", input_folder / "report.md"]
+        for path in paths:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(f"Content of {path.relative_to(input_folder)}", encoding="utf-8")
+        output_folder.mkdir()
+        retriever = Retriever(model_name="fake", embedder=embedder, input_folder=input_folder)
+        monkeypatch.setattr(retriever, "generate", lambda prompt: prompt.split("Context:\n")[1].split("\n")[0])
+
+        results = [retriever(path, output_folder, "query") for path in paths]
+
+        assert [filename for filename, _ in results] == ["a/report.txt", "b/report.txt", "report.md"]
+        for filename, answer in results:
+            output_file = Retriever.output_path(output_folder, filename)
+            assert output_file.read_text(encoding="utf-8") == answer == f"Content of {filename}"
+
+    def test_outside_input_folder(self, tmp_path, embedder):
+        retriever = Retriever(model_name="fake", embedder=embedder, input_folder=tmp_path / "in")
+        assert retriever.document_name(tmp_path / "other" / "doc.pdf") == "doc.pdf"
+
+
+class TestSemanticIndexReuse:
+
+    def test_index_built_with_document(self, tmp_path, embedder, monkeypatch):
+        """Summarizing scores the query against the document's index instead of building one."""
+        path = tmp_path / "doc.txt"
+        path.write_text("First paragraph\nSecond paragraph", encoding="utf-8")
+        retriever = Retriever(model_name="fake", embedder=embedder)
+        monkeypatch.setattr(retriever, "generate", lambda prompt: "answer")
+        document = retriever.process_file(path)
+        monkeypatch.setattr(SemanticIndex, "__init__", lambda self, embeddings: pytest.fail("index rebuilt"))
+
+        assert retriever.summarize_document(document, tmp_path, "query") == ("doc.txt", "answer")
@@ -0,0 +1,116 @@
+"""
+Tests for the memoized document processing of read_file.FileProcessor.
+"""
+import re
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import pytest
+import read_file
+from read_file import FileProcessor
+from src.agent.tools import model_registry
+from src.agent.tools.model_registry import get_model_registry, ModelRegistry
+
+
+def write(tmp_path, name, text):
+    path = tmp_path / name
+    path.write_text(text, encoding="utf-8")
+    return path
+
+
+class TestProcessedCache:
+
+    def test_same_content_processed_once(self, tmp_path, embedder):
+        """A copy of a processed file reuses its chunks and embeddings under its own name."""
+        first = write(tmp_path, "first.txt", "Some words\nMore words")
+        copy = write(tmp_path, "copy.txt", "Some words\nMore words")
+
+        document = FileProcessor(first, embedder=embedder).process()
+        copied = FileProcessor(copy, embedder=embedder).process()
+
+        assert embedder.calls == 1
+        assert copied.filename == "copy.txt"
+        assert copied.chunks == document.chunks
+        assert copied.embeddings is document.embeddings
+        assert copied.index is document.index
+
+    def test_changed_content(self, tmp_path, embedder):
+        path = write(tmp_path, "doc.txt", "Some words")
+        FileProcessor(path, embedder=embedder).process()
+        path.write_text("Other words", encoding="utf-8")
+
+        document = FileProcessor(path, embedder=embedder).process()
+        assert embedder.calls == 2
+        assert document.chunks == ["Other words"]
+
+    def test_other_embedding_model(self, tmp_path, embedder, make_embedder):
+        """Vectors memoized for one embedding model are not returned for another."""
+        path = write(tmp_path, "doc.txt", "Some words")
+        other = make_embedder(seed=2.0)
+
+        FileProcessor(path, embedder=embedder).process()
+        document = FileProcessor(path, embedder=other, embedding_model="other-model").process()
+
+        assert other.calls == 1
+        assert np.all(document.embeddings[:, 2] == 2.0)
+
+    def test_other_settings(self, tmp_path, embedder):
+        path = write(tmp_path, "doc.txt", "Some words\nSome words")
+        FileProcessor(path, embedder=embedder).process()
+        FileProcessor(path, embedder=embedder, dedup=True).process()
+        assert embedder.calls == 2
+
+    def test_concurrent_processing(self, tmp_path, embedder):
+        """Files processed from many threads are all returned and the cache stays bounded."""
+        paths = [write(tmp_path, f"{i}.txt", f"Words of document {i}") for i in range(4 * read_file._CACHE_SIZE)]
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            documents = list(pool.map(lambda path: FileProcessor(path, embedder=embedder).process(), paths * 2))
+
+        assert [document.filename for document in documents] == [path.name for path in paths * 2]
+        assert len(read_file._processed_cache) == read_file._CACHE_SIZE
+
+
+class WordTokenizer:
+    """Stand-in tokenizer with one token per word and the given max length."""
+    def __init__(self, model_max_length):
+        self.model_max_length = model_max_length
+
+    def __call__(self, texts, add_special_tokens=True, return_offsets_mapping=False):
+        if isinstance(texts, str):
+            matches = list(re.finditer(r"\S+", texts))
+            encoded = {"input_ids": list(range(len(matches)))}
+            if return_offsets_mapping:
+                encoded["offset_mapping"] = [match.span() for match in matches]
+            return encoded
+        return {"input_ids": [self(text)["input_ids"] for text in texts]}
+
+
+@pytest.fixture
+def tokenizers():
+    """Serve a WordTokenizer of max length 7 for 'small-model' and 12 for any other model."""
+    loaded = []
+    registry = get_model_registry()
+
+    def load(name):
+        loaded.append(name)
+        return WordTokenizer(7 if name == "small-model" else 12)
+
+    registry.register_loader(ModelRegistry.TOKENIZER, load)
+    yield loaded
+    for name in set(loaded):
+        registry.evict(ModelRegistry.TOKENIZER, name)
+    registry.register_loader(ModelRegistry.TOKENIZER, model_registry._load_tokenizer)
+
+
+class TestTokenChunking:
+
+    def test_embedding_model_tokenizer(self, tmp_path, embedder, tokenizers):
+        """Token chunks are sized by the tokenizer and max length of the processor's embedding model."""
+        path = write(tmp_path, "doc.txt", " ".join(f"Sentence {i} has words." for i in range(20)))
+
+        small = FileProcessor(path, embedder=embedder, chunking="tokens", embedding_model="small-model")
+        chunks = small.chunk_text(path.read_text(encoding="utf-8"))
+
+        assert tokenizers == ["small-model"]
+        assert max(len(chunk.split()) for chunk in chunks) <= 5
+        default = FileProcessor(path, embedder=embedder, chunking="tokens")
+        assert len(default.chunk_text(path.read_text(encoding="utf-8"))) < len(chunks)